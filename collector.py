@@ -0,0 +1,24 @@
+import argparse
+
+from rgbd_collector.app import main
+
+# One entry point for the RGB-D collector, whichever camera is attached:
+#
+#   python collector.py realsense [--record rec/ ...]
+#   python collector.py orbbec --serial CL8K1234
+#   python collector.py synthetic [--synthetic-as femto_bolt]   (generated frames, no hardware)
+#
+# Everything after the backend name goes to the app (rgbd_collector/app.py).
+# The camera SDK is imported by the backend factory only when the camera is
+# opened, so a session never loads the other vendor's SDK.
+BACKENDS = ("orbbec", "realsense", "synthetic")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="RGB-D data collector",
+                                     epilog="Other arguments are passed to the app; "
+                                            "'collector.py <backend> --help' lists them.")
+    parser.add_argument("backend", choices=BACKENDS)
+    parser.add_argument("args", nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    main(["--camera", args.backend] + list(args.args))
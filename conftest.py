@@ -0,0 +1 @@
+# Lets the tests import rgbd_collector and the camera packages from the repo root
@@ -0,0 +1 @@
+# RealSense camera interface for rgbd_collector (needs pyrealsense2)
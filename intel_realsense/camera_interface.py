@@ -1,28 +1,169 @@
+import logging
+import threading
+from collections import OrderedDict
+
 import pyrealsense2 as rs
 import numpy as np
 
+from rgbd_collector.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+# RealSense post-processing blocks by name, for build_filter_chain
+FILTERS = {
+    "decimation": lambda: rs.decimation_filter(),
+    "threshold": lambda: rs.threshold_filter(),
+    "disparity": lambda: rs.disparity_transform(True),
+    "spatial": lambda: rs.spatial_filter(),
+    "temporal": lambda: rs.temporal_filter(),
+    "depth": lambda: rs.disparity_transform(False),
+    "hole_filling": lambda: rs.hole_filling_filter(),
+}
+
+def build_filter_chain(spec):
+    # spec: [(name, {option_name: value}), ...], applied in order, e.g.
+    #   [("decimation", {"filter_magnitude": 2}), ("disparity", {}),
+    #    ("spatial", {"filter_smooth_alpha": 0.5}), ("temporal", {}), ("depth", {})]
+    chain = []
+    for name, options in spec:
+        block = FILTERS[name]()
+        for option, value in options.items():
+            block.set_option(getattr(rs.option, option), value)
+        chain.append(block)
+    return chain
+
+
+# Aligned results the worker keeps, newest last; covers every frameset the
+# FrameGrabber ring can still hand out for capture
+KEPT_RESULTS = 8
+
+
+def frameset_key(frameset):
+    # Identifies a frameset across the worker and the ring: frame number plus
+    # timestamp (frame numbers restart when the pipeline does)
+    return frameset.get_frame_number(), frameset.get_timestamp()
+
+
+class AlignmentWorker:
+    # Filters and aligns framesets on its own thread. Only the newest frameset is
+    # kept waiting; older ones are skipped if the worker falls behind. Results
+    # are kept by frameset_key(), so a capture gets its own frameset's result.
+    def __init__(self, process, kept=KEPT_RESULTS):
+        self.process = process
+        self.kept = kept
+        self._cond = threading.Condition()
+        self._pending = None
+        self._results = OrderedDict()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="rs-align", daemon=True)
+        self._thread.start()
+
+    def submit(self, frameset):
+        with self._cond:
+            self._pending = frameset
+            self._cond.notify()
+
+    def result(self, frameset):
+        # (color, depth) for this frameset, or None if it was skipped or not done yet
+        with self._cond:
+            return self._results.get(frameset_key(frameset))
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        self._thread.join(timeout=2.0)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and self._running:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                frameset, self._pending = self._pending, None
+            try:
+                key = frameset_key(frameset)
+                result = self.process(frameset)
+            except Exception as e:
+                logger.error("Alignment failed: %s", e, extra={"every": 5.0})
+                continue
+            if result is not None:
+                with self._cond:
+                    self._results[key] = result
+                    while len(self._results) > self.kept:
+                        self._results.popitem(last=False)
+
+
 class CameraInterface:
-    def __init__(self):
+    # align_mode:
+    #   "lazy"   - preview uses raw frames; alignment runs only when aligned() is called
+    #   "worker" - every frame is filtered and aligned on a background thread, and
+    #              aligned() returns that frameset's result (temporal filters need this)
+    # serial: which device to open when several are connected (default: any)
+    camera = "realsense"  # depth is aligned on capture (rgbd_collector.capture)
+
+    def __init__(self, filters=None, align_mode="lazy", serial=None):
+        self.serial = serial
         self.pipeline = rs.pipeline()
         self.align = rs.align(rs.stream.color)
+        self.filters = build_filter_chain(filters or [])
+        self.align_mode = align_mode
+        self.worker = None
+        self.profile = None
+        self._lock = threading.Lock()  # processing blocks may be used from several threads
 
     def setup_streams(self):
         config = rs.config()
+        if self.serial:
+            config.enable_device(self.serial)
         config.enable_stream(rs.stream.depth, 640, 480, rs.format.z16, 30)
-        config.enable_stream(rs.stream.color, 640, 480, rs.format.bgr8, 30)
-        self.pipeline.start(config)
+        config.enable_stream(rs.stream.color, 640, 480, rs.format.rgb8, 30)
+        self.profile = self.pipeline.start(config)
+        if self.align_mode == "worker":
+            self.worker = AlignmentWorker(self.align_frameset)
+
+    def get_intrinsics(self):
+        # Aligned depth has the color stream's geometry
+        stream = self.profile.get_stream(rs.stream.color).as_video_stream_profile()
+        i = stream.get_intrinsics()
+        return (i.fx, i.fy, i.ppx, i.ppy, i.width, i.height)
 
-    def get_frames(self):
+    def get_frameset(self):
+        # Raw, unaligned frameset; cheap enough for every preview frame
         try:
             frames = self.pipeline.wait_for_frames()
-            aligned = self.align.process(frames)
-            depth = aligned.get_depth_frame()
-            color = aligned.get_color_frame()
-            if not depth or not color:
-                return None, None
-            return color, depth
-        except:
-            return None, None
+        except RuntimeError:
+            return None
+        frames.keep()  # may be aligned later, after the next wait_for_frames()
+        if self.worker is not None:
+            self.worker.submit(frames)
+        return frames
+
+    def _process(self, frames):
+        with self._lock, METRICS.measure("align"):
+            for block in self.filters:
+                frames = block.process(frames).as_frameset()
+            return self.align.process(frames)
+
+    def align_frameset(self, frames):
+        aligned = self._process(frames)
+        depth = aligned.get_depth_frame()
+        color = aligned.get_color_frame()
+        if not depth or not color:
+            return None
+        return np.asanyarray(color.get_data()).copy(), np.asanyarray(depth.get_data()).copy()
+
+    def aligned(self, frameset):
+        # (color, depth) arrays with depth aligned to color, for capture
+        if self.worker is not None:
+            result = self.worker.result(frameset)
+            if result is not None:
+                return result
+        # Lazy mode, or a frameset the worker skipped or hasn't reached yet
+        return self.align_frameset(frameset)
 
     def stop(self):
+        if self.worker is not None:
+            self.worker.stop()
         self.pipeline.stop()
@@ -0,0 +1,2 @@
+# Femto Bolt camera interface and depth registration for rgbd_collector
+# (camera_interface needs pyorbbecsdk, registration does not)
@@ -1,8 +1,19 @@
+import logging
+
 from pyorbbecsdk import *
 
+logger = logging.getLogger(__name__)
+
 class CameraInterface:
-    def __init__(self):
-        self.pipeline = Pipeline()
+    camera = "femto_bolt"  # depth is registered on capture (rgbd_collector.capture)
+
+    def __init__(self, serial=None):
+        if serial:
+            # A specific device, when several are connected
+            device = Context().query_devices().get_device_by_serial_number(serial)
+            self.pipeline = Pipeline(device)
+        else:
+            self.pipeline = Pipeline()
         self.config = Config()
 
     def setup_streams(self):
@@ -13,7 +24,7 @@ class CameraInterface:
         except OBError:
             color_profile = color_profiles.get_default_video_stream_profile()
         self.config.enable_stream(color_profile)
-        print("Selected color format:", color_profile.get_format())
+        logger.info("Selected color format: %s", color_profile.get_format())
 
 
         depth_profiles = self.pipeline.get_stream_profile_list(OBSensorType.DEPTH_SENSOR)
@@ -22,6 +33,18 @@ class CameraInterface:
 
         self.pipeline.start(self.config)
 
+    def get_calibration(self):
+        # Intrinsics/extrinsics as plain tuples for DepthRegistration
+        param = self.pipeline.get_camera_param()
+        d = param.depth_intrinsic
+        c = param.rgb_intrinsic
+        return {
+            "depth": (d.fx, d.fy, d.cx, d.cy, d.width, d.height),
+            "color": (c.fx, c.fy, c.cx, c.cy, c.width, c.height),
+            "rotation": tuple(param.transform.rot),
+            "translation": tuple(param.transform.transform),
+        }
+
     def get_frames(self):
         frames = self.pipeline.wait_for_frames(100)
         if frames:
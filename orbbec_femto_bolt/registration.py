@@ -0,0 +1,120 @@
+import threading
+
+import cv2
+import numpy as np
+
+# Projection tables, shared by all DepthRegistration instances:
+# (calibration key, depth shape, color shape) -> tables
+_TABLES = {}
+_TABLES_LOCK = threading.Lock()
+
+
+def _scaled_intrinsics(intrinsics, shape):
+    # Calibration is reported for one resolution; scale it to the stream's
+    fx, fy, cx, cy, width, height = intrinsics
+    h, w = shape
+    sx = w / width if width else 1.0
+    sy = h / height if height else 1.0
+    return fx * sx, fy * sy, cx * sx, cy * sy
+
+
+class DepthRegistration:
+    # Warps Femto Bolt depth into the color camera's frame on the CPU.
+    #
+    # calibration: {"depth": (fx, fy, cx, cy, width, height),
+    #               "color": (fx, fy, cx, cy, width, height),
+    #               "rotation": 9 floats (row-major, depth -> color),
+    #               "translation": 3 floats in mm}
+    #
+    # Everything that only depends on the calibration and the two resolutions is
+    # computed once: for each depth pixel, its ray rotated into the color frame and
+    # premultiplied by the color intrinsics. Per frame that leaves a few vectorized
+    # multiply-adds, one z-buffered scatter onto a grid with the color camera's
+    # geometry, and one nearest-neighbour remap up to full color resolution.
+    # Lens distortion is ignored.
+    def __init__(self, calibration):
+        self.calibration = calibration
+        self.key = (
+            tuple(calibration["depth"]),
+            tuple(calibration["color"]),
+            tuple(calibration["rotation"]),
+            tuple(calibration["translation"]),
+        )
+
+    def _tables(self, depth_shape, color_shape):
+        key = (self.key, depth_shape, color_shape)
+        with _TABLES_LOCK:
+            tables = _TABLES.get(key)
+            if tables is None:
+                tables = self._build(depth_shape, color_shape)
+                _TABLES[key] = tables
+        return tables
+
+    def _build(self, depth_shape, color_shape):
+        dfx, dfy, dcx, dcy = _scaled_intrinsics(self.calibration["depth"], depth_shape)
+        cfx, cfy, ccx, ccy = _scaled_intrinsics(self.calibration["color"], color_shape)
+        rot = np.asarray(self.calibration["rotation"], dtype=np.float64).reshape(3, 3)
+        trans = np.asarray(self.calibration["translation"], dtype=np.float64)
+
+        # Scatter onto a grid about as wide as the depth image (no point splatting
+        # a 640-wide depth map onto a 3840-wide color grid), then upsample.
+        ch, cw = color_shape
+        scale = min(1.0, depth_shape[1] / cw)
+        gw, gh = max(int(round(cw * scale)), 1), max(int(round(ch * scale)), 1)
+        gfx, gfy = cfx * gw / cw, cfy * gh / ch
+        gcx, gcy = (ccx + 0.5) * gw / cw - 0.5, (ccy + 0.5) * gh / ch - 0.5
+
+        h, w = depth_shape
+        u, v = np.meshgrid(np.arange(w, dtype=np.float64), np.arange(h, dtype=np.float64))
+        rays = np.stack([(u - dcx) / dfx, (v - dcy) / dfy, np.ones_like(u)], axis=-1)
+        a = rays @ rot.T  # ray direction in the color frame, per depth pixel
+
+        # Grid coordinates: gu = (z * px + qx) / (z * pz + qz), same for gv
+        px = (gfx * a[..., 0] + gcx * a[..., 2]).ravel().astype(np.float32)
+        py = (gfy * a[..., 1] + gcy * a[..., 2]).ravel().astype(np.float32)
+        pz = a[..., 2].ravel().astype(np.float32)
+        q = (
+            np.float32(gfx * trans[0] + gcx * trans[2]),
+            np.float32(gfy * trans[1] + gcy * trans[2]),
+            np.float32(trans[2]),
+        )
+
+        # Nearest-neighbour remap from the grid to full color resolution
+        map_x = ((np.arange(cw, dtype=np.float32) + 0.5) * gw / cw - 0.5).round().clip(0, gw - 1)
+        map_y = ((np.arange(ch, dtype=np.float32) + 0.5) * gh / ch - 0.5).round().clip(0, gh - 1)
+        map_x, map_y = np.meshgrid(map_x.astype(np.float32), map_y.astype(np.float32))
+
+        return {
+            "grid": (gw, gh),
+            "p": (px, py, pz),
+            "q": q,
+            "map": (map_x, map_y),
+        }
+
+    def register(self, depth, color_shape):
+        # depth: uint16 mm in the depth camera; returns uint16 mm (along the color
+        # camera's optical axis) of shape color_shape, 0 where nothing projects
+        color_shape = tuple(color_shape[:2])
+        tables = self._tables(depth.shape, color_shape)
+        gw, gh = tables["grid"]
+        px, py, pz = tables["p"]
+        qx, qy, qz = tables["q"]
+
+        z = depth.ravel()
+        valid = np.flatnonzero(z)
+        zf = z[valid].astype(np.float32)
+
+        zc = zf * pz[valid] + qz
+        inv = 1.0 / zc
+        gu = ((zf * px[valid] + qx) * inv + 0.5).astype(np.int32)
+        gv = ((zf * py[valid] + qy) * inv + 0.5).astype(np.int32)
+        inside = (zc > 0) & (gu >= 0) & (gu < gw) & (gv >= 0) & (gv < gh)
+
+        # z-buffer: nearest surface wins where several depth pixels land together
+        grid = np.full(gw * gh, np.iinfo(np.uint16).max, dtype=np.uint16)
+        np.minimum.at(grid, gv[inside] * gw + gu[inside], np.clip(zc[inside], 0, 65534).astype(np.uint16))
+        grid[grid == np.iinfo(np.uint16).max] = 0
+        grid = grid.reshape(gh, gw)
+
+        map_x, map_y = tables["map"]
+        return cv2.remap(grid, map_x, map_y, cv2.INTER_NEAREST)
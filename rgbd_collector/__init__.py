@@ -0,0 +1,3 @@
+# Camera-independent core shared by the RealSense and Femto Bolt collectors:
+# acquisition, preview, segmentation, saving and the dataset tools, e.g.
+#   python -m rgbd_collector.validate --dataset dataset
@@ -0,0 +1,93 @@
+import numpy as np
+import cv2
+
+class AnnotationWriter:
+    def __init__(self, label_class=0, normalized=True, epsilon=0.0, multi_instance=False, min_area=0):
+        #self.label_class = label_class
+        self.normalized = normalized
+        self.epsilon = epsilon                # approxPolyDP tolerance in pixels (0 = keep every vertex)
+        self.multi_instance = multi_instance  # one line per external contour instead of the largest only
+        self.min_area = min_area              # ignore smaller contours in multi-instance mode
+
+    def polygon(self, contour):
+        # Vertices (Nx2, pixels) of the polygon written for a contour, None if it isn't one
+        # Optionally drop vertices that are within epsilon pixels of the simplified outline
+        if self.epsilon > 0:
+            contour = cv2.approxPolyDP(contour, self.epsilon, True)
+
+        points = contour.reshape(-1, 2)
+        if len(points) < 3:
+            return None  # not a polygon
+        return points
+
+    def format_line(self, label_class, contour, img_shape):
+        height, width = img_shape
+        points = self.polygon(contour)
+        if points is None:
+            return None
+
+        # Normalize coordinates to [0, 1] in one vectorized step
+        if self.normalized:
+            points = points / np.array([width, height], dtype=np.float64)
+
+        # Format all coordinates with a single %-operation
+        flat = points.ravel().tolist()
+        return f"{label_class} " + " ".join(["%.6f"] * len(flat)) % tuple(flat)
+
+    def instances(self, mask, label_class):
+        # Find external contours (object outlines)
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        return self._select(contours, [cv2.contourArea(c) for c in contours], label_class)
+
+    def result_instances(self, result, label_class):
+        # Reuses the contours of a SegmentationResult instead of searching the mask again
+        return self._select(result.contours, result.areas, label_class)
+
+    def _select(self, contours, areas, label_class):
+        if not len(contours):
+            return []
+
+        if not self.multi_instance:
+            # Select the largest contour (assuming single object per image)
+            return [(label_class, contours[int(np.argmax(areas))])]
+
+        order = np.argsort(areas)[::-1]
+        return [(label_class, contours[i]) for i in order if areas[i] >= self.min_area]
+
+    def write(self, filepath, mask, img_shape, label_class):
+        return self.write_instances(filepath, self.instances(mask, label_class), img_shape)
+
+    def write_result(self, filepath, result, img_shape, label_class):
+        return self.write_instances(filepath, self.result_instances(result, label_class), img_shape)
+
+    def write_instances(self, filepath, instances, img_shape):
+        # instances: [(label_class, contour), ...], one YOLO polygon line each
+        lines = []
+        for label_class, contour in instances:
+            line = self.format_line(label_class, contour, img_shape)
+            if line is not None:
+                lines.append(line)
+        if not lines:
+            return False
+
+        # Write to YOLO segmentation file
+        with open(filepath, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        return True
+
+    def write_batch(self, items):
+        # items: iterable of (filepath, mask, img_shape, label_class)
+        return [self.write(filepath, mask, img_shape, label_class)
+                for filepath, mask, img_shape, label_class in items]
+
+def read_label(filepath):
+    # Parse a YOLO segmentation file into [(label_class, points Nx2 float32), ...]
+    instances = []
+    with open(filepath) as f:
+        for line in f:
+            values = line.split()
+            if len(values) < 7 or len(values) % 2 == 0:
+                continue  # need a class and at least 3 x/y pairs
+            coords = np.array(values[1:], dtype=np.float32).reshape(-1, 2)
+            instances.append((int(values[0]), coords))
+    return instances
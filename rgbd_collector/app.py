@@ -0,0 +1,548 @@
+import argparse
+import logging
+import queue
+import time
+import cv2
+import numpy as np
+import tkinter as tk
+from PIL import Image, ImageTk
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+from .backends import BACKENDS, open_camera
+from .capture import capture_step
+from .segmentation_helper import create_segmentation
+from .annotation_writer import AnnotationWriter
+from .frame_grabber import FrameGrabber
+from .preview import PreviewRenderer, DepthPreviewRenderer, next_delay_ms
+from .colorize import DepthColorizer
+from .save_pipeline import SaveJob, SavePipeline
+from .manifest import DatasetManifest, sample_name
+from .depth_store import create_depth_store
+from .pointcloud import PointCloudExporter, save_intrinsics
+from .auto_capture import SceneTrigger
+from .offload import FrameOffload
+from .dedupe import DedupeIndex, sample_hashes
+from .recording import Recorder
+from .metrics import METRICS
+from . import log
+
+logger = logging.getLogger(__name__)
+
+# Depth storage format for new samples: "png" (lossless 16-bit), "shard" or "npy"
+DEPTH_FORMAT = "png"
+
+# Femto Bolt MJPG color is decoded at (reduced) preview size; full decode happens on capture
+PREVIEW_SIZE = (960, 540)
+
+# RealSense only. "lazy": align only captured frames; "worker": filter + align every frame on a thread
+ALIGN_MODE = "lazy"
+# RealSense post-processing chain, e.g. [("decimation", {"filter_magnitude": 2}), ("spatial", {}), ("temporal", {})]
+DEPTH_FILTERS = []
+
+# Default options for opening each backend
+CAMERA_OPTIONS = {
+    "realsense": {"filters": DEPTH_FILTERS, "align_mode": ALIGN_MODE},
+}
+
+# Also export each saved sample's (masked) point cloud: "ply", "npy" or None
+POINT_CLOUD_FORMAT = None
+
+# Live depth + mask pane next to the RGB preview, per camera kind (the Femto
+# Bolt's NFOV depth is 640x576); None turns it off
+DEPTH_PREVIEW_SIZE = {"realsense": (480, 360), "femto_bolt": (480, 432)}
+# Depth color scale in mm; None = the segmentation range (min_depth..max_depth)
+DEPTH_COLOR_RANGE = None
+
+# Auto-capture: saves whenever the scene changed and then held still (see SceneTrigger)
+AUTO_CAPTURE = {"step": 8, "tolerance": 10, "relative": 0.02, "change": 0.05, "motion": 0.01, "stable_frames": 8}
+
+# Worker processes for the live segmentation and JPEG encoding, fed through
+# shared-memory frame buffers; 0 keeps everything in this process
+OFFLOAD_WORKERS = 0
+
+# Near-duplicate check on capture against every sample in the dataset (see
+# dedupe.py): "warn", "skip" (stay live instead of capturing) or None
+DUPLICATES = "warn"
+# Max summed Hamming distance of the RGB and depth hashes (out of 128 bits)
+DUPLICATE_DISTANCE = 8
+
+# Per-stage latency summaries are written here on quit
+METRICS_DIR = Path("metrics")
+
+# {0, 1} mask -> black/white BGR in a single lookup
+MASK_COLORS = np.array([[0, 0, 0], [255, 255, 255]], dtype=np.uint8)
+
+class RGBDCollectorApp:
+    def __init__(self, root, cam=None, record_path=None, show_metrics=False, offload_workers=OFFLOAD_WORKERS,
+                 backend="realsense", serial=None, duplicates=DUPLICATES):
+        self.root = root
+        self.root.title("RGB-D Data Collector")
+        self.root.focus_force()  # Ensure the window grabs focus for key events
+
+        # cam can be any CameraInterface-compatible object, e.g. from backends.open_camera
+        if cam is None:
+            cam = open_camera(backend, serial=serial, **CAMERA_OPTIONS.get(backend, {}))
+        self.cam = cam
+        self.cam.setup_streams()
+        # Align (RealSense) or register (Femto Bolt) on capture, see capture.py
+        self.step = capture_step(self.cam, PREVIEW_SIZE)
+        self.step.start()
+        self.intrinsics = self.step.intrinsics
+        self.grabber = FrameGrabber(self.cam, self.step.read)
+
+        self.recorder = None
+        if record_path is not None:
+            self.recorder = Recorder(record_path, **self.step.recorder_options())
+            self.grabber.listeners.append(self.recorder)
+        self.grabber.start()
+
+        # Depth range, ROI and blob limits of the camera kind (segmentation_helper.PRESETS)
+        self.seg = create_segmentation(self.step.camera)
+        self.writer = AnnotationWriter(label_class=0)
+
+        # Setup dataset directories
+        base_path = Path("dataset")
+        self.img_dir = base_path / "images"
+        self.label_dir = base_path / "labels"
+        self.depth_dir = base_path / "depth"
+        self.img_dir.mkdir(parents=True, exist_ok=True)
+        self.label_dir.mkdir(parents=True, exist_ok=True)
+        self.depth_dir.mkdir(parents=True, exist_ok=True)
+
+        # Next sample id comes from the manifest instead of listing images/
+        self.manifest = DatasetManifest(base_path, camera=self.step.camera)
+        self.depth_store = create_depth_store(self.depth_dir, DEPTH_FORMAT)
+        self.pointclouds = None
+        if self.intrinsics is not None:
+            # Lets pointcloud.py rebuild clouds for already saved samples
+            save_intrinsics(base_path, self.manifest.camera, self.intrinsics)
+            if POINT_CLOUD_FORMAT:
+                self.pointclouds = PointCloudExporter(base_path / "points", POINT_CLOUD_FORMAT)
+        self.offload = FrameOffload(self.seg, workers=offload_workers) if offload_workers else None
+        self.saver = SavePipeline(self.img_dir, self.depth_store, self.label_dir, self.writer,
+                                  on_done=self.on_saved, pointclouds=self.pointclouds, encoder=self.offload)
+
+        # Perceptual hashes of every sample saved so far (<dataset>/hashes.bin)
+        self.duplicates = duplicates
+        self.dedupe = DedupeIndex(base_path) if duplicates else None
+        if self.dedupe is not None and not len(self.dedupe) and self.manifest.next_id:
+            logger.info("Existing samples are not in the duplicate index yet, run python -m rgbd_collector.dedupe "
+                        "to add them")
+
+        self.captured_rgb = None
+        self.captured_depth = None
+        self.captured_result = None
+        self.captured_time = None
+        self.captured_hashes = None
+        self.is_capturing = True  # True = live feed, False = paused to save/retake
+
+        # --- Layout: Separate Frames for Video and Buttons ---
+        self.video_frame = tk.Frame(root)
+        self.video_frame.pack(side=tk.TOP)
+
+        self.btn_frame = tk.Frame(root)
+        self.btn_frame.pack(side=tk.BOTTOM, pady=5)
+
+        self.video_label = tk.Label(self.video_frame)
+        self.video_label.pack(side=tk.LEFT)
+        self.depth_label = tk.Label(self.video_frame)
+        self.depth_label.pack(side=tk.LEFT)
+        self.class_var = tk.IntVar(value=0)  # Default class: 0 (Copper)
+        tk.Label(self.btn_frame, text="Class:").grid(row=1, column=0)
+        self.class_selector = tk.OptionMenu(self.btn_frame, self.class_var, 0, 1)
+        self.class_selector.grid(row=1, column=1)
+        tk.Label(self.btn_frame, text="(0: Copper, 1: Steel)").grid(row=1, column=2, columnspan=2)
+
+        self.capture_btn = tk.Button(self.btn_frame, text="Capture (Enter)", command=self.capture_frame)
+        self.capture_btn.grid(row=0, column=0, padx=5)
+        self.save_btn = tk.Button(self.btn_frame, text="Save (S)", command=self.save_data, state=tk.DISABLED)
+        self.save_btn.grid(row=0, column=1, padx=5)
+        self.retake_btn = tk.Button(self.btn_frame, text="Retake (R)", command=self.retake_frame, state=tk.DISABLED)
+        self.retake_btn.grid(row=0, column=2, padx=5)
+        self.quit_btn = tk.Button(self.btn_frame, text="Quit (Q)", command=self.quit_app)
+        self.quit_btn.grid(row=0, column=3, padx=5)
+        self.auto_btn = tk.Button(self.btn_frame, text="Auto (A)", command=self.toggle_auto)
+        self.auto_btn.grid(row=0, column=4, padx=5)
+
+        # Auto-capture mode: no review step, samples are queued as the scene settles
+        self.trigger = SceneTrigger(**AUTO_CAPTURE)
+        self.auto_saved = 0
+        # Full decode, registration and segmentation of triggered frames run on
+        # this thread (with its own helper: the preview's scratch buffers are not
+        # shared), so a burst doesn't stall the live preview. Results are queued
+        # for the Tk thread, which picks them up in update_video.
+        self.auto_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="auto-capture")
+        self.auto_seg = create_segmentation(self.step.camera)
+        self.auto_done = queue.SimpleQueue()
+        self.root.bind('a', lambda e: self.toggle_auto())
+        self.root.bind('A', lambda e: self.toggle_auto())
+
+        # Bind both lowercase and uppercase for robustness
+        self.root.bind('<Return>', lambda e: self.capture_frame())
+        self.root.bind('s', lambda e: self.save_data())
+        self.root.bind('S', lambda e: self.save_data())
+        self.root.bind('r', lambda e: self.retake_frame())
+        self.root.bind('R', lambda e: self.retake_frame())
+        self.root.bind('q', lambda e: self.quit_app())
+        self.root.bind('Q', lambda e: self.quit_app())
+
+        # For debugging: print key presses to ensure binding works
+        # self.root.bind('<Key>', lambda e: print(f"Key pressed: {e.char}"))
+
+        # Acquisition stats (frames received / dropped / late)
+        self.status_var = tk.StringVar()
+        tk.Label(self.btn_frame, textvariable=self.status_var).grid(row=2, column=0, columnspan=5)
+        self.last_seq = 0
+        self.last_shown = None
+
+        # Optional FPS/latency overlay in the corner of the video (toggle with M)
+        self.metrics_label = tk.Label(self.video_frame, font="TkFixedFont", fg="#00ff00", bg="black",
+                                      justify=tk.LEFT, anchor="nw")
+        self.show_metrics = False
+        self.root.bind('m', lambda e: self.toggle_metrics())
+        self.root.bind('M', lambda e: self.toggle_metrics())
+        if show_metrics:
+            self.toggle_metrics()
+        self.preview = PreviewRenderer(self.video_label, size=PREVIEW_SIZE)
+
+        # Fixed depth colors: one table lookup per pixel, same scale on every frame
+        depth_range = DEPTH_COLOR_RANGE or (self.seg.min_depth, self.seg.max_depth)
+        self.depth_colors = DepthColorizer(*depth_range)
+        self.depth_preview = None
+        self.preview_mask = None  # live segmentation mask, reused while the frame shape stays the same
+        depth_preview_size = DEPTH_PREVIEW_SIZE and DEPTH_PREVIEW_SIZE.get(self.step.camera)
+        if depth_preview_size is not None:
+            self.depth_preview = DepthPreviewRenderer(self.depth_label, DepthColorizer(*depth_range, order="rgb"),
+                                                      size=depth_preview_size)
+
+        self.update_video()
+        self.update_status()
+
+    def update_video(self):
+        try:
+            if self.offload is not None:
+                # Depth pane for frames the workers have finished segmenting
+                self.offload.poll()
+            self.queue_auto_captures()
+            if self.is_capturing:
+                packet = self.grabber.latest(copy=False)
+                if packet is not None and packet.seq != self.last_seq:
+                    if self.last_shown is not None:
+                        METRICS.record("preview.interval", packet.timestamp - self.last_shown)
+                    self.last_seq = packet.seq
+                    self.last_shown = packet.timestamp
+                    self.preview.show(packet.color)
+                    if self.depth_preview is not None and self.offload is not None:
+                        # Skipped while every shared buffer is still being worked on
+                        self.offload.segment(packet.depth, self.depth_preview.show)
+                    elif self.depth_preview is not None:
+                        if self.preview_mask is None or self.preview_mask.shape != packet.depth.shape:
+                            self.preview_mask = np.empty(packet.depth.shape, dtype=np.uint8)
+                        with METRICS.measure("preview.segment"):
+                            mask = self.seg.segment(packet.depth, out=self.preview_mask)
+                        self.depth_preview.show(packet.depth, mask)
+                    if self.trigger.state != "idle":
+                        with METRICS.measure("auto.trigger"):
+                            fire = self.trigger.update(packet.depth)
+                        if fire:
+                            self.auto_capture(packet)
+        except Exception as e:
+            logger.error("update_video failed: %s", e, extra={"every": 5.0})
+
+        # Paced to the camera's measured frame rate
+        self.root.after(next_delay_ms(self.last_shown, self.grabber.interval), self.update_video)
+
+    def update_status(self):
+        stats = self.grabber.stats()
+        self.status_var.set(
+            f"Frames: {stats['frames']} | Dropped: {stats['dropped']} | Late: {stats['late']}"
+            f" | Save queue: {self.saver.pending()}"
+        )
+        if self.trigger.state != "idle":
+            self.status_var.set(self.status_var.get() + f" | Auto: {self.trigger.state}, {self.auto_saved} saved")
+        if self.show_metrics:
+            self.metrics_label.configure(text=self.metrics_text())
+        self.root.after(1000, self.update_status)
+
+    def metrics_text(self):
+        summary = METRICS.summary()
+        header = f"Camera {1.0 / self.grabber.interval:5.1f} fps"
+        preview = summary.get("preview.interval")
+        if preview and preview["count"]:
+            header += f" | Preview {1000.0 / preview['p50_ms']:5.1f} fps"
+        lines = [header, f"{'stage':<16}{'p50':>7}{'p99':>7} ms"]
+        for name, row in summary.items():
+            if row["count"] and not name.endswith(".interval"):
+                lines.append(f"{name:<16}{row['p50_ms']:7.2f}{row['p99_ms']:7.2f}")
+        return "\n".join(lines)
+
+    def toggle_metrics(self):
+        self.show_metrics = not self.show_metrics
+        if self.show_metrics:
+            self.metrics_label.configure(text=self.metrics_text())
+            self.metrics_label.place(x=0, y=0)
+        else:
+            self.metrics_label.place_forget()
+
+    def process_capture(self, packet, seg=None):
+        # Full-quality (BGR, depth, SegmentationResult) for a packet from the ring
+        # Aligned or registered depth, in the saved BGR image's geometry
+        seg = seg or self.seg
+        captured = self.step.process(packet)
+        if captured is None:
+            return None
+        rgb, depth = captured
+        logger.debug("Center pixel depth: %s mm", depth[depth.shape[0] // 2, depth.shape[1] // 2])
+
+        # Mask, contours and areas from a single segmentation pass
+        with METRICS.measure("capture.segment"):
+            result = seg.analyze(depth)
+        return rgb, depth, result
+
+    def capture_frame(self):
+        if not self.is_capturing:
+            return  # ignore if already paused
+
+        # Latest frame from the acquisition thread, copied out of the ring: the
+        # full-size decode takes long enough for the writer to wrap around
+        packet = self.grabber.latest(copy=True)
+        if packet is None:
+            logger.error("No frame available to capture")
+            return
+        captured = self.process_capture(packet)
+        if captured is None:
+            return
+        rgb, depth, result = captured
+        hashes, duplicate = self.find_duplicate(rgb, depth)
+        if duplicate is not None:
+            name, distance = duplicate
+            if self.duplicates == "skip":
+                logger.info("Near-duplicate of %s (distance %d), not captured", name, distance)
+                return
+            logger.warning("Near-duplicate of %s (distance %d), Save keeps it anyway", name, distance)
+
+        self.captured_rgb = rgb
+        self.captured_depth = depth
+        self.captured_result = result
+        self.captured_time = time.time()
+        self.captured_hashes = hashes
+
+        # Convert binary mask to 3-channel BGR
+        mask_bgr = MASK_COLORS[result.mask]
+
+        # Draw contour polygon on the mask
+        if result.contour is not None:
+            cv2.drawContours(mask_bgr, [result.contour], -1, (0, 255, 0), 2)  # Green outline
+
+        logger.debug("%d contours found in ROI", len(result.contours))
+
+        # Resize all visuals to same size
+        display_width, display_height = 480, 260
+        rgb_resized = cv2.resize(rgb, (display_width, display_height))
+        mask_resized = cv2.resize(mask_bgr, (display_width, display_height))
+        # Depth is scaled down first (nearest neighbour) and colorized at display
+        # size, on the same fixed scale as the live pane
+        depth_resized = self.depth_colors.colorize(
+            cv2.resize(depth, (display_width, display_height), interpolation=cv2.INTER_NEAREST))
+
+        # Combine visuals: [RGB | Mask+Polygon | Depth]
+        combined = np.hstack((rgb_resized, mask_resized, depth_resized))
+        cv2.putText(combined, "[Enter] Capture | [S] Save | [R] Retake | [Q] Quit", (10, display_height - 10),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1, cv2.LINE_AA)
+
+        # Show in tkinter
+        with METRICS.measure("capture.photo"):
+            img = Image.fromarray(cv2.cvtColor(combined, cv2.COLOR_BGR2RGB))
+            imgtk = ImageTk.PhotoImage(image=img)
+        self.video_label.imgtk = imgtk
+        self.video_label.configure(image=imgtk)
+
+        self.is_capturing = False
+        self.capture_btn.config(state=tk.DISABLED)
+        self.save_btn.config(state=tk.NORMAL)
+        self.retake_btn.config(state=tk.NORMAL)
+        logger.info("Frame captured for class: %d — Press Save or Retake.", self.class_var.get())
+
+    def save_data(self):
+        if self.captured_rgb is None or self.captured_result is None:
+            logger.warning("No frame to save.")
+            return
+
+        if not self.queue_sample(self.captured_rgb, self.captured_depth, self.captured_result,
+                                 self.captured_time, self.captured_hashes):
+            logger.warning("Save queue is full, try again in a moment.")
+            return
+        self.reset_capture_state()
+
+    def find_duplicate(self, rgb, depth):
+        # (hashes, (name, distance) of the closest saved sample or None if none
+        # is within DUPLICATE_DISTANCE)
+        if self.dedupe is None:
+            return None, None
+        with METRICS.measure("capture.hash"):
+            hashes = sample_hashes(rgb, depth)
+            name, distance = self.dedupe.nearest(hashes)
+        if name is None or distance > DUPLICATE_DISTANCE:
+            return hashes, None
+        return hashes, (name, distance)
+
+    def queue_sample(self, rgb, depth, result, timestamp, hashes=None):
+        sample_id = self.manifest.next_id
+        img_name = sample_name(sample_id)
+        job = SaveJob(img_name, rgb, depth, result,
+                      label_class=self.class_var.get(), sample_id=sample_id,
+                      timestamp=timestamp, intrinsics=self.intrinsics, hashes=hashes)
+        if not self.saver.submit(job):
+            return False
+
+        # The id is taken even if the save fails later; that only leaves a gap
+        self.manifest.allocate()
+        logger.info("Queued %s (%d pending)", img_name, self.saver.pending())
+        return True
+
+    def toggle_auto(self):
+        if self.trigger.state != "idle":
+            self.trigger.disarm()
+            self.auto_btn.config(relief=tk.RAISED)
+            logger.info("Auto-capture off (%d samples queued)", self.auto_saved)
+            return
+        packet = self.grabber.latest(copy=False)
+        if packet is None or not self.is_capturing:
+            return
+        # The scene as it is now is the reference: only a change followed by a
+        # still scene triggers a capture
+        self.trigger.arm(packet.depth)
+        self.auto_saved = 0
+        self.auto_btn.config(relief=tk.SUNKEN)
+        logger.info("Auto-capture on for class %d", self.class_var.get())
+
+    def auto_capture(self, packet):
+        # The trigger saw a preview view into the ring; capture from a copy of that frame
+        packet = self.grabber.buffer.get(packet.seq)
+        if packet is None:
+            return
+        self.auto_pool.submit(self.process_auto_capture, packet)
+
+    def process_auto_capture(self, packet):
+        # Runs on the auto-capture thread
+        try:
+            captured = self.process_capture(packet, self.auto_seg)
+            if captured is None:
+                return
+            rgb, depth, result = captured
+            if result.contour is None:
+                logger.info("Auto-capture: scene settled but no object found, waiting for the next change")
+                return
+            hashes, duplicate = self.find_duplicate(rgb, depth)
+            if duplicate is not None:
+                if self.duplicates == "skip":
+                    logger.info("Auto-capture: near-duplicate of %s (distance %d), skipped", *duplicate)
+                    return
+                logger.warning("Near-duplicate of %s (distance %d)", *duplicate)
+            self.auto_done.put((rgb, depth, result, time.time(), hashes))
+        except Exception:
+            logger.exception("Auto-capture failed")
+
+    def queue_auto_captures(self):
+        # Tk thread: the class selector and the sample ids are read here
+        while True:
+            try:
+                rgb, depth, result, timestamp, hashes = self.auto_done.get_nowait()
+            except queue.Empty:
+                return
+            if self.queue_sample(rgb, depth, result, timestamp, hashes):
+                self.auto_saved += 1
+            else:
+                logger.warning("Save queue is full, auto-capture skipped a sample.")
+
+    def on_saved(self, job, ok):
+        # Runs on a save worker thread
+        if not job.files:
+            return
+        self.manifest.append(job.sample_id, job.label_class, job.files,
+                             depth=job.depth, mask=job.segmentation.mask, timestamp=job.timestamp)
+        if self.dedupe is not None:
+            # Only samples that made it to disk are indexed
+            hashes = job.hashes if job.hashes is not None else sample_hashes(job.rgb, job.depth)
+            self.dedupe.add(job.name, job.sample_id, hashes)
+        logger.info("Saved %s" if ok else "Saved %s (no label)", job.name)
+
+    def retake_frame(self):
+        logger.info("Retaking frame.")
+        self.reset_capture_state()
+
+    def reset_capture_state(self):
+        self.captured_rgb = None
+        self.captured_depth = None
+        self.captured_result = None
+        self.captured_time = None
+        self.captured_hashes = None
+        self.is_capturing = True
+        self.capture_btn.config(state=tk.NORMAL)
+        self.save_btn.config(state=tk.DISABLED)
+        self.retake_btn.config(state=tk.DISABLED)
+
+    def quit_app(self):
+        logger.info("Quitting application.")
+        logger.info("Acquisition stats: %s", self.grabber.stats())
+        # Frames the trigger already fired on are still saved
+        self.auto_pool.shutdown(wait=True)
+        self.queue_auto_captures()
+        if self.saver.pending():
+            logger.info("Flushing %d pending saves...", self.saver.pending())
+        self.saver.close()
+        if self.offload is not None:
+            self.offload.close()
+        self.depth_store.close()
+        self.grabber.stop()
+        if self.recorder is not None:
+            self.recorder.close()
+        self.cam.stop()
+        if METRICS.stages:
+            prefix = f"{self.manifest.camera}_{time.strftime('%Y%m%d_%H%M%S')}"
+            csv_path, json_path = METRICS.dump(METRICS_DIR, prefix)
+            logger.info("Stage latencies written to %s and %s", csv_path, json_path)
+        self.root.quit()
+        self.root.destroy()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="RGB-D data collector")
+    parser.add_argument("--camera", choices=sorted(b for b in BACKENDS if b != "replay"), default="realsense",
+                        help="Camera backend (synthetic: generated frames, no hardware needed)")
+    parser.add_argument("--synthetic-as", choices=["realsense", "femto_bolt"], default="realsense",
+                        help="Camera the synthetic backend stands in for (depth range, capture path)")
+    parser.add_argument("--serial", help="Device to open when several are connected")
+    parser.add_argument("--replay", help="Play back a recording instead of using the camera")
+    parser.add_argument("--fast", action="store_true", help="Replay as fast as possible instead of in real time")
+    parser.add_argument("--loop", action="store_true", help="Loop the replayed recording")
+    parser.add_argument("--record", help="Record the session's frames to this directory")
+    parser.add_argument("--metrics", action="store_true", help="Show the FPS/latency overlay (toggle with M)")
+    parser.add_argument("--log-level", choices=sorted(log.LEVELS, key=log.LEVELS.get),
+                        help="Default: $RGBD_LOG_LEVEL or INFO")
+    parser.add_argument("--offload", type=int, default=OFFLOAD_WORKERS, metavar="N",
+                        help="Segment and encode in N worker processes (default: %(default)s, in-process)")
+    parser.add_argument("--duplicates", choices=["warn", "skip", "off"], default=DUPLICATES or "off",
+                        help="On a near-duplicate capture: warn, skip it, or don't check (default: %(default)s)")
+    args = parser.parse_args(argv)
+    log.setup(args.log_level)
+
+    try:
+        root = tk.Tk()
+        if args.replay:
+            cam = open_camera("replay", path=args.replay, realtime=not args.fast, loop=args.loop)
+        elif args.camera == "synthetic":
+            cam = open_camera("synthetic", camera=args.synthetic_as)
+        else:
+            cam = None
+        app = RGBDCollectorApp(root, cam=cam, record_path=args.record, show_metrics=args.metrics,
+                               offload_workers=args.offload, backend=args.camera, serial=args.serial,
+                               duplicates=None if args.duplicates == "off" else args.duplicates)
+        root.mainloop()
+    except Exception as e:
+        logger.exception("Collector failed: %s", e)
+
+
+if __name__ == "__main__":
+    main()
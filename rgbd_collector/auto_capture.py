@@ -0,0 +1,76 @@
+import numpy as np
+
+
+class SceneTrigger:
+    # Decides when to auto-capture from the depth stream: after a capture (or when
+    # armed) it waits until the scene differs from that reference frame, then until
+    # it has stopped moving for `stable_frames` consecutive frames, and fires once.
+    #
+    # Frames are compared on a strided view (every `step`-th pixel in each
+    # direction), counting pixels valid in both frames whose depth moved by more
+    # than `tolerance` mm + `relative` of the depth (sensor noise grows with range).
+    # 640x480 at step 8 is 4800 pixels per frame.
+    #
+    #   change   - fraction of moved pixels vs the reference that counts as a new scene
+    #   motion   - fraction of moved pixels vs the previous frame still counted as stable
+    def __init__(self, step=8, tolerance=10, relative=0.02, change=0.05, motion=0.01, stable_frames=8):
+        self.step = step
+        self.tolerance = tolerance
+        self.relative = relative
+        self.change = change
+        self.motion = motion
+        self.stable_frames = stable_frames
+        self.state = "idle"
+        self.reference = None
+        self.previous = None
+        self.stable = 0
+        self.last_change = 0.0  # last measured fractions, for the status line
+        self.last_motion = 0.0
+
+    def _sample(self, depth):
+        return depth[::self.step, ::self.step].astype(np.int32)
+
+    def _moved(self, a, b):
+        valid = (a > 0) & (b > 0)
+        count = np.count_nonzero(valid)
+        if count == 0:
+            return 1.0
+        moved = np.count_nonzero(valid & (np.abs(a - b) > self.tolerance + self.relative * b))
+        return moved / count
+
+    def arm(self, depth):
+        # Current scene becomes the reference; the next change is what counts
+        self.reference = self._sample(depth)
+        self.previous = self.reference
+        self.stable = 0
+        self.state = "waiting"
+
+    def disarm(self):
+        self.state = "idle"
+        self.reference = None
+        self.previous = None
+
+    def update(self, depth):
+        # Returns True on the frame the capture should happen
+        if self.state == "idle":
+            return False
+        frame = self._sample(depth)
+        if frame.shape != self.reference.shape:
+            self.arm(depth)
+            return False
+
+        if self.state == "waiting":
+            self.last_change = self._moved(frame, self.reference)
+            if self.last_change > self.change:
+                self.state = "settling"
+                self.stable = 0
+        elif self.state == "settling":
+            self.last_motion = self._moved(frame, self.previous)
+            self.stable = self.stable + 1 if self.last_motion <= self.motion else 0
+            if self.stable >= self.stable_frames:
+                self.reference = frame
+                self.previous = frame
+                self.state = "waiting"
+                return True
+        self.previous = frame
+        return False
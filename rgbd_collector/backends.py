@@ -0,0 +1,62 @@
+# Camera backends by name. A factory imports its camera module only when it is
+# called, so a session loads just the SDK of the backend it opens, and modules
+# that never open a camera (dataset tools, benchmarks) load none. Any backend
+# can be used by the collector app and mixed in a multi-camera session.
+
+
+def _realsense(serial=None, filters=None, align_mode="lazy"):
+    from intel_realsense.camera_interface import CameraInterface
+    return CameraInterface(filters=filters, align_mode=align_mode, serial=serial)
+
+
+def _orbbec(serial=None):
+    from orbbec_femto_bolt.camera_interface import CameraInterface
+    return CameraInterface(serial=serial)
+
+
+def _replay(path, realtime=True, loop=False):
+    from .recording import ReplayCameraInterface
+    return ReplayCameraInterface(path, realtime=realtime, loop=loop)
+
+
+def _synthetic(offset_ms=0.0, **options):
+    # camera="femto_bolt" stands in for a Femto Bolt instead of a RealSense
+    from .synthetic import SyntheticCameraInterface
+    return SyntheticCameraInterface(offset_ms=float(offset_ms), **options)
+
+
+BACKENDS = {
+    "realsense": _realsense,
+    "orbbec": _orbbec,
+    "replay": _replay,
+    "synthetic": _synthetic,
+}
+
+# Option set by the ":<argument>" part of a camera spec
+SPEC_ARGUMENT = {"realsense": "serial", "orbbec": "serial", "replay": "path", "synthetic": "offset_ms"}
+
+
+def register_backend(name, factory, spec_argument=None):
+    BACKENDS[name] = factory
+    if spec_argument is not None:
+        SPEC_ARGUMENT[name] = spec_argument
+
+
+def open_camera(backend, **options):
+    factory = BACKENDS.get(backend)
+    if factory is None:
+        raise ValueError(f"Unknown camera backend {backend!r}, expected one of {sorted(BACKENDS)}")
+    return factory(**options)
+
+
+def parse_camera(spec):
+    # "[name=]backend[:argument]" -> (name, backend, options), e.g.
+    # "left=realsense:123456", "replay:recordings/a", "synthetic:250"
+    name, sep, rest = spec.partition("=")
+    if not sep:
+        name, rest = None, spec
+    backend, _, argument = rest.partition(":")
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown camera backend {backend!r} in {spec!r}, expected one of {sorted(BACKENDS)}")
+    options = {SPEC_ARGUMENT[backend]: argument} if argument else {}
+    return name or backend, backend, options
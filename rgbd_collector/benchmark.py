@@ -0,0 +1,233 @@
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from .segmentation_helper import create_segmentation
+from .annotation_writer import AnnotationWriter
+from .colorize import DepthColorizer
+from .frames import frame_to_bgr_image, frame_to_rgb_image, mjpeg_reduce_factor
+from .synthetic import TARGETS, SyntheticFrame, synthetic_calibration, synthetic_color, synthetic_depth
+
+# Default stream resolutions per camera, (color, depth) as (width, height).
+# RealSense: as configured in camera_interface.py. Femto Bolt: 1080p color, NFOV
+# unbinned depth; 3840x2160 color and 1024x1024 (WFOV) depth can be selected on
+# the command line.
+SIZES = {
+    "realsense": ((640, 480), (640, 480)),
+    "femto_bolt": ((1920, 1080), (640, 576)),
+}
+PREVIEW_SIZE = (960, 540)
+
+
+# --- Timing ---
+
+def measure(fn, min_time=1.0, min_calls=20, max_calls=100000, warmup=3):
+    # Per-call latencies in ms
+    for _ in range(warmup):
+        fn()
+    times = []
+    start = time.perf_counter()
+    while len(times) < max_calls:
+        t0 = time.perf_counter_ns()
+        fn()
+        times.append(time.perf_counter_ns() - t0)
+        if len(times) >= min_calls and time.perf_counter() - start >= min_time:
+            break
+    return np.array(times, dtype=np.float64) / 1e6
+
+
+def summarize(times):
+    p50, p90, p99 = np.percentile(times, [50, 90, 99])
+    return {
+        "calls": int(times.size),
+        "mean_ms": float(times.mean()),
+        "p50_ms": float(p50),
+        "p90_ms": float(p90),
+        "p99_ms": float(p99),
+        "max_ms": float(times.max()),
+        "per_s": float(1000.0 / times.mean()),
+    }
+
+
+# --- Cases ---
+
+def build_cases(camera="realsense", color_size=None, depth_size=None, preview_size=PREVIEW_SIZE, tmp_dir="."):
+    # name -> zero-argument callable; every input is built up front
+    color_size = color_size or SIZES[camera][0]
+    depth_size = depth_size or SIZES[camera][1]
+    width, height = color_size
+    rgb = synthetic_color(color_size)
+    bgr = cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR)
+    depth = synthetic_depth(depth_size, target=TARGETS[camera])
+    seg = create_segmentation(camera)
+    mask = seg.segment(depth)
+    mask_out = np.empty_like(mask)
+    result = seg.analyze(depth)
+    writer = AnnotationWriter()
+    colors = DepthColorizer(seg.min_depth, seg.max_depth)
+    pane_colors = DepthColorizer(seg.min_depth, seg.max_depth, order="rgb")
+    pane_size = (480, 360)
+    capture_size = (480, 260)  # depth panel of the captured-sample view
+    pane_depth = cv2.resize(depth, pane_size, interpolation=cv2.INTER_NEAREST)
+    pane_mask = cv2.resize(mask, pane_size, interpolation=cv2.INTER_NEAREST)
+    pane_buf = np.empty((pane_size[1], pane_size[0]), dtype=np.uint32)
+    label_path = str(Path(tmp_dir) / "bench.txt")
+    rgb_frame = SyntheticFrame(rgb, width, height, "RGB")
+    preview_buf = np.empty((preview_size[1], preview_size[0], 3), dtype=np.uint8)
+
+    cases = {
+        "segment": lambda: seg.segment(depth),
+        "segment.out": lambda: seg.segment(depth, out=mask_out),
+        "analyze": lambda: seg.analyze(depth),
+        "annotation.write": lambda: writer.write(label_path, mask, depth.shape, 0),
+        "annotation.write_result": lambda: writer.write_result(label_path, result, depth.shape, 0),
+        "preview.resize": lambda: cv2.resize(rgb, preview_size, dst=preview_buf, interpolation=cv2.INTER_AREA),
+        "preview.image": lambda: Image.frombuffer("RGB", preview_size, preview_buf, "raw", "RGB", 0, 1),
+        "colorize.frame": lambda: colors.colorize(depth),
+        "colorize.capture": lambda: colors.colorize(
+            cv2.resize(depth, capture_size, interpolation=cv2.INTER_NEAREST)),
+        "colorize.minmax": lambda: cv2.resize(cv2.applyColorMap(
+            cv2.normalize(depth, None, 0, 255, cv2.NORM_MINMAX).astype(np.uint8), cv2.COLORMAP_JET), capture_size),
+        "preview.depth_pane": lambda: pane_colors.lookup(pane_depth, pane_mask, out=pane_buf),
+    }
+
+    if camera == "femto_bolt":
+        # Color arrives as RGB, BGR or MJPG and depth is registered on capture
+        from orbbec_femto_bolt.registration import DepthRegistration
+
+        registration = DepthRegistration(synthetic_calibration(color_size, depth_size))
+        jpeg = cv2.imencode(".jpg", bgr, [cv2.IMWRITE_JPEG_QUALITY, 90])[1].tobytes()
+        bgr_frame = SyntheticFrame(bgr, width, height, "BGR")
+        mjpg_frame = SyntheticFrame(jpeg, width, height, "MJPG")
+        reduce = mjpeg_reduce_factor(width, height, preview_size)
+        cases.update({
+            "convert.rgb": lambda: frame_to_bgr_image(rgb_frame),
+            "convert.bgr": lambda: frame_to_bgr_image(bgr_frame),
+            "convert.mjpg": lambda: frame_to_bgr_image(mjpg_frame),
+            f"convert.mjpg_preview_1/{reduce}": lambda: frame_to_rgb_image(mjpg_frame, reduce),
+            "register": lambda: registration.register(depth, (height, width)),
+            "encode.jpg": lambda: cv2.imencode(".jpg", bgr),
+        })
+    else:
+        # rgb8 color stream; depth is aligned by the SDK
+        cases.update({
+            "convert.rgb": lambda: frame_to_rgb_image(rgb_frame),
+            "convert.bgr": lambda: frame_to_bgr_image(rgb_frame),
+            "encode.jpg": lambda: cv2.imencode(".jpg", rgb),
+        })
+    return cases
+
+
+# --- Reporting ---
+
+def print_table(results, baseline=None):
+    header = f"{'case':<30}{'calls':>8}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'per s':>10}"
+    if baseline is not None:
+        header += f"{'vs base':>10}"
+    print(header)
+    for name, r in results.items():
+        line = f"{name:<30}{r['calls']:>8}{r['p50_ms']:>10.3f}{r['p90_ms']:>10.3f}{r['p99_ms']:>10.3f}{r['per_s']:>10.0f}"
+        if baseline is not None and name in baseline:
+            line += f"{r['p50_ms'] / baseline[name]['p50_ms'] - 1:>+10.1%}"
+        print(line)
+
+
+def compare(results, baseline, threshold=0.15, metric="p50_ms"):
+    # Cases whose metric got slower than the baseline by more than threshold
+    regressions = []
+    for name, r in results.items():
+        base = baseline.get(name)
+        if base is None or base[metric] <= 0:
+            continue
+        change = r[metric] / base[metric] - 1
+        if change > threshold:
+            regressions.append((name, base[metric], r[metric], change))
+    return regressions
+
+
+def environment():
+    return {
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "threads": cv2.getNumThreads(),
+    }
+
+
+def run(names=None, min_time=1.0, camera="realsense", color_size=None, depth_size=None):
+    with tempfile.TemporaryDirectory() as tmp:
+        cases = build_cases(camera, color_size, depth_size, tmp_dir=tmp)
+        results = {}
+        for name, fn in cases.items():
+            if names and not any(n in name for n in names):
+                continue
+            results[name] = summarize(measure(fn, min_time=min_time))
+    return results
+
+
+def _size(text):
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the capture, segmentation and annotation hot paths")
+    parser.add_argument("cases", nargs="*", help="Only run cases whose name contains one of these")
+    parser.add_argument("--min-time", type=float, default=1.0, help="Seconds to spend per case")
+    parser.add_argument("--camera", choices=sorted(SIZES), default="realsense",
+                        help="Camera whose resolutions, depth range and conversions to benchmark")
+    parser.add_argument("--color-size", type=_size, default=None, help="WxH (default: the camera's)")
+    parser.add_argument("--depth-size", type=_size, default=None, help="WxH (default: the camera's)")
+    parser.add_argument("--threads", type=int, default=None, help="cv2.setNumThreads (0 = single-threaded)")
+    parser.add_argument("--json", help="Write results to this file")
+    parser.add_argument("--baseline", help="Compare against results saved with --json")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Allowed p50 slowdown vs the baseline")
+    args = parser.parse_args()
+
+    args.color_size = args.color_size or SIZES[args.camera][0]
+    args.depth_size = args.depth_size or SIZES[args.camera][1]
+    if args.threads is not None:
+        cv2.setNumThreads(args.threads)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            report = json.load(f)
+        if report.get("camera") != args.camera:
+            print(f"[WARNING] Baseline was measured for camera {report.get('camera')}")
+        if report["color_size"] != list(args.color_size) or report["depth_size"] != list(args.depth_size):
+            print(f"[WARNING] Baseline was measured at color {report['color_size']}, depth {report['depth_size']}")
+        baseline = report["results"]
+
+    results = run(args.cases, args.min_time, args.camera, args.color_size, args.depth_size)
+    print_table(results, baseline)
+
+    if args.json:
+        report = {
+            "camera": args.camera,
+            "color_size": list(args.color_size),
+            "depth_size": list(args.depth_size),
+            "environment": environment(),
+            "results": results,
+        }
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"[INFO] Results written to {args.json}")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+        for name, before, after, change in regressions:
+            print(f"[REGRESSION] {name}: p50 {before:.3f} -> {after:.3f} ms ({change:+.1%})")
+        if regressions:
+            sys.exit(1)
+        print(f"[INFO] No regressions beyond {args.threshold:.0%}")
@@ -0,0 +1,133 @@
+import logging
+from functools import partial
+
+import cv2
+
+from .frames import read_frameset, read_frames, full_color_bgr, decode_mjpeg
+from .metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+# How each kind of camera turns what FrameGrabber buffered into the saved
+# full-quality (BGR, depth) pair. The app and multi-camera sessions only talk
+# to a step, so any mix of cameras runs through the same code:
+#
+#   step.read                  - FrameGrabber read function
+#   step.start()               - once streams are up; sets step.intrinsics (of the saved depth)
+#   step.recorder_options()    - convert/camera/extra arguments for a Recorder
+#   step.process(packet)       - (BGR, depth) for a buffered packet, or None
+#
+# A camera object names its kind in `camera` ("realsense" if it doesn't).
+
+
+class AlignedCapture:
+    # RealSense: raw framesets in the ring, depth aligned to color by the SDK on capture
+    camera = "realsense"
+
+    def __init__(self, cam, preview_size=None):
+        self.cam = cam
+        self.read = read_frameset
+        self.intrinsics = None
+
+    def start(self):
+        try:
+            # Of the aligned depth, i.e. the color stream
+            self.intrinsics = tuple(self.cam.get_intrinsics())
+        except Exception as e:
+            logger.warning("No intrinsics available, point clouds can't be exported: %s", e)
+            self.intrinsics = None
+
+    def recorder_options(self):
+        # Aligned frames are stored, aligned on the recorder's writer thread
+        return {
+            "convert": lambda color, depth, frameset: self.cam.align_frameset(frameset),
+            "camera": self.camera,
+            "extra": {"intrinsics": self.intrinsics} if self.intrinsics is not None else None,
+        }
+
+    def process(self, packet):
+        # Alignment only happens here, not on preview frames
+        with METRICS.measure("capture.align"):
+            aligned = self.cam.aligned(packet.payload)
+        if aligned is None:
+            logger.error("Could not align the captured frame")
+            return None
+        color, depth = aligned
+        # The ring holds RGB; the saved image and the review panel are BGR
+        return cv2.cvtColor(color, cv2.COLOR_RGB2BGR), depth
+
+
+class RegisteredCapture:
+    # Femto Bolt: color and raw depth in the ring (MJPG decoded at preview size),
+    # full decode and depth -> color registration on capture
+    camera = "femto_bolt"
+
+    def __init__(self, cam, preview_size=None):
+        self.cam = cam
+        self.read = partial(read_frames, preview_size=preview_size)
+        self.registration = None
+        self.calibration = None
+        self.intrinsics = None
+
+    def start(self):
+        # Registration tables are built on the first capture
+        from orbbec_femto_bolt.registration import DepthRegistration
+
+        try:
+            self.calibration = self.cam.get_calibration()
+            self.registration = DepthRegistration(self.calibration)
+        except Exception as e:
+            logger.warning("No calibration available, depth will not be registered: %s", e)
+            self.calibration = None
+            self.registration = None
+        # Registered depth has the color camera's geometry
+        self.intrinsics = self.calibration["color"] if self.calibration is not None else None
+
+    def recorder_options(self):
+        # Full-size RGB and raw depth; the calibration goes along so replays
+        # can register depth exactly like a live session
+        return {
+            "convert": self._recording_frames,
+            "camera": self.camera,
+            "extra": {"calibration": self.calibration} if self.calibration is not None else None,
+        }
+
+    def _recording_frames(self, color, depth, payload):
+        # Runs on the recorder's writer thread
+        if payload and "mjpeg" in payload:
+            bgr = decode_mjpeg(payload["mjpeg"])
+            if bgr is None:
+                return None
+            color = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+        return color, depth
+
+    def process(self, packet):
+        # The ring holds RGB (preview-size for MJPG); saving and review use full-size BGR
+        bgr = full_color_bgr(packet)
+        if bgr is None:
+            # Corrupt MJPG frame
+            logger.error("Could not decode the captured color frame")
+            return None
+        if self.registration is not None:
+            # Registered depth has the color image's geometry, so the mask and the
+            # polygon line up with (and are normalized against) the saved RGB
+            with METRICS.measure("capture.register"):
+                depth = self.registration.register(packet.depth, bgr.shape[:2])
+        else:
+            depth = packet.depth.copy()
+        return bgr, depth
+
+
+CAPTURE_STEPS = {
+    "realsense": AlignedCapture,
+    "femto_bolt": RegisteredCapture,
+}
+
+
+def capture_step(cam, preview_size=None):
+    # The capture step for a camera object, by its `camera` kind
+    kind = getattr(cam, "camera", "realsense")
+    step = CAPTURE_STEPS.get(kind)
+    if step is None:
+        raise ValueError(f"Unknown camera kind {kind!r}, expected one of {sorted(CAPTURE_STEPS)}")
+    return step(cam, preview_size)
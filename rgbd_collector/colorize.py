@@ -0,0 +1,68 @@
+import threading
+
+import cv2
+import numpy as np
+
+# Lookup tables, shared by all DepthColorizer instances:
+# (min_depth, max_depth, colormap, order, dim) -> table
+_TABLES = {}
+_TABLES_LOCK = threading.Lock()
+
+
+class DepthColorizer:
+    # uint16 depth (mm) -> color with one table lookup per pixel.
+    #
+    # The table holds a packed 32-bit color (3 channels + padding) for every
+    # possible depth value, so colorizing is a single np.take with no float
+    # intermediate, and colors stay put from frame to frame (fixed min_depth..
+    # max_depth range instead of a per-frame min-max normalization). Depth 0
+    # (no data) is black; values outside the range clip to the end colors.
+    # A second half of the table holds the same colors dimmed: with a {0, 1}
+    # mask, pixels outside the mask are looked up there, so one pass draws the
+    # depth and the segmentation together.
+    def __init__(self, min_depth, max_depth, colormap=cv2.COLORMAP_JET, order="bgr", dim=0.35):
+        if max_depth <= min_depth:
+            raise ValueError("max_depth must be greater than min_depth")
+        self.min_depth = min_depth
+        self.max_depth = max_depth
+        self.order = order
+        key = (min_depth, max_depth, colormap, order, dim)
+        with _TABLES_LOCK:
+            table = _TABLES.get(key)
+            if table is None:
+                table = self._build(min_depth, max_depth, colormap, order, dim)
+                _TABLES[key] = table
+        self._table = table             # [dimmed | full], indexed by depth | mask << 16
+        self._full = table[1 << 16:]    # full colors only, indexed by depth
+        self._index = {}                # scratch index arrays keyed by frame shape
+
+    @staticmethod
+    def _build(min_depth, max_depth, colormap, order, dim):
+        depth = np.arange(1 << 16, dtype=np.float32)
+        scaled = np.clip((depth - min_depth) * (255.0 / (max_depth - min_depth)), 0, 255).astype(np.uint8)
+        colors = cv2.applyColorMap(scaled.reshape(-1, 1), colormap).reshape(-1, 3)  # BGR
+        if order == "rgb":
+            colors = colors[:, ::-1]
+        colors[0] = 0
+
+        table = np.zeros((2 << 16, 4), dtype=np.uint8)
+        table[:1 << 16, :3] = (colors * dim).astype(np.uint8)
+        table[1 << 16:, :3] = colors
+        return table.view(np.uint32).ravel()
+
+    def lookup(self, depth, mask=None, out=None):
+        # Packed colors as an (H, W) uint32 array; .view(np.uint8) gives (H, W * 4)
+        # bytes in BGRX (or RGBX) order, which PIL can read directly
+        if mask is None:
+            return np.take(self._full, depth, out=out)
+        index = self._index.get(depth.shape)
+        if index is None:
+            index = self._index[depth.shape] = np.empty(depth.shape, dtype=np.int32)
+        np.left_shift(mask, 16, out=index, dtype=np.int32)
+        np.bitwise_or(index, depth, out=index)
+        return np.take(self._table, index, out=out)
+
+    def colorize(self, depth, mask=None):
+        # (H, W, 3) uint8 image in this colorizer's channel order
+        packed = self.lookup(depth, mask)
+        return cv2.cvtColor(packed.view(np.uint8).reshape(depth.shape + (4,)), cv2.COLOR_BGRA2BGR)
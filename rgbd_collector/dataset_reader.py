@@ -0,0 +1,205 @@
+import argparse
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from .annotation_writer import read_label
+from .depth_store import open_depth_store
+from .manifest import MANIFEST_NAME
+
+
+class Sample:
+    def __init__(self, name, label_class, rgb, depth, polygons):
+        self.name = name
+        self.label_class = label_class
+        self.rgb = rgb            # (H, W, 3) uint8, RGB (or BGR, see DatasetReader)
+        self.depth = depth        # (H, W) uint16 mm; read-only memmap when mmap=True
+        self.polygons = polygons  # [(label_class, Nx2 float32 normalized x/y), ...]
+
+
+class LRUCache:
+    # Bounded, thread-safe mapping that evicts the least recently used entry
+    def __init__(self, size):
+        self.size = size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        if self.size <= 0:
+            return
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.size:
+                self._items.popitem(last=False)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._items
+
+
+class DatasetReader:
+    # Streams (RGB, depth, polygons) samples of a dataset written by the collector.
+    #
+    #   reader = DatasetReader("dataset", shuffle=True, shard=(rank, world_size))
+    #   for epoch in range(epochs):
+    #       for sample in reader.epoch(epoch):
+    #           ...
+    #
+    # Decoding runs on a thread pool (JPEG/PNG decoding and file reads release the
+    # GIL) and up to `prefetch` samples are kept in flight ahead of the consumer.
+    # Decoded samples go into an LRU cache of `cache_size` entries (shared with the
+    # consumer, so copy arrays before modifying them in place). With mmap=True,
+    # .npy depth is memory-mapped instead of read (raw shards are always mapped).
+    #
+    # Shuffling uses seed + epoch, so every shard sees the same permutation and
+    # the shards (every shard[1]-th sample from shard[0]) stay disjoint.
+    def __init__(self, root, label_class=None, shuffle=False, seed=0, shard=(0, 1), mmap=True,
+                 cache_size=256, prefetch=16, workers=4, rgb=True, bgr=False):
+        self.root = Path(root)
+        self.shuffle = shuffle
+        self.seed = seed
+        self.shard = shard
+        self.mmap = mmap
+        self.load_rgb = rgb
+        self.bgr = bgr
+        self.prefetch_depth = max(prefetch, 1)
+        self.depth = open_depth_store(self.root / "depth")
+        self.cache = LRUCache(cache_size)
+        self.records = [r for r in self._index() if label_class is None or r["class"] == label_class]
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="dataset-reader")
+
+    def _index(self):
+        # Manifest records, read-only; datasets without a manifest are listed from images/
+        path = self.root / MANIFEST_NAME
+        if path.exists():
+            with open(path) as f:
+                records = [json.loads(line) for line in f if line.strip()]
+            return sorted(records, key=lambda r: r["id"])
+        records = []
+        for name in sorted(p.stem for p in (self.root / "images").glob("*.jpg")):
+            label = self.root / "labels" / f"{name}.txt"
+            polygons = read_label(label) if label.exists() else []
+            records.append({"name": name, "class": polygons[0][0] if polygons else None})
+        return records
+
+    def __len__(self):
+        index, count = self.shard
+        return len(range(index, len(self.records), count))
+
+    def order(self, epoch=0):
+        # Record indices this shard reads in the given epoch
+        order = np.arange(len(self.records))
+        if self.shuffle:
+            np.random.default_rng((self.seed, epoch)).shuffle(order)
+        index, count = self.shard
+        return order[index::count]
+
+    def load(self, i):
+        record = self.records[i]
+        name = record["name"]
+        sample = self.cache.get(name)
+        if sample is not None:
+            return sample
+
+        rgb = None
+        if self.load_rgb:
+            rgb = cv2.imread(str(self.root / "images" / f"{name}.jpg"), cv2.IMREAD_COLOR)
+            if rgb is None:
+                raise FileNotFoundError(self.root / "images" / f"{name}.jpg")
+            if not self.bgr:
+                cv2.cvtColor(rgb, cv2.COLOR_BGR2RGB, dst=rgb)
+        depth = self.depth.get(name, mmap=self.mmap)
+        label = self.root / "labels" / f"{name}.txt"
+        polygons = read_label(label) if label.exists() else []
+
+        sample = Sample(name, record["class"], rgb, depth, polygons)
+        self.cache.put(name, sample)
+        return sample
+
+    def __getitem__(self, i):
+        # i-th sample of this shard, in dataset order
+        index, count = self.shard
+        return self.load(range(index, len(self.records), count)[i])
+
+    def prefetch(self, indices):
+        # Start loading records into the cache without waiting for them
+        for i in indices:
+            if self.records[i]["name"] not in self.cache:
+                self._pool.submit(self.load, int(i))
+
+    def epoch(self, epoch=0):
+        # Generator over this shard's samples, decoded ahead on the thread pool
+        order = iter(self.order(epoch))
+        pending = deque()
+        try:
+            for i in order:
+                pending.append(self._pool.submit(self.load, int(i)))
+                if len(pending) >= self.prefetch_depth:
+                    break
+            while pending:
+                sample = pending.popleft().result()
+                i = next(order, None)
+                if i is not None:
+                    pending.append(self._pool.submit(self.load, int(i)))
+                yield sample
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def __iter__(self):
+        return self.epoch(0)
+
+    def close(self):
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        self.depth.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Read through a dataset and report throughput")
+    parser.add_argument("--dataset", default="dataset")
+    parser.add_argument("--epochs", type=int, default=2)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--prefetch", type=int, default=16)
+    parser.add_argument("--cache-size", type=int, default=256)
+    parser.add_argument("--shuffle", action="store_true")
+    args = parser.parse_args()
+
+    with DatasetReader(args.dataset, shuffle=args.shuffle, workers=args.workers, prefetch=args.prefetch,
+                       cache_size=args.cache_size) as reader:
+        for epoch in range(args.epochs):
+            start = time.perf_counter()
+            points = 0
+            for sample in reader.epoch(epoch):
+                points += sum(len(p) for _, p in sample.polygons)
+            elapsed = time.perf_counter() - start
+            print(f"[INFO] Epoch {epoch}: {len(reader)} samples in {elapsed:.2f}s "
+                  f"({len(reader) / max(elapsed, 1e-9):.0f} samples/s, {points} polygon points)")
+        print(f"[INFO] Cache: {reader.cache.hits} hits, {reader.cache.misses} misses")
@@ -0,0 +1,370 @@
+import argparse
+import itertools
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from .depth_store import open_depth_store
+from .save_pipeline import atomic_save_npy
+from .manifest import MANIFEST_NAME
+
+logger = logging.getLogger(__name__)
+
+HASHES_NAME = "hashes.bin"
+DUPLICATES_DIR = "duplicates"
+
+# One fixed-size record per sample, appended to <dataset>/hashes.bin and read
+# back as a memory map: opening the index costs the same at 100 or 500k samples
+RECORD_DTYPE = np.dtype([("id", "<i8"), ("rgb", "<u8"), ("depth", "<u8"), ("name", "S32")])
+
+# Samples closer than this (summed Hamming distance of both 64-bit hashes, out
+# of 128 bits) count as near-duplicates
+DEFAULT_DISTANCE = 8
+
+
+# --- Hashes ---
+
+def _pack(bits):
+    # 64 booleans -> uint64
+    return np.packbits(bits.ravel()).view(">u8")[0].astype(np.uint64)
+
+
+def image_hash(image):
+    # 64-bit difference hash: grayscale, 9x8 area average, sign of each
+    # horizontal step. Stable under JPEG noise and small exposure changes.
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA).astype(np.int16)
+    return _pack(small[:, 1:] > small[:, :-1])
+
+
+def depth_hash(depth, step=4):
+    # Difference hash of the depth map, downsampled first. Pixels without depth
+    # are left out of the 9x8 averages instead of pulling them towards 0.
+    depth = np.asarray(depth)[::step, ::step]
+    values = depth.astype(np.float32)
+    valid = (depth > 0).astype(np.float32)
+    total = cv2.resize(values, (9, 8), interpolation=cv2.INTER_AREA)
+    count = cv2.resize(valid, (9, 8), interpolation=cv2.INTER_AREA)
+    mean = np.divide(total, count, out=np.zeros_like(total), where=count > 0)
+    return _pack(mean[:, 1:] > mean[:, :-1])
+
+
+def sample_hashes(bgr, depth):
+    return image_hash(bgr), depth_hash(depth)
+
+
+if hasattr(np, "bitwise_count"):
+    def popcount(values):
+        return np.bitwise_count(values)
+else:
+    _BITS = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def popcount(values):
+        return _BITS[values.view(np.uint8)].reshape(values.shape + (8,)).sum(axis=-1, dtype=np.uint8)
+
+
+class DedupeIndex:
+    # Perceptual hashes (RGB + depth) of every sample in a dataset, kept up to
+    # date by the collector as samples are saved. nearest() scans the whole
+    # index with a few vectorized operations (a few ms per 100k samples).
+    # Save workers add while the GUI thread queries, hence the lock.
+    def __init__(self, root):
+        self.root = Path(root)
+        self.path = self.root / HASHES_NAME
+        self._lock = threading.Lock()
+        self._mapped = np.zeros(0, dtype=RECORD_DTYPE)  # records in the file when it was opened
+        # Records added since, in a buffer that grows geometrically, so adding a
+        # sample never copies the whole index. Rows below _count are never written
+        # again, so readers can use them outside the lock.
+        self._tail = np.zeros(0, dtype=RECORD_DTYPE)
+        self._count = 0
+        if self.path.exists():
+            size = self.path.stat().st_size
+            count = size // RECORD_DTYPE.itemsize
+            if size % RECORD_DTYPE.itemsize:
+                # Torn last record from a crash mid-append
+                with open(self.path, "rb+") as f:
+                    f.truncate(count * RECORD_DTYPE.itemsize)
+                logger.warning("Hash index had an incomplete last record, truncated it.")
+            if count:
+                self._mapped = np.memmap(self.path, dtype=RECORD_DTYPE, mode="r", shape=(count,))
+
+    def __len__(self):
+        with self._lock:
+            return len(self._mapped) + self._count
+
+    def _parts(self):
+        # (mapped records, added records), searched separately
+        with self._lock:
+            return self._mapped, self._tail[:self._count]
+
+    def records(self):
+        # All records as one array; a copy once samples have been added
+        mapped, added = self._parts()
+        return np.concatenate([mapped, added]) if len(added) else mapped
+
+    def names(self):
+        return {name.decode() for part in self._parts() for name in part["name"]}
+
+    def add(self, name, sample_id, hashes):
+        self.add_many([(sample_id, hashes[0], hashes[1], name.encode())])
+
+    def add_many(self, rows):
+        # rows: [(sample_id, rgb hash, depth hash, name bytes)]
+        if not rows:
+            return
+        records = np.array(rows, dtype=RECORD_DTYPE)
+        with self._lock:
+            with open(self.path, "ab") as f:
+                f.write(records.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            count = self._count + len(records)
+            if count > len(self._tail):
+                tail = np.zeros(max(count, 2 * len(self._tail), 64), dtype=RECORD_DTYPE)
+                tail[:self._count] = self._tail[:self._count]
+                self._tail = tail
+            self._tail[self._count:count] = records
+            self._count = count
+
+    @staticmethod
+    def _distances(records, hashes):
+        rgb, depth = hashes
+        return (popcount(records["rgb"] ^ np.uint64(rgb)).astype(np.int32)
+                + popcount(records["depth"] ^ np.uint64(depth)))
+
+    def distances(self, hashes):
+        return np.concatenate([self._distances(part, hashes) for part in self._parts()])
+
+    def nearest(self, hashes):
+        # (name, distance) of the closest indexed sample, or (None, None)
+        name, distance = None, None
+        for part in self._parts():
+            if len(part):
+                distances = self._distances(part, hashes)
+                i = int(np.argmin(distances))
+                if distance is None or distances[i] < distance:
+                    name, distance = part["name"][i].decode(), int(distances[i])
+        return name, distance
+
+
+# --- Bulk hashing of existing samples ---
+
+_worker = {}
+
+
+def _init_worker(root):
+    cv2.setNumThreads(1)
+    root = Path(root)
+    _worker["root"] = root
+    _worker["depth"] = open_depth_store(root / "depth")
+
+
+def _hash(task):
+    name, sample_id = task
+    # The hash only looks at 9x8 averages, so the JPEG is decoded at 1/4 size
+    image = cv2.imread(str(_worker["root"] / "images" / f"{name}.jpg"), cv2.IMREAD_REDUCED_GRAYSCALE_4)
+    if image is None:
+        return None
+    try:
+        depth = _worker["depth"].get(name, mmap=True)
+    except (FileNotFoundError, KeyError):
+        return None
+    return sample_id, image_hash(image), depth_hash(depth), name.encode()
+
+
+def _samples(root):
+    # (name, id) of every sample, in id order
+    path = root / MANIFEST_NAME
+    if path.exists():
+        with open(path) as f:
+            records = [json.loads(line) for line in f if line.strip()]
+        return [(r["name"], r["id"]) for r in sorted(records, key=lambda r: r["id"])]
+    return [(p.stem, i) for i, p in enumerate(sorted((root / "images").glob("*.jpg")))]
+
+
+def update_index(root, workers=None, chunksize=64):
+    # Hashes every sample the index doesn't know yet; returns the index
+    root = Path(root)
+    index = DedupeIndex(root)
+    known = index.names()
+    tasks = [(name, sample_id) for name, sample_id in _samples(root) if name not in known]
+    if tasks:
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(str(root),)) as pool:
+            rows = [row for row in pool.map(_hash, tasks, chunksize=chunksize) if row is not None]
+        index.add_many(rows)
+        elapsed = time.perf_counter() - start
+        print(f"[INFO] Hashed {len(rows)} new samples in {elapsed:.1f}s "
+              f"({len(tasks) - len(rows)} unreadable, {len(index)} indexed)")
+    return index
+
+
+# --- Duplicate search ---
+
+# At most this many bit ranges, so each is 21+ bits wide: narrower ranges share
+# values between too many unrelated samples
+MAX_RANGES = 6
+
+
+def _ranges(distance):
+    # Splits the 128 bits into ranges such that two keys within `distance` differ
+    # in at most `radius` bits on at least one range (pigeonhole). Returns
+    # [(shift, mask, flips)], flips being every <= radius bit change in the range.
+    count = min(distance + 1, MAX_RANGES)
+    radius = distance // count
+    ranges = []
+    for bits in np.array_split(np.arange(128), count):
+        shift, width = int(bits[0]), len(bits)
+        flips = [0]
+        for r in range(1, radius + 1):
+            flips += [sum(1 << b for b in combo) for combo in itertools.combinations(range(width), r)]
+        ranges.append((shift, (1 << width) - 1, flips))
+    return ranges
+
+
+def find_duplicates(records, distance=DEFAULT_DISTANCE):
+    # Greedy pass in dataset order: a sample within `distance` of an earlier kept
+    # sample is a duplicate of it, otherwise it is kept. Returns [(i, j, d)]:
+    # record i duplicates kept record j at distance d.
+    #
+    # Candidates come from multi-index hashing: each kept sample is filed under
+    # its value of every bit range (see _ranges), and a new sample only looks up
+    # the values within `radius` of its own. Cost grows with the dataset size,
+    # not its square, and duplicates are never filed, so long runs of the same
+    # view don't slow it down.
+    keys = [(rgb << 64) | depth for rgb, depth in zip(records["rgb"].tolist(), records["depth"].tolist())]
+    ranges = _ranges(distance)
+    tables = [{} for _ in ranges]
+    lookups = [(table.get, flips) for table, (_, _, flips) in zip(tables, ranges)]
+    duplicates = []
+    for i, key in enumerate(keys):
+        values = [(key >> shift) & mask for shift, mask, _ in ranges]
+        best, best_distance = None, distance + 1
+        for (get, flips), value in zip(lookups, values):
+            for flip in flips:
+                hits = get(value ^ flip)
+                if hits:
+                    for j in hits:
+                        d = (key ^ keys[j]).bit_count()
+                        if d < best_distance:
+                            best, best_distance = j, d
+        if best is not None:
+            duplicates.append((i, best, best_distance))
+            continue
+        for table, value in zip(tables, values):
+            table.setdefault(value, []).append(i)
+    return duplicates
+
+
+def move_duplicates(root, names):
+    # Moves the duplicates' files to <dataset>/duplicates/ and drops them from
+    # the manifest and the hash index (both rewritten atomically). Their manifest
+    # records go to duplicates/manifest.jsonl, pointing at the moved files.
+    root = Path(root)
+    names = set(names)
+    target = root / DUPLICATES_DIR
+    moved = 0
+    for sub, pattern in (("images", "{}.jpg"), ("labels", "{}.txt"), ("points", "{}.ply"), ("points", "{}.npy")):
+        for name in names:
+            path = root / sub / pattern.format(name)
+            if path.exists():
+                (target / sub).mkdir(parents=True, exist_ok=True)
+                shutil.move(str(path), str(target / sub / path.name))
+                moved += 1
+
+    # Depth goes through the store, whatever format holds it: a sharded frame
+    # can't be moved as a file, so every frame is kept as .npy and then deleted
+    # (a tombstone in the shard index, an unlink for png/npy)
+    depth_store = open_depth_store(root / "depth")
+    for name in names:
+        if name in depth_store:
+            (target / "depth").mkdir(parents=True, exist_ok=True)
+            atomic_save_npy(str(target / "depth" / f"{name}.npy"), np.array(depth_store.get(name)))
+            depth_store.delete(name)
+            moved += 1
+    depth_store.close()
+
+    manifest = root / MANIFEST_NAME
+    if manifest.exists():
+        kept = []
+        removed = []
+        with open(manifest) as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    if record["name"] in names:
+                        removed.append(record)
+                    else:
+                        kept.append(line if line.endswith("\n") else line + "\n")
+        tmp = manifest.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            f.writelines(kept)
+        os.replace(tmp, manifest)
+        if removed:
+            target.mkdir(parents=True, exist_ok=True)
+            with open(target / MANIFEST_NAME, "a") as f:
+                for record in removed:
+                    _moved_record(record)
+                    f.write(json.dumps(record) + "\n")
+
+    index = DedupeIndex(root)
+    records = index.records()
+    keep = np.array([name.decode() not in names for name in records["name"]], dtype=bool)
+    tmp = index.path.with_suffix(".tmp")
+    with open(tmp, "wb") as f:
+        f.write(np.ascontiguousarray(records[keep]).tobytes())
+    del index, records
+    os.replace(tmp, root / HASHES_NAME)
+    return moved
+
+
+def _moved_record(record):
+    # Paths relative to the dataset root, as in the main manifest
+    name = record["name"]
+    for key in ("image", "label"):
+        if record.get(key):
+            record[key] = f"{DUPLICATES_DIR}/{record[key]}"
+    if record.get("depth"):
+        record["depth"] = f"{DUPLICATES_DIR}/depth/{name}.npy"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find near-duplicate samples in a dataset")
+    parser.add_argument("--dataset", default="dataset")
+    parser.add_argument("--distance", type=int, default=DEFAULT_DISTANCE,
+                        help="Max summed Hamming distance of the RGB and depth hashes (0-128)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--chunksize", type=int, default=64)
+    parser.add_argument("--move", action="store_true",
+                        help=f"Move duplicates to <dataset>/{DUPLICATES_DIR}/ (don't run while collecting)")
+    args = parser.parse_args()
+
+    index = update_index(args.dataset, args.workers, args.chunksize)
+    records = index.records()
+    start = time.perf_counter()
+    duplicates = find_duplicates(records, args.distance)
+    elapsed = time.perf_counter() - start
+    print(f"[INFO] {len(duplicates)} near-duplicates among {len(records)} samples "
+          f"(distance <= {args.distance}, searched in {elapsed:.1f}s)")
+
+    report = Path(args.dataset) / "duplicates.jsonl"
+    with open(report, "w") as f:
+        for i, j, d in duplicates:
+            f.write(json.dumps({"name": records["name"][i].decode(), "duplicate_of": records["name"][j].decode(),
+                                "distance": d}) + "\n")
+    print(f"[INFO] Report written to {report}")
+
+    if args.move and duplicates:
+        names = [records["name"][i].decode() for i, _, _ in duplicates]
+        del index, records
+        moved = move_duplicates(args.dataset, names)
+        print(f"[INFO] Moved {moved} files of {len(names)} samples to {Path(args.dataset) / DUPLICATES_DIR}")
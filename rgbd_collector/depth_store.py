@@ -0,0 +1,335 @@
+import argparse
+import json
+import logging
+import mmap
+import os
+import threading
+import zlib
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from .save_pipeline import atomic_write_bytes, atomic_save_npy
+from . import log
+
+logger = logging.getLogger(__name__)
+
+INDEX_NAME = "index.jsonl"
+SHARD_SIZE = 256 * 1024 * 1024
+
+
+class FileDepthStore:
+    # One file per frame: <directory>/<name><extension>
+    extension = None
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def path(self, name):
+        return self.directory / f"{name}{self.extension}"
+
+    def __contains__(self, name):
+        return self.path(name).exists()
+
+    def names(self):
+        return sorted(p.stem for p in self.directory.glob(f"*{self.extension}"))
+
+    def signatures(self):
+        # {name: (size, mtime_ns)}, changes whenever a frame is rewritten
+        signatures = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.endswith(self.extension):
+                    stat = entry.stat()
+                    signatures[entry.name[:-len(self.extension)]] = (stat.st_size, stat.st_mtime_ns)
+        return signatures
+
+    def delete(self, name):
+        try:
+            self.path(name).unlink()
+        except FileNotFoundError:
+            pass
+
+    def close(self):
+        pass
+
+
+class NpyDepthStore(FileDepthStore):
+    # Uncompressed .npy, the original format. Supports memory-mapped reads.
+    extension = ".npy"
+
+    def put(self, name, depth):
+        path = str(self.path(name))
+        atomic_save_npy(path, depth)
+        return path
+
+    def get(self, name, mmap=False):
+        return np.load(self.path(name), mmap_mode="r" if mmap else None)
+
+
+class PngDepthStore(FileDepthStore):
+    # Lossless 16-bit PNG, typically 3-5x smaller than .npy for depth maps
+    extension = ".png"
+
+    def __init__(self, directory, compression=1):
+        super().__init__(directory)
+        self.params = [cv2.IMWRITE_PNG_COMPRESSION, compression]
+
+    def put(self, name, depth):
+        if depth.dtype != np.uint16:
+            raise ValueError(f"PNG depth store needs uint16 depth, got {depth.dtype}")
+        ok, encoded = cv2.imencode(".png", depth, self.params)
+        if not ok:
+            raise RuntimeError("PNG encoding failed")
+        path = str(self.path(name))
+        atomic_write_bytes(path, encoded.tobytes())
+        return path
+
+    def get(self, name, mmap=False):
+        depth = cv2.imread(str(self.path(name)), cv2.IMREAD_UNCHANGED)
+        if depth is None:
+            raise FileNotFoundError(self.path(name))
+        return depth
+
+
+class ShardedDepthStore:
+    # Many frames per file. Frames are appended to shard_NNNNN.bin (zlib chunks,
+    # or raw bytes with compression=None) and located through index.jsonl:
+    #   {"name", "shard", "offset", "length", "shape", "dtype", "codec"}
+    # A frame is only indexed after its bytes are on disk, so a crash leaves at
+    # most some unreferenced bytes at the end of a shard. delete() appends a
+    # {"name", "deleted": true} tombstone; the frame's bytes stay in the shard.
+    def __init__(self, directory, compression="zlib", level=1, shard_size=SHARD_SIZE):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.directory / INDEX_NAME
+        self.compression = compression
+        self.level = level
+        self.shard_size = shard_size
+
+        self._lock = threading.Lock()
+        self._maps = {}
+        self._index = {}
+        self._shard = 0
+        self._load_index()
+
+    def _shard_path(self, shard):
+        return self.directory / f"shard_{shard:05d}.bin"
+
+    def _load_index(self):
+        if not self.index_path.exists():
+            return
+        with open(self.index_path, "rb+") as f:
+            data = f.read()
+            # Drop a torn last line left by a crash mid-append
+            if data and not data.endswith(b"\n"):
+                cut = data.rfind(b"\n") + 1
+                f.truncate(cut)
+                data = data[:cut]
+        for line in data.splitlines():
+            if line.strip():
+                entry = json.loads(line)
+                if entry.get("deleted"):
+                    self._index.pop(entry["name"], None)
+                    continue
+                self._index[entry["name"]] = entry
+                self._shard = max(self._shard, entry["shard"])
+
+    def path(self, name):
+        return self._shard_path(self._index[name]["shard"])
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def names(self):
+        return sorted(self._index)
+
+    def signatures(self):
+        # Frames are never rewritten in place, a new put() gets a new entry
+        return {name: (e["shard"], e["offset"], e["length"]) for name, e in self._index.items()}
+
+    def put(self, name, depth):
+        depth = np.ascontiguousarray(depth)
+        if self.compression == "zlib":
+            payload = zlib.compress(depth.tobytes(), self.level)
+        else:
+            payload = depth.tobytes()
+
+        with self._lock:
+            shard_path = self._shard_path(self._shard)
+            if shard_path.exists() and shard_path.stat().st_size + len(payload) > self.shard_size:
+                self._shard += 1
+                shard_path = self._shard_path(self._shard)
+
+            with open(shard_path, "ab") as f:
+                offset = f.tell()
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+
+            entry = {
+                "name": name,
+                "shard": self._shard,
+                "offset": offset,
+                "length": len(payload),
+                "shape": list(depth.shape),
+                "dtype": depth.dtype.str,
+                "codec": self.compression or "raw",
+            }
+            self._append_index(entry)
+            self._index[name] = entry
+        return str(shard_path)
+
+    def _append_index(self, entry):
+        with open(self.index_path, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def delete(self, name):
+        with self._lock:
+            if name not in self._index:
+                return
+            self._append_index({"name": name, "deleted": True})
+            del self._index[name]
+
+    def _map(self, shard, end):
+        # Shards are mapped once; remapped only if they grew past the old mapping
+        with self._lock:
+            mm = self._maps.get(shard)
+            if mm is None or len(mm) < end:
+                with open(self._shard_path(shard), "rb") as f:
+                    mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self._maps[shard] = mm
+            return mm
+
+    def get(self, name, mmap=False):
+        # Raw shards are always read zero-copy from the mapping; zlib chunks are
+        # decompressed straight from it. The mmap flag is accepted for API parity.
+        entry = self._index[name]
+        start = entry["offset"]
+        end = start + entry["length"]
+        mm = self._map(entry["shard"], end)
+        dtype = np.dtype(entry["dtype"])
+        shape = tuple(entry["shape"])
+        if entry["codec"] == "zlib":
+            data = zlib.decompress(memoryview(mm)[start:end])
+            return np.frombuffer(data, dtype=dtype).reshape(shape)
+        return np.frombuffer(mm, dtype=dtype, count=int(np.prod(shape)), offset=start).reshape(shape)
+
+    def close(self):
+        with self._lock:
+            for mm in self._maps.values():
+                try:
+                    mm.close()
+                except BufferError:
+                    pass  # arrays returned by get() still reference it
+            self._maps = {}
+
+
+DEPTH_FORMATS = {
+    "npy": NpyDepthStore,
+    "png": PngDepthStore,
+    "shard": ShardedDepthStore,
+}
+
+
+def create_depth_store(directory, fmt="png"):
+    if fmt not in DEPTH_FORMATS:
+        raise ValueError(f"Unknown depth format '{fmt}', expected one of {sorted(DEPTH_FORMATS)}")
+    return DEPTH_FORMATS[fmt](directory)
+
+
+class DepthReader:
+    # Reads frames from a depth directory whatever format(s) it holds
+    # (e.g. a half-migrated directory with both shards and .npy files)
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.stores = []
+        if (self.directory / INDEX_NAME).exists():
+            self.stores.append(ShardedDepthStore(directory))
+        self.stores.append(PngDepthStore(directory))
+        self.stores.append(NpyDepthStore(directory))
+
+    def _store(self, name):
+        for store in self.stores:
+            if name in store:
+                return store
+        raise KeyError(f"No depth frame named '{name}' in {self.directory}")
+
+    def __contains__(self, name):
+        return any(name in store for store in self.stores)
+
+    def path(self, name):
+        return self._store(name).path(name)
+
+    def names(self):
+        names = set()
+        for store in self.stores:
+            names.update(store.names())
+        return sorted(names)
+
+    def signatures(self):
+        # Same precedence as _store(): the first store holding a name serves it
+        signatures = {}
+        for store in reversed(self.stores):
+            signatures.update(store.signatures())
+        return signatures
+
+    def get(self, name, mmap=False):
+        return self._store(name).get(name, mmap=mmap)
+
+    def delete(self, name):
+        # From every store holding it, so no older copy shows through
+        for store in self.stores:
+            if name in store:
+                store.delete(name)
+
+    def close(self):
+        for store in self.stores:
+            store.close()
+
+
+def open_depth_store(directory):
+    return DepthReader(directory)
+
+
+def migrate(src, fmt, dst=None, delete=False):
+    # Copy every .npy frame in src into a store of the given format, verifying
+    # each frame round-trips exactly before (optionally) deleting the original.
+    source = NpyDepthStore(src)
+    target = create_depth_store(dst or src, fmt)
+    names = source.names()
+    migrated = 0
+    for i, name in enumerate(names):
+        if name in target:
+            continue
+        depth = source.get(name)
+        target.put(name, depth)
+        if not np.array_equal(target.get(name), depth):
+            raise RuntimeError(f"Round-trip check failed for {name}")
+        if delete:
+            source.path(name).unlink()
+        migrated += 1
+        if (i + 1) % 1000 == 0:
+            logger.info("%d/%d frames migrated", i + 1, len(names))
+    target.close()
+    logger.info("Migrated %d frames to '%s' in %s", migrated, fmt, dst or src)
+    return migrated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Depth store tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    m = sub.add_parser("migrate", help="Convert a directory of .npy depth frames")
+    m.add_argument("--src", default="dataset/depth")
+    m.add_argument("--to", dest="fmt", choices=["png", "shard"], default="png")
+    m.add_argument("--dst", default=None, help="Target directory (default: same as --src)")
+    m.add_argument("--delete", action="store_true", help="Delete each .npy after it is verified")
+    args = parser.parse_args()
+    log.setup()
+
+    if args.command == "migrate":
+        migrate(args.src, args.fmt, dst=args.dst, delete=args.delete)
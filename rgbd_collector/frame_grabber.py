@@ -0,0 +1,195 @@
+import logging
+import threading
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class FramePacket:
+    def __init__(self, seq, timestamp, device_timestamp, color, depth, payload=None):
+        self.seq = seq
+        self.timestamp = timestamp                # time.monotonic() when the frame was received
+        self.device_timestamp = device_timestamp  # camera timestamp in ms (None if unknown)
+        self.color = color
+        self.depth = depth
+        self.payload = payload                    # optional backend-specific data
+
+
+class FrameRingBuffer:
+    # Bounded ring of color/depth slots. The slots are allocated once, as soon as
+    # the first frame's shape is known, and frames are copied into them in place.
+    # The writer always fills the slot after the newest one, so readers copying the
+    # newest slot never race with it (hence size >= 2).
+    def __init__(self, size=4):
+        if size < 2:
+            raise ValueError("FrameRingBuffer needs at least 2 slots")
+        self.size = size
+        self._lock = threading.Lock()
+        self._color = None
+        self._depth = None
+        self._meta = [None] * size
+        self._seq = 0  # sequence number of the newest frame, 0 = empty
+
+    def _allocate(self, color, depth):
+        self._color = np.empty((self.size,) + color.shape, dtype=color.dtype)
+        self._depth = np.empty((self.size,) + depth.shape, dtype=depth.dtype)
+
+    def _fits(self, color, depth):
+        return (
+            self._color is not None
+            and self._color.shape[1:] == color.shape and self._color.dtype == color.dtype
+            and self._depth.shape[1:] == depth.shape and self._depth.dtype == depth.dtype
+        )
+
+    def push(self, color, depth, timestamp, device_timestamp=None, payload=None):
+        if not self._fits(color, depth):
+            # Resolution change (or first frame): reallocate under the lock
+            with self._lock:
+                self._allocate(color, depth)
+                self._meta = [None] * self.size
+                self._seq = 0
+
+        seq = self._seq + 1
+        slot = seq % self.size
+        np.copyto(self._color[slot], color)
+        np.copyto(self._depth[slot], depth)
+
+        with self._lock:
+            self._meta[slot] = (seq, timestamp, device_timestamp, payload)
+            self._seq = seq
+        return seq
+
+    @property
+    def seq(self):
+        return self._seq
+
+    def latest(self, copy=True):
+        # copy=False returns views into the ring; they stay valid only until the
+        # writer wraps around (size - 1 frames later), which is enough for a preview.
+        with self._lock:
+            if self._seq == 0:
+                return None
+            slot = self._seq % self.size
+            seq, timestamp, device_timestamp, payload = self._meta[slot]
+            color = self._color[slot]
+            depth = self._depth[slot]
+            if copy:
+                color = color.copy()
+                depth = depth.copy()
+        return FramePacket(seq, timestamp, device_timestamp, color, depth, payload)
+
+    def _readable(self, seq):
+        # Every slot but the oldest, which the writer fills next
+        return 0 < seq <= self._seq and seq > self._seq - self.size + 1
+
+    def times(self):
+        # (seq, timestamp, device_timestamp) of the readable frames, newest first
+        with self._lock:
+            return [self._meta[seq % self.size][:3] for seq in range(self._seq, 0, -1)
+                    if self._readable(seq)]
+
+    def get(self, seq, copy=True):
+        # A buffered frame by sequence number, or None once it has been overwritten
+        with self._lock:
+            if not self._readable(seq):
+                return None
+            slot = seq % self.size
+            seq, timestamp, device_timestamp, payload = self._meta[slot]
+            color = self._color[slot]
+            depth = self._depth[slot]
+            if copy:
+                color = color.copy()
+                depth = depth.copy()
+        return FramePacket(seq, timestamp, device_timestamp, color, depth, payload)
+
+
+class FrameGrabber:
+    # Background acquisition thread: reads frames with read_fn(cam), which returns
+    # (color, depth, device_timestamp_ms, payload) or None, and pushes them into a
+    # FrameRingBuffer so the Tk thread never blocks on the camera.
+    def __init__(self, cam, read_fn, buffer_size=4, fps=30):
+        self.cam = cam
+        self.read_fn = read_fn
+        self.buffer = FrameRingBuffer(buffer_size)
+        self.period = 1.0 / fps
+        self.interval = self.period  # measured frame interval (EMA), used for preview pacing
+
+        self.frames = 0
+        self.dropped = 0  # frames missing from the stream (inferred from timestamp gaps)
+        self.late = 0     # frames that arrived more than 1.5 periods after the previous one
+        self.errors = 0
+
+        # Called as listener(color, depth, timestamp, device_timestamp, payload)
+        # on the acquisition thread for every frame, e.g. a Recorder
+        self.listeners = []
+
+        self._last_ts = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="frame-grabber", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=2.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def latest(self, copy=True):
+        return self.buffer.latest(copy=copy)
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "dropped": self.dropped,
+            "late": self.late,
+            "errors": self.errors,
+        }
+
+    def _account(self, ts):
+        # ts in seconds
+        if self._last_ts is not None:
+            dt = ts - self._last_ts
+            if dt > 0:
+                self.interval += 0.1 * (min(dt, 1.0) - self.interval)
+            if dt > 1.5 * self.period:
+                self.late += 1
+                self.dropped += max(int(round(dt / self.period)) - 1, 0)
+        self._last_ts = ts
+
+    def _run(self):
+        failing = False
+        while not self._stop.is_set():
+            try:
+                result = self.read_fn(self.cam)
+            except Exception as e:
+                self.errors += 1
+                if not failing:
+                    logger.error("Frame acquisition failed: %s", e)
+                failing = True
+                time.sleep(self.period)
+                continue
+
+            if result is None:
+                continue
+            failing = False
+
+            color, depth, device_ts, payload = result
+            now = time.monotonic()
+            self._account(device_ts / 1000.0 if device_ts is not None else now)
+            self.buffer.push(color, depth, now, device_ts, payload)
+            self.frames += 1
+            for listener in self.listeners:
+                try:
+                    listener(color, depth, now, device_ts, payload)
+                except Exception:
+                    # A failing listener (e.g. a recorder whose disk filled up)
+                    # must not stop acquisition for the preview and the others
+                    logger.exception("Frame listener %r failed", listener, extra={"every": 5.0})
@@ -0,0 +1,128 @@
+import logging
+
+import numpy as np
+import cv2
+
+from .metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+# JPEG reduced-size decoding: the decoder skips DCT work instead of resizing afterwards
+MJPG_REDUCED_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+def decode_mjpeg(data, reduce=1):
+    # Returns BGR, like cv2.imdecode; reduce is 1, 2, 4 or 8
+    return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), MJPG_REDUCED_FLAGS[reduce])
+
+def mjpeg_reduce_factor(width, height, preview_size):
+    # Largest 1/2, 1/4, 1/8 scale that still covers the preview size
+    preview_w, preview_h = preview_size
+    for factor in (8, 4, 2):
+        if width // factor >= preview_w and height // factor >= preview_h:
+            return factor
+    return 1
+
+def format_name(format):
+    # "RGB", "MJPG", ... for an OBFormat (Orbbec SDK frames) as well as for the
+    # plain strings replayed and synthetic frames carry, so this module works
+    # without importing a camera SDK
+    return getattr(format, "name", format)
+
+def frame_to_bgr_image(frame):
+    width = frame.get_width()
+    height = frame.get_height()
+    format = format_name(frame.get_format())
+    logger.debug("Frame: width=%s, height=%s, format=%s", width, height, format, extra={"every": 5.0})
+
+    data = frame.get_data()
+
+    if format == "RGB":
+        img = np.frombuffer(data, dtype=np.uint8).reshape((height, width, 3))
+        return cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
+    elif format == "BGR":
+        img = np.frombuffer(data, dtype=np.uint8).reshape((height, width, 3))
+        return img
+    elif format == "MJPG":
+        # Decode MJPEG
+        return decode_mjpeg(data)
+    else:
+        logger.error("Unsupported color format: %s", format, extra={"every": 5.0})
+        return None
+
+def frame_to_rgb_image(frame, reduce=1):
+    # Display-order (RGB) image. For RGB streams this is a view of the SDK buffer,
+    # no conversion and no copy. MJPG frames are decoded at 1/reduce size.
+    width = frame.get_width()
+    height = frame.get_height()
+    format = format_name(frame.get_format())
+    data = frame.get_data()
+
+    if format == "RGB":
+        return np.frombuffer(data, dtype=np.uint8).reshape((height, width, 3))
+    elif format == "BGR":
+        img = np.frombuffer(data, dtype=np.uint8).reshape((height, width, 3))
+        return cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+    elif format == "MJPG":
+        img = decode_mjpeg(data, reduce)
+        return cv2.cvtColor(img, cv2.COLOR_BGR2RGB) if img is not None else None
+    else:
+        logger.error("Unsupported color format: %s", format, extra={"every": 5.0})
+        return None
+
+def depth_frame_to_array(depth_frame):
+    return np.frombuffer(depth_frame.get_data(), dtype=np.uint16).reshape(
+        (depth_frame.get_height(), depth_frame.get_width())
+    )
+
+def read_frameset(cam):
+    # FrameGrabber read function for framesets (RealSense, cam.get_frameset()).
+    # The color stream is configured as rgb8, i.e. already in display order.
+    # Depth is the raw (unaligned) frame; the frameset travels along as payload so
+    # capture can align it on demand with cam.aligned().
+    with METRICS.measure("camera.wait"):
+        frameset = cam.get_frameset()
+    if frameset is None:
+        return None
+    with METRICS.measure("convert"):
+        color_frame = frameset.get_color_frame()
+        depth_frame = frameset.get_depth_frame()
+        if not color_frame or not depth_frame:
+            return None
+        color = np.asanyarray(color_frame.get_data())
+        depth = np.asanyarray(depth_frame.get_data())
+    return color, depth, color_frame.get_timestamp(), frameset
+
+def read_frames(cam, preview_size=None):
+    # FrameGrabber read function for separate color/depth frames (Femto Bolt,
+    # cam.get_frames()); color is kept as RGB.
+    # With a preview_size, MJPG frames are only decoded at preview resolution and
+    # the compressed frame travels along as payload for a full decode on capture.
+    with METRICS.measure("camera.wait"):
+        color_frame, depth_frame = cam.get_frames()
+    if color_frame is None or depth_frame is None:
+        return None
+
+    with METRICS.measure("convert"):
+        payload = None
+        if preview_size is not None and format_name(color_frame.get_format()) == "MJPG":
+            reduce = mjpeg_reduce_factor(color_frame.get_width(), color_frame.get_height(), preview_size)
+            color = frame_to_rgb_image(color_frame, reduce)
+            payload = {"mjpeg": bytes(color_frame.get_data())}
+        else:
+            color = frame_to_rgb_image(color_frame)
+        if color is None:
+            return None
+
+        depth = depth_frame_to_array(depth_frame)
+    return color, depth, color_frame.get_timestamp(), payload
+
+def full_color_bgr(packet):
+    # Full-resolution BGR image for a captured packet
+    if packet.payload and "mjpeg" in packet.payload:
+        return decode_mjpeg(packet.payload["mjpeg"])
+    return cv2.cvtColor(packet.color, cv2.COLOR_RGB2BGR)
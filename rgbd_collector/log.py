@@ -0,0 +1,57 @@
+import logging
+import os
+import sys
+import threading
+import time
+
+# Modules log through the standard library, logging.getLogger(__name__); this
+# module only sets up how the collector shows those records. Pass
+# extra={"every": seconds} to rate-limit a message that can fire on every frame.
+LEVELS = {"DEBUG": logging.DEBUG, "INFO": logging.INFO, "WARNING": logging.WARNING, "ERROR": logging.ERROR}
+FORMAT = "[%(levelname)s] %(message)s"
+
+# e.g. RGBD_LOG_LEVEL=DEBUG python collector.py realsense
+ENV_LEVEL = "RGBD_LOG_LEVEL"
+
+
+class RateLimitFilter(logging.Filter):
+    # Records carrying an `every` attribute (seconds) pass at most once per
+    # interval per logger and format string; the next one that passes says how
+    # many were suppressed in between. Other records are untouched.
+    def __init__(self):
+        super().__init__()
+        self._last = {}  # (logger, format string) -> (time last emitted, suppressed since)
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        every = getattr(record, "every", None)
+        if every is None:
+            return True
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            last, suppressed = self._last.get(key, (None, 0))
+            if last is not None and now - last < every:
+                self._last[key] = (last, suppressed + 1)
+                return False
+            self._last[key] = (now, 0)
+        if suppressed:
+            record.msg = f"{record.msg} ({suppressed} similar suppressed)"
+        return True
+
+
+def setup(level=None):
+    # One stdout handler on the root logger, "[LEVEL] message" lines as before.
+    # level: a LEVELS name; default $RGBD_LOG_LEVEL or INFO. Safe to call again
+    # (e.g. to change the level).
+    name = (level or os.environ.get(ENV_LEVEL) or "INFO").upper()
+    root = logging.getLogger()
+    handler = next((h for h in root.handlers if getattr(h, "rgbd_collector", False)), None)
+    if handler is None:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.rgbd_collector = True
+        handler.setFormatter(logging.Formatter(FORMAT))
+        handler.addFilter(RateLimitFilter())
+        root.addHandler(handler)
+    root.setLevel(LEVELS.get(name, logging.INFO))
+    return root
@@ -0,0 +1,210 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.jsonl"
+# Per-camera intrinsics (see pointcloud.save_intrinsics); its keys also name the
+# cameras of multi-camera datasets
+INTRINSICS_NAME = "intrinsics.json"
+TAIL_BLOCK = 64 * 1024
+
+
+def sample_name(sample_id):
+    return f"img{sample_id:04d}"
+
+
+def depth_range(depth, mask=None):
+    # Depth range of the object (or of all valid pixels when the mask is empty)
+    values = depth[mask > 0] if mask is not None else depth.ravel()
+    values = values[values > 0]
+    if values.size == 0:
+        values = depth[depth > 0]
+    if values.size == 0:
+        return None, None
+    return int(values.min()), int(values.max())
+
+
+class DatasetManifest:
+    # Append-only JSONL index of saved samples, one record per line:
+    #   {"id", "name", "class", "timestamp", "camera", "depth_min", "depth_max",
+    #    "image", "depth", "label"}   (paths relative to the dataset root)
+    # Startup only reads the tail of the file, so next-id allocation does not
+    # depend on the dataset size. Multi-camera captures share one id, with one
+    # record (and one <name>_<camera> set of files) per camera.
+    def __init__(self, root, camera=None):
+        self.root = Path(root)
+        self.path = self.root / MANIFEST_NAME
+        self.camera = camera
+        self._lock = threading.Lock()
+        self._by_class = None
+
+        if not self.path.exists():
+            self._bootstrap()
+        self.next_id = self._recover()
+
+    # --- startup ---
+
+    def _recover(self):
+        with open(self.path, "rb+") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            block = TAIL_BLOCK
+            while True:
+                start = max(size - block, 0)
+                f.seek(start)
+                tail = f.read(size - start)
+                if start == 0 or tail.count(b"\n") > 1:
+                    break
+                block *= 2
+
+            # A torn last line means we crashed mid-append: cut it off
+            if tail and not tail.endswith(b"\n"):
+                cut = tail.rfind(b"\n") + 1
+                f.truncate(start + cut)
+                logger.warning("Manifest had an incomplete last record, truncated it.")
+                tail = tail[:cut]
+
+        # Workers finish out of order, so look at the whole tail, not just the last line
+        last_id = -1
+        cameras = set()
+        lines = tail.split(b"\n")
+        if start > 0:
+            lines = lines[1:]  # first line of the block may be partial
+        for line in lines:
+            if line.strip():
+                record = json.loads(line)
+                last_id = max(last_id, record["id"])
+                base = sample_name(record["id"])
+                if record["name"].startswith(base + "_"):
+                    cameras.add(record["name"][len(base) + 1:])
+
+        # Saves that hit the disk but not the manifest before a crash
+        cameras.update(self._intrinsics_cameras())
+        next_id = last_id + 1
+        while self._on_disk(next_id, cameras):
+            next_id += 1
+        return next_id
+
+    def _intrinsics_cameras(self):
+        path = self.root / INTRINSICS_NAME
+        if not path.exists():
+            return []
+        try:
+            with open(path) as f:
+                return list(json.load(f))
+        except ValueError:
+            return []
+
+    def _on_disk(self, sample_id, cameras=()):
+        # Single-camera samples are <name>.jpg, multi-camera ones <name>_<camera>.jpg;
+        # only the known camera names are checked, no directory listing
+        name = sample_name(sample_id)
+        images = self.root / "images"
+        return any((images / f"{name}{suffix}.jpg").exists()
+                   for suffix in [""] + [f"_{camera}" for camera in sorted(cameras)])
+
+    def _bootstrap(self):
+        # One-off scan for datasets created before the manifest existed
+        self.root.mkdir(parents=True, exist_ok=True)
+        records = []
+        img_dir = self.root / "images"
+        if img_dir.exists():
+            for img in img_dir.glob("*.jpg"):
+                m = re.fullmatch(r"img(\d+)", img.stem)
+                if m:
+                    records.append(self._legacy_record(int(m.group(1)), img))
+        records.sort(key=lambda r: r["id"])
+
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+        os.replace(tmp, self.path)
+        if records:
+            logger.info("Built manifest from %d existing samples.", len(records))
+
+    def _legacy_record(self, sample_id, img):
+        name = img.stem
+        label = self.root / "labels" / f"{name}.txt"
+        depth = next((p for p in (self.root / "depth" / f"{name}{ext}" for ext in (".png", ".npy"))
+                      if p.exists()), None)
+        label_class = None
+        if label.exists():
+            with open(label) as f:
+                first = f.readline().split()
+            label_class = int(first[0]) if first else None
+        return {
+            "id": sample_id,
+            "name": name,
+            "class": label_class,
+            "timestamp": img.stat().st_mtime,
+            "camera": None,
+            "depth_min": None,
+            "depth_max": None,
+            "image": f"images/{name}.jpg",
+            "depth": f"depth/{depth.name}" if depth else None,
+            "label": f"labels/{name}.txt" if label.exists() else None,
+        }
+
+    # --- writing ---
+
+    def allocate(self):
+        with self._lock:
+            sample_id = self.next_id
+            self.next_id += 1
+            return sample_id
+
+    def append(self, sample_id, label_class, files, depth=None, mask=None, timestamp=None, name=None,
+               camera=None):
+        # name/camera: for multi-camera sessions, which write one record per camera
+        # under the same id
+        dmin, dmax = depth_range(depth, mask) if depth is not None else (None, None)
+        record = {
+            "id": sample_id,
+            "name": name or sample_name(sample_id),
+            "class": label_class,
+            "timestamp": timestamp if timestamp is not None else time.time(),
+            "camera": camera or self.camera,
+            "depth_min": dmin,
+            "depth_max": dmax,
+        }
+        for key in ("image", "depth", "label"):
+            path = files.get(key)
+            record[key] = Path(os.path.relpath(path, self.root)).as_posix() if path else None
+
+        line = json.dumps(record) + "\n"
+        with self._lock:
+            with open(self.path, "a") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            if self._by_class is not None:
+                self._by_class.setdefault(label_class, []).append(record)
+        return record
+
+    # --- queries ---
+
+    def samples(self, label_class=None):
+        with open(self.path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if label_class is None or record["class"] == label_class:
+                    yield record
+
+    def by_class(self, label_class):
+        # Per-class index, built on first use and kept up to date by append()
+        with self._lock:
+            if self._by_class is None:
+                index = {}
+                for record in self.samples():
+                    index.setdefault(record["class"], []).append(record)
+                self._by_class = index
+            return list(self._by_class.get(label_class, []))
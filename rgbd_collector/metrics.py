@@ -0,0 +1,131 @@
+import csv
+import json
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Bin edges (ms) of the histograms written by Metrics.dump: log-spaced, 10 us .. 10 s
+HISTOGRAM_BINS_MS = np.logspace(-2, 4, 61)
+
+
+class StageStats:
+    # Rolling window of the most recent durations (in seconds) of one stage,
+    # kept in a preallocated ring so recording a sample never allocates
+    def __init__(self, window=1024):
+        self._samples = np.zeros(window, dtype=np.float64)
+        self._next = 0
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, seconds):
+        with self._lock:
+            self._samples[self._next] = seconds
+            self._next = (self._next + 1) % len(self._samples)
+            self.count += 1
+            self.total += seconds
+
+    def window(self):
+        # Samples in the window (unordered), in ms
+        with self._lock:
+            return self._samples[:min(self.count, len(self._samples))] * 1000.0
+
+    def summary(self):
+        samples = self.window()
+        if not samples.size:
+            return {"count": 0}
+        p50, p90, p99 = np.percentile(samples, [50, 90, 99])
+        return {
+            "count": self.count,
+            "total_s": self.total,
+            "mean_ms": float(samples.mean()),
+            "p50_ms": float(p50),
+            "p90_ms": float(p90),
+            "p99_ms": float(p99),
+            "max_ms": float(samples.max()),
+        }
+
+
+class _Timer:
+    __slots__ = ("stats", "start")
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.stats.add(time.perf_counter() - self.start)
+        return False
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Metrics:
+    # Named per-stage latency windows, safe to record from any thread:
+    #   with METRICS.measure("segment"):
+    #       ...
+    #   METRICS.record("preview.interval", seconds)
+    def __init__(self, window=1024, enabled=True):
+        self.window = window
+        self.enabled = enabled
+        self.stages = {}
+        self._lock = threading.Lock()
+
+    def stage(self, name):
+        stats = self.stages.get(name)
+        if stats is None:
+            with self._lock:
+                stats = self.stages.setdefault(name, StageStats(self.window))
+        return stats
+
+    def record(self, name, seconds):
+        if self.enabled:
+            self.stage(name).add(seconds)
+
+    def measure(self, name):
+        return _Timer(self.stage(name)) if self.enabled else _NULL_TIMER
+
+    def summary(self):
+        return {name: self.stages[name].summary() for name in sorted(self.stages)}
+
+    def dump(self, directory, prefix="metrics"):
+        # <prefix>.csv: one summary row per stage
+        # <prefix>.json: summaries plus a latency histogram of each stage's window
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        summary = self.summary()
+        columns = ["count", "total_s", "mean_ms", "p50_ms", "p90_ms", "p99_ms", "max_ms"]
+
+        csv_path = directory / f"{prefix}.csv"
+        with open(csv_path, "w", newline="") as f:
+            out = csv.writer(f)
+            out.writerow(["stage"] + columns)
+            for name, row in summary.items():
+                out.writerow([name] + [row.get(c, "") for c in columns])
+
+        report = {"bins_ms": HISTOGRAM_BINS_MS.tolist(), "stages": {}}
+        for name, row in summary.items():
+            counts, _ = np.histogram(self.stages[name].window(), bins=HISTOGRAM_BINS_MS)
+            report["stages"][name] = dict(row, histogram=counts.tolist())
+        json_path = directory / f"{prefix}.json"
+        with open(json_path, "w") as f:
+            json.dump(report, f, indent=2)
+        return csv_path, json_path
+
+
+# Process-wide instance used by the instrumented modules
+METRICS = Metrics()
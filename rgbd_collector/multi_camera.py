@@ -0,0 +1,297 @@
+import argparse
+import logging
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from .frame_grabber import FrameGrabber
+from .capture import capture_step
+from .segmentation_helper import create_segmentation
+from .annotation_writer import AnnotationWriter
+from .save_pipeline import SaveJob, SavePipeline
+from .manifest import DatasetManifest, sample_name
+from .depth_store import create_depth_store
+from .pointcloud import save_intrinsics
+from .backends import open_camera, parse_camera
+from . import log
+
+logger = logging.getLogger(__name__)
+
+# Frames per camera kept for pairing; RealSense framesets are held by the ring
+# (frames.keep()), so this also bounds how many of the SDK's frames are in use
+BUFFER_SIZE = 4
+CLOCKS = ("system", "device")
+PREVIEW_WIDTH = 480
+# Femto Bolt MJPG color is decoded at this size for pairing/preview, in full on capture
+PREVIEW_SIZE = (PREVIEW_WIDTH, 360)
+
+
+class CameraSource:
+    # One camera of a session: its own acquisition thread and ring buffer, and
+    # the capture step (capture.py) that turns a buffered packet into the saved
+    # (BGR, depth) pair, so cameras of different kinds can share a session.
+    # The step, the grabber and the default segmentation are set up in start(),
+    # once the camera (e.g. a replay) knows what kind it is.
+    def __init__(self, name, cam, seg=None, buffer_size=BUFFER_SIZE):
+        self.name = name
+        self.cam = cam
+        self.seg = seg
+        self.buffer_size = buffer_size
+        self.step = None
+        self.grabber = None
+        self.intrinsics = None
+
+    def start(self):
+        self.cam.setup_streams()
+        self.step = capture_step(self.cam, PREVIEW_SIZE)
+        self.step.start()
+        self.intrinsics = self.step.intrinsics
+        if self.seg is None:
+            self.seg = create_segmentation(self.step.camera)
+        self.grabber = FrameGrabber(self.cam, self.step.read, buffer_size=self.buffer_size)
+        self.grabber.start()
+
+    def process(self, packet):
+        # Full-size BGR and depth in its geometry, as in the single-camera app
+        return self.step.process(packet)
+
+    def stop(self):
+        if self.grabber is not None:
+            self.grabber.stop()
+        self.cam.stop()
+
+
+def open_source(spec):
+    # CameraSource for a camera spec (see backends.parse_camera); replays loop
+    name, backend, options = parse_camera(spec)
+    if backend == "replay":
+        options["loop"] = True
+    return CameraSource(name, open_camera(backend, **options))
+
+
+class FrameSynchronizer:
+    # Pairs frames across cameras by timestamp. Each camera's ring holds its
+    # last few frames; a match is one frame per camera, all within tolerance_ms
+    # of each other. The camera whose newest frame is oldest sets the time the
+    # set is taken at, and older candidates are tried before giving up.
+    #
+    #   clock="system" - arrival time on this machine; works for any mix of
+    #                    cameras, includes each camera's transport latency
+    #   clock="device" - the cameras' own timestamps; only comparable when the
+    #                    devices share a clock (hardware sync / global time)
+    # offsets_ms: per-camera correction added to its timestamps, e.g. a measured
+    # latency difference between two models.
+    def __init__(self, sources, tolerance_ms=15.0, clock="system", offsets_ms=None):
+        if clock not in CLOCKS:
+            raise ValueError(f"Unknown clock {clock!r}, expected one of {CLOCKS}")
+        self.sources = sources
+        self.tolerance_ms = tolerance_ms
+        self.clock = clock
+        self.offsets_ms = offsets_ms or {}
+        self.matched = 0
+        self.missed = 0
+        self.last_spread = None
+
+    def _times(self, source):
+        # (seq, time in ms) of the camera's buffered frames, newest first
+        offset = self.offsets_ms.get(source.name, 0.0)
+        times = []
+        for seq, timestamp, device_timestamp in source.grabber.buffer.times():
+            t = timestamp * 1000.0 if self.clock == "system" else device_timestamp
+            if t is not None:
+                times.append((seq, t + offset))
+        return times
+
+    def match(self):
+        # {camera name: FramePacket (copies)} or None
+        buffered = {s.name: self._times(s) for s in self.sources}
+        if not all(buffered.values()):
+            return None
+        lagging = min(buffered, key=lambda name: buffered[name][0][1])
+        for _, reference in buffered[lagging]:
+            chosen = {name: min(times, key=lambda st: abs(st[1] - reference))
+                      for name, times in buffered.items()}
+            stamps = [t for _, t in chosen.values()]
+            spread = max(stamps) - min(stamps)
+            if spread > self.tolerance_ms:
+                continue
+            frames = {s.name: s.grabber.buffer.get(chosen[s.name][0]) for s in self.sources}
+            if any(packet is None for packet in frames.values()):
+                break  # overwritten while we looked; the next call sees newer frames
+            self.matched += 1
+            self.last_spread = spread
+            return frames
+        return None
+
+    def wait(self, timeout=1.0):
+        # Polls for a match until timeout (seconds)
+        deadline = time.monotonic() + timeout
+        while True:
+            frames = self.match()
+            if frames is not None:
+                return frames
+            if time.monotonic() >= deadline:
+                self.missed += 1
+                return None
+            time.sleep(0.005)
+
+
+class MultiCameraSession:
+    # Runs several cameras at once and saves synchronized captures: the frames
+    # of one capture share a sample id, as <name>_<camera> files with one
+    # manifest record per camera.
+    def __init__(self, sources, root="dataset", tolerance_ms=15.0, clock="system", offsets_ms=None,
+                 depth_format="png"):
+        names = [s.name for s in sources]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Camera names must be unique: {names}")
+        self.sources = sources
+        self.sync = FrameSynchronizer(sources, tolerance_ms, clock, offsets_ms)
+
+        self.root = Path(root)
+        self.img_dir = self.root / "images"
+        self.label_dir = self.root / "labels"
+        self.depth_dir = self.root / "depth"
+        for d in (self.img_dir, self.label_dir, self.depth_dir):
+            d.mkdir(parents=True, exist_ok=True)
+        self.manifest = DatasetManifest(self.root)
+        self.depth_store = create_depth_store(self.depth_dir, depth_format)
+        self.saver = SavePipeline(self.img_dir, self.depth_store, self.label_dir, AnnotationWriter(),
+                                  max_pending=4 * len(sources), on_done=self.on_saved)
+
+    def start(self):
+        for source in self.sources:
+            source.start()
+            if source.intrinsics is not None:
+                save_intrinsics(self.root, source.name, source.intrinsics)
+
+    def capture(self, label_class=0, timeout=1.0):
+        # Pairs, processes and queues one capture; returns its sample id or None
+        frames = self.sync.wait(timeout)
+        if frames is None:
+            logger.warning("No frames within %s ms of each other", self.sync.tolerance_ms)
+            return None
+
+        processed = {}
+        for source in self.sources:
+            result = source.process(frames[source.name])
+            if result is None:
+                logger.error("Could not process the frame of camera %s", source.name)
+                return None
+            bgr, depth = result
+            processed[source.name] = (bgr, depth, source.seg.analyze(depth))
+
+        sample_id = self.manifest.allocate()
+        timestamp = time.time()
+        jobs = []
+        for source in self.sources:
+            bgr, depth, result = processed[source.name]
+            jobs.append(SaveJob(f"{sample_name(sample_id)}_{source.name}", bgr, depth, result,
+                                label_class=label_class, sample_id=sample_id, timestamp=timestamp,
+                                intrinsics=source.intrinsics, camera=source.name))
+        # All cameras or none: a sample id with only some of its views is useless
+        if not self.saver.submit_all(jobs, timeout=5.0):
+            logger.error("Save queue is full, %s was dropped", sample_name(sample_id))
+            return None
+        logger.info("Queued %s from %d cameras (spread %.1f ms)", sample_name(sample_id), len(self.sources),
+                    self.sync.last_spread)
+        return sample_id
+
+    def on_saved(self, job, ok):
+        # Runs on a save worker thread
+        if not job.files:
+            return
+        self.manifest.append(job.sample_id, job.label_class, job.files, depth=job.depth,
+                             mask=job.segmentation.mask, timestamp=job.timestamp, name=job.name,
+                             camera=job.camera)
+        logger.info("Saved %s" if ok else "Saved %s (no label)", job.name)
+
+    def stats(self):
+        stats = {s.name: s.grabber.stats() for s in self.sources}
+        stats["sync"] = {"matched": self.sync.matched, "missed": self.sync.missed}
+        return stats
+
+    def preview(self):
+        # Newest frame of every camera side by side (BGR), for the session window
+        panes = []
+        for source in self.sources:
+            packet = source.grabber.latest(copy=False)
+            if packet is None:
+                continue
+            h, w = packet.color.shape[:2]
+            size = (PREVIEW_WIDTH, int(h * PREVIEW_WIDTH / w))
+            pane = cv2.cvtColor(cv2.resize(packet.color, size, interpolation=cv2.INTER_AREA), cv2.COLOR_RGB2BGR)
+            cv2.putText(pane, source.name, (8, 20), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 1, cv2.LINE_AA)
+            panes.append(pane)
+        if not panes:
+            return None
+        height = max(p.shape[0] for p in panes)
+        return np.hstack([cv2.copyMakeBorder(p, 0, height - p.shape[0], 0, 0, cv2.BORDER_CONSTANT) for p in panes])
+
+    def close(self):
+        self.saver.close()
+        self.depth_store.close()
+        for source in self.sources:
+            source.stop()
+
+
+def run_window(session, label_class):
+    # [Enter/Space] capture  [0-9] class  [q] quit
+    window = "Multi-camera session"
+    cv2.namedWindow(window, cv2.WINDOW_AUTOSIZE)
+    while True:
+        view = session.preview()
+        if view is not None:
+            spread = session.sync.last_spread
+            text = f"class {label_class}  [Enter] capture  [0-9] class  [q] quit"
+            if spread is not None:
+                text += f"  last spread {spread:.1f} ms"
+            cv2.putText(view, text, (8, view.shape[0] - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1,
+                        cv2.LINE_AA)
+            cv2.imshow(window, view)
+        key = cv2.waitKey(15) & 0xFF
+        if key in (ord("q"), 27):
+            break
+        elif key in (13, 10, ord(" ")):
+            session.capture(label_class)
+        elif ord("0") <= key <= ord("9"):
+            label_class = key - ord("0")
+    cv2.destroyAllWindows()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Synchronized capture from several cameras")
+    parser.add_argument("--camera", action="append", required=True,
+                        help="[name=]realsense[:serial] | [name=]orbbec[:serial] | replay:<path> | "
+                             "synthetic[:offset_ms]; repeat per camera, any mix of backends")
+    parser.add_argument("--dataset", default="dataset")
+    parser.add_argument("--class", dest="label_class", type=int, default=0)
+    parser.add_argument("--tolerance", type=float, default=15.0, help="Max timestamp spread of a capture, ms")
+    parser.add_argument("--clock", choices=CLOCKS, default="system")
+    parser.add_argument("--offset", action="append", default=[], metavar="NAME=MS",
+                        help="Add MS to camera NAME's timestamps before pairing")
+    parser.add_argument("--depth-format", default="png")
+    parser.add_argument("--count", type=int, help="Capture this many samples without a window, then exit")
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds between captures with --count")
+    parser.add_argument("--log-level", choices=sorted(log.LEVELS, key=log.LEVELS.get),
+                        help="Default: $RGBD_LOG_LEVEL or INFO")
+    args = parser.parse_args()
+    log.setup(args.log_level)
+
+    offsets = {name: float(ms) for name, ms in (o.split("=", 1) for o in args.offset)}
+    sources = [open_source(spec) for spec in args.camera]
+    session = MultiCameraSession(sources, args.dataset, args.tolerance, args.clock, offsets, args.depth_format)
+    session.start()
+    try:
+        if args.count is None:
+            run_window(session, args.label_class)
+        else:
+            time.sleep(0.5)  # let every camera fill its ring
+            for _ in range(args.count):
+                session.capture(args.label_class)
+                time.sleep(args.interval)
+    finally:
+        logger.info("Session stats: %s", session.stats())
+        session.close()
@@ -0,0 +1,198 @@
+import logging
+import multiprocessing as mp
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+from .save_pipeline import atomic_write_bytes
+from .metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+
+class SharedFramePool:
+    # Fixed set of equally sized shared-memory blocks. A frame is copied into a
+    # free slot once; worker processes then map the same memory from a small
+    # handle (block name, shape, dtype, offset) instead of receiving the pixels
+    # through a pipe, and write their output arrays back into the slot.
+    def __init__(self, slots, slot_bytes):
+        self.slot_bytes = slot_bytes
+        self._blocks = [shared_memory.SharedMemory(create=True, size=slot_bytes) for _ in range(slots)]
+        self._free = list(range(slots))
+        self._cond = threading.Condition()
+
+    def acquire(self, timeout=0):
+        # Slot index, or None if every slot is still in use after `timeout` seconds
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._free, timeout=timeout):
+                return None
+            return self._free.pop()
+
+    def release(self, index):
+        with self._cond:
+            self._free.append(index)
+            self._cond.notify()
+
+    def view(self, index, shape, dtype, offset=0):
+        return np.ndarray(shape, dtype=dtype, buffer=self._blocks[index].buf, offset=offset)
+
+    def handle(self, index, shape, dtype, offset=0):
+        return self._blocks[index].name, tuple(shape), np.dtype(dtype).str, offset
+
+    def close(self):
+        for block in self._blocks:
+            try:
+                block.close()
+            except BufferError:
+                pass  # a view is still alive somewhere; the mapping goes with the process
+            block.unlink()
+        self._blocks = []
+
+
+# --- Worker processes ---
+
+# Per-process state, set up once by _init_worker
+_worker = {}
+
+
+def _init_worker(seg):
+    # One OpenCV thread per process; the parallelism comes from the processes
+    cv2.setNumThreads(1)
+    _worker["seg"] = seg
+    _worker["blocks"] = {}
+
+
+def _attach(handle):
+    name, shape, dtype, offset = handle
+    block = _worker["blocks"].get(name)
+    if block is None:
+        # Mapped once per process and kept; the parent owns (and unlinks) the block
+        block = _worker["blocks"][name] = shared_memory.SharedMemory(name=name)
+    return np.ndarray(shape, dtype=dtype, buffer=block.buf, offset=offset)
+
+
+def _segment(depth_handle, mask_handle):
+    depth = _attach(depth_handle)
+    mask = _attach(mask_handle)
+    _worker["seg"].segment(depth, out=mask)
+    return True
+
+
+def _encode(handle, path, quality):
+    ok, encoded = cv2.imencode(".jpg", _attach(handle), [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not ok:
+        raise RuntimeError("JPEG encoding failed")
+    atomic_write_bytes(path, encoded.tobytes())
+    return path
+
+
+class FrameOffload:
+    # Optional worker-process mode for the per-frame segmentation of the live
+    # depth pane and the JPEG encoding of saved samples, so neither competes
+    # with acquisition and Tk for the GIL at high resolutions.
+    #
+    #   offload.segment(depth, callback)  - GUI thread; never blocks. Returns False
+    #                                       (frame skipped) while all slots are busy.
+    #   offload.poll()                    - GUI thread; runs callback(depth, mask) for
+    #                                       finished frames, views into shared memory
+    #                                       that are only valid during the callback
+    #   offload.encode(path, bgr)         - save threads; blocks until written
+    #
+    # Shared-memory pools are sized from the first frame of each kind; anything
+    # larger is processed in the calling thread.
+    #
+    # Not offloaded: the full-size decode, registration and analyze() of a manual
+    # capture still run on the GUI thread, about 65 ms for a 4K MJPG frame from the
+    # Femto Bolt (benchmark.py convert.mjpg + register + analyze). The preview is
+    # paused on the captured sample by then. Auto-capture runs the same steps on
+    # its own thread (app.py).
+    def __init__(self, seg, workers=2, slots=None, quality=95):
+        self.seg = seg
+        self.quality = quality
+        self.slots = slots or workers + 1
+        # spawn: forking a process that runs Tk and camera threads is not safe
+        self._executor = ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn"),
+                                             initializer=_init_worker, initargs=(seg,))
+        self._pools = {}
+        self._pools_lock = threading.Lock()
+        self._done = queue.SimpleQueue()
+
+    def _pool(self, kind, nbytes):
+        # Pool for this kind of frame, or None if the frame outgrew it
+        with self._pools_lock:
+            pool = self._pools.get(kind)
+            if pool is None:
+                pool = self._pools[kind] = SharedFramePool(self.slots, nbytes)
+                logger.info("Offload: %d x %.1f MB shared %s buffers", self.slots, nbytes / 1e6, kind)
+        return pool if nbytes <= pool.slot_bytes else None
+
+    def segment(self, depth, callback):
+        pool = self._pool("depth", depth.nbytes + depth.size)
+        if pool is None:
+            # Larger than the frames the pool was sized for: segment here
+            callback(depth, self.seg.segment(depth))
+            return True
+        index = pool.acquire()
+        if index is None:
+            return False
+        # Slot layout: depth, then the uint8 mask the worker writes
+        shared = pool.view(index, depth.shape, depth.dtype)
+        mask = pool.view(index, depth.shape, np.uint8, depth.nbytes)
+        with METRICS.measure("offload.copy"):
+            np.copyto(shared, depth)
+        submitted = time.perf_counter()
+        future = self._executor.submit(_segment, pool.handle(index, depth.shape, depth.dtype),
+                                       pool.handle(index, depth.shape, np.uint8, depth.nbytes))
+        # Runs on the executor's thread; the GUI picks the result up in poll()
+        future.add_done_callback(lambda f: self._done.put((f, pool, index, shared, mask, callback, submitted)))
+        return True
+
+    def poll(self):
+        while True:
+            try:
+                future, pool, index, depth, mask, callback, submitted = self._done.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                if future.cancelled():
+                    continue
+                error = future.exception()
+                if error is not None:
+                    logger.error("Offloaded segmentation failed: %s", error, extra={"every": 5.0})
+                    continue
+                METRICS.record("offload.segment", time.perf_counter() - submitted)
+                callback(depth, mask)
+            finally:
+                pool.release(index)
+
+    def encode(self, path, bgr, timeout=5.0):
+        pool = self._pool("color", bgr.nbytes)
+        index = pool.acquire(timeout) if pool is not None else None
+        if index is None:
+            # No slot (or too large): encode on the calling thread instead
+            ok, encoded = cv2.imencode(".jpg", bgr, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+            if not ok:
+                raise RuntimeError("JPEG encoding failed")
+            atomic_write_bytes(path, encoded.tobytes())
+            return path
+        try:
+            np.copyto(pool.view(index, bgr.shape, bgr.dtype), bgr)
+            return self._executor.submit(_encode, pool.handle(index, bgr.shape, bgr.dtype), path,
+                                         self.quality).result()
+        finally:
+            pool.release(index)
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        while not self._done.empty():
+            pool, index = self._done.get_nowait()[1:3]
+            pool.release(index)
+        with self._pools_lock:
+            for pool in self._pools.values():
+                pool.close()
+            self._pools = {}
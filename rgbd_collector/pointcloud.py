@@ -0,0 +1,221 @@
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from .save_pipeline import atomic_write_bytes, atomic_save_npy
+from .annotation_writer import read_label
+from .depth_store import open_depth_store
+from .manifest import MANIFEST_NAME, INTRINSICS_NAME
+
+POINT_FORMATS = ("ply", "npy")
+
+# One point as stored in both formats: float32 x, y, z in meters + 8-bit RGB
+# (15 bytes, no padding). The .npy files are plain structured arrays.
+POINT_DTYPE = np.dtype([("x", "<f4"), ("y", "<f4"), ("z", "<f4"),
+                        ("red", "u1"), ("green", "u1"), ("blue", "u1")])
+XYZ_DTYPE = np.dtype([("x", "<f4"), ("y", "<f4"), ("z", "<f4")])
+
+# Back-projection grids, shared by all PointCloudExporter instances:
+# (intrinsics, depth shape) -> (x / z, y / z) per pixel
+_RAYS = {}
+_RAYS_LOCK = threading.Lock()
+
+
+def scaled_intrinsics(intrinsics, shape):
+    # intrinsics: (fx, fy, cx, cy, width, height) for one resolution; scaled to shape
+    fx, fy, cx, cy, width, height = intrinsics
+    h, w = shape
+    sx = w / width if width else 1.0
+    sy = h / height if height else 1.0
+    return fx * sx, fy * sy, cx * sx, cy * sy
+
+
+def ray_grid(intrinsics, shape):
+    key = (tuple(intrinsics), tuple(shape))
+    with _RAYS_LOCK:
+        rays = _RAYS.get(key)
+        if rays is None:
+            fx, fy, cx, cy = scaled_intrinsics(intrinsics, shape)
+            h, w = shape
+            rx = ((np.arange(w, dtype=np.float64) - cx) / fx).astype(np.float32)
+            ry = ((np.arange(h, dtype=np.float64) - cy) / fy).astype(np.float32)
+            rays = (np.broadcast_to(rx, shape).ravel(), np.repeat(ry, w))
+            _RAYS[key] = rays
+    return rays
+
+
+def back_project(depth, intrinsics, rgb=None, mask=None, depth_scale=0.001):
+    # depth: uint16 (H, W); rgb: (H, W, 3) RGB with the depth's geometry or None;
+    # mask: nonzero where points are wanted. Pixels without depth are skipped.
+    # Returns a structured array of POINT_DTYPE (XYZ_DTYPE without rgb).
+    rx, ry = ray_grid(intrinsics, depth.shape)
+    valid = depth.ravel() != 0
+    if mask is not None:
+        valid &= mask.ravel() != 0
+    index = np.flatnonzero(valid)
+
+    z = depth.ravel()[index].astype(np.float32) * np.float32(depth_scale)
+    points = np.empty(len(index), dtype=POINT_DTYPE if rgb is not None else XYZ_DTYPE)
+    points["x"] = rx[index] * z
+    points["y"] = ry[index] * z
+    points["z"] = z
+    if rgb is not None:
+        colors = rgb.reshape(-1, 3)
+        points["red"] = colors[index, 0]
+        points["green"] = colors[index, 1]
+        points["blue"] = colors[index, 2]
+    return points
+
+
+def ply_bytes(points):
+    types = {"<f4": "float", "u1": "uchar"}
+    header = ["ply", "format binary_little_endian 1.0", f"element vertex {len(points)}"]
+    header += [f"property {types[points.dtype[name].str.replace('|', '')]} {name}" for name in points.dtype.names]
+    header.append("end_header")
+    return ("\n".join(header) + "\n").encode("ascii") + points.tobytes()
+
+
+def write_points(path, points):
+    # Format from the extension: .ply (binary) or .npy
+    path = str(path)
+    if path.endswith(".ply"):
+        atomic_write_bytes(path, ply_bytes(points))
+    else:
+        atomic_save_npy(path, points)
+    return path
+
+
+def save_intrinsics(root, camera, intrinsics):
+    # dataset/intrinsics.json: {camera: [fx, fy, cx, cy, width, height]} for the
+    # geometry of the saved depth, so clouds can be rebuilt from existing samples
+    path = Path(root) / INTRINSICS_NAME
+    data = load_intrinsics(root)
+    data[camera] = [float(v) for v in intrinsics]
+    atomic_write_bytes(str(path), json.dumps(data, indent=2).encode("utf-8"))
+
+
+def load_intrinsics(root):
+    path = Path(root) / INTRINSICS_NAME
+    if not path.exists():
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+class PointCloudExporter:
+    # Save-time export: <directory>/<name>.ply or .npy, masked by the sample's
+    # segmentation. Depth with the color image's geometry gets colored points.
+    def __init__(self, directory, fmt="ply", depth_scale=0.001, masked=True):
+        if fmt not in POINT_FORMATS:
+            raise ValueError(f"Unknown point cloud format {fmt!r}, expected one of {POINT_FORMATS}")
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.fmt = fmt
+        self.depth_scale = depth_scale
+        self.masked = masked
+
+    def put(self, name, depth, intrinsics, bgr=None, mask=None):
+        rgb = None
+        if bgr is not None and bgr.shape[:2] == depth.shape[:2]:
+            rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+        points = back_project(depth, intrinsics, rgb, mask if self.masked else None, self.depth_scale)
+        return write_points(self.directory / f"{name}.{self.fmt}", points)
+
+
+# --- Bulk export over an existing dataset ---
+
+_worker = {}
+
+
+def _init_worker(root, intrinsics, fmt, masked, depth_scale):
+    root = Path(root)
+    _worker["root"] = root
+    _worker["depth"] = open_depth_store(root / "depth")
+    _worker["intrinsics"] = intrinsics
+    _worker["exporter"] = PointCloudExporter(root / "points", fmt, depth_scale, masked)
+
+
+def _label_mask(label_path, shape):
+    # Rasterized label polygons (normalized YOLO coordinates), the saved segmentation
+    mask = np.zeros(shape, dtype=np.uint8)
+    if label_path.exists():
+        scale = np.array([shape[1], shape[0]], dtype=np.float32)
+        polygons = [np.round(points * scale).astype(np.int32) for _, points in read_label(label_path)]
+        if polygons:
+            cv2.fillPoly(mask, polygons, 1)
+    return mask
+
+
+def _export(task):
+    name, camera = task
+    root = _worker["root"]
+    exporter = _worker["exporter"]
+    intrinsics = _worker["intrinsics"].get(camera)
+    if intrinsics is None:
+        return name, "no intrinsics", 0
+
+    depth = np.asarray(_worker["depth"].get(name, mmap=True))
+    bgr = cv2.imread(str(root / "images" / f"{name}.jpg"), cv2.IMREAD_COLOR)
+    mask = _label_mask(root / "labels" / f"{name}.txt", depth.shape) if exporter.masked else None
+    if mask is not None and not mask.any():
+        return name, "no label", 0
+    path = exporter.put(name, depth, intrinsics, bgr, mask)
+    return name, "written", Path(path).stat().st_size
+
+
+def _cameras(root):
+    # name -> camera from the manifest (None for samples it doesn't know)
+    path = root / MANIFEST_NAME
+    cameras = {}
+    if path.exists():
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    cameras[record["name"]] = record.get("camera")
+    return cameras
+
+
+def export_dataset(root, fmt="ply", masked=True, camera=None, workers=None, chunksize=32, depth_scale=0.001):
+    root = Path(root)
+    intrinsics = load_intrinsics(root)
+    if not intrinsics:
+        raise FileNotFoundError(f"No {INTRINSICS_NAME} in {root}")
+    default = camera or (next(iter(intrinsics)) if len(intrinsics) == 1 else None)
+    cameras = _cameras(root)
+
+    names = open_depth_store(root / "depth").names()
+    tasks = [(name, cameras.get(name) or default) for name in names]
+    print(f"[INFO] Exporting {len(tasks)} point clouds as {fmt} to {root / 'points'}")
+
+    start = time.perf_counter()
+    counts = {}
+    total = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(str(root), intrinsics, fmt, masked, depth_scale)) as pool:
+        for name, status, size in pool.map(_export, tasks, chunksize=chunksize):
+            counts[status] = counts.get(status, 0) + 1
+            total += size
+    elapsed = time.perf_counter() - start
+    print(f"[INFO] {counts}, {total / 1e6:.1f} MB in {elapsed:.1f}s ({len(tasks) / max(elapsed, 1e-9):.0f} samples/s)")
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export point clouds for the samples of a dataset")
+    parser.add_argument("--dataset", default="dataset")
+    parser.add_argument("--format", choices=POINT_FORMATS, default="ply")
+    parser.add_argument("--full", action="store_true", help="Whole frame instead of the labeled object")
+    parser.add_argument("--camera", help="Intrinsics entry for samples without a camera in the manifest")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--chunksize", type=int, default=32)
+    args = parser.parse_args()
+
+    export_dataset(args.dataset, args.format, masked=not args.full, camera=args.camera,
+                   workers=args.workers, chunksize=args.chunksize)
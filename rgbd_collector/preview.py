@@ -0,0 +1,72 @@
+import time
+
+import cv2
+import numpy as np
+from PIL import Image, ImageTk
+
+from .metrics import METRICS
+
+
+class PreviewRenderer:
+    # Live preview into a single, reused Tk photo image. Frames arrive as RGB
+    # (display order) and are resized straight into a preallocated buffer, so the
+    # only per-frame work is one resize and one paste into the existing photo.
+    def __init__(self, label, size=(960, 540), interpolation=cv2.INTER_AREA):
+        self.label = label
+        self.size = size
+        self.interpolation = interpolation
+        width, height = size
+        self._buf = np.empty((height, width, 3), dtype=np.uint8)
+        self._photo = ImageTk.PhotoImage("RGB", size)
+
+    def show(self, rgb):
+        with METRICS.measure("preview.resize"):
+            if rgb.shape[:2] == self._buf.shape[:2]:
+                np.copyto(self._buf, rgb)
+            else:
+                cv2.resize(rgb, self.size, dst=self._buf, interpolation=self.interpolation)
+        with METRICS.measure("preview.photo"):
+            self._photo.paste(Image.frombuffer("RGB", self.size, self._buf, "raw", "RGB", 0, 1))
+        self._attach()
+
+    def _attach(self):
+        # capture_frame swaps in its own image; switch back when live again
+        if self.label.cget("image") != str(self._photo):
+            self.label.configure(image=self._photo)
+            self.label.imgtk = self._photo  # Keep a reference!
+
+
+class DepthPreviewRenderer(PreviewRenderer):
+    # Live depth + mask pane. Depth and mask are first scaled down to the pane
+    # (nearest neighbour, so no depths are invented at edges), then colorized
+    # with one table lookup straight into the packed buffer PIL reads from.
+    # colorizer: a DepthColorizer with order="rgb".
+    def __init__(self, label, colorizer, size=(480, 360)):
+        super().__init__(label, size, cv2.INTER_NEAREST)
+        self.colorizer = colorizer
+        width, height = size
+        self._depth = np.empty((height, width), dtype=np.uint16)
+        self._mask = np.empty((height, width), dtype=np.uint8)
+        self._packed = np.empty((height, width), dtype=np.uint32)
+
+    def show(self, depth, mask=None):
+        with METRICS.measure("preview.depth"):
+            cv2.resize(depth, self.size, dst=self._depth, interpolation=cv2.INTER_NEAREST)
+            if mask is not None:
+                cv2.resize(mask, self.size, dst=self._mask, interpolation=cv2.INTER_NEAREST)
+            self.colorizer.lookup(self._depth, self._mask if mask is not None else None, out=self._packed)
+        with METRICS.measure("preview.depth_photo"):
+            self._photo.paste(Image.frombuffer("RGB", self.size, self._packed, "raw", "RGBX", 0, 1))
+        self._attach()
+
+
+def next_delay_ms(last_timestamp, interval, now=None, min_delay=2):
+    # Wake up right after the next camera frame is due instead of polling at a
+    # fixed rate. last_timestamp is the arrival time of the frame just shown.
+    if last_timestamp is None:
+        return max(min_delay, int(interval * 1000))
+    now = time.monotonic() if now is None else now
+    wait = last_timestamp + interval - now
+    if wait <= 0:
+        wait = interval / 4  # frame is overdue, check again soon
+    return max(min_delay, int(wait * 1000) + 1)
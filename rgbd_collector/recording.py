@@ -0,0 +1,236 @@
+import json
+import logging
+import queue
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# A recording is a directory holding fixed-size raw frames, so it can be
+# memory-mapped as (N, H, W[, C]) arrays without any decoding:
+#   meta.json    shapes/dtypes, fps, camera, extra info (e.g. calibration)
+#   color.bin    RGB frames
+#   depth.bin    depth frames
+#   times.bin    float64 (system timestamp s, device timestamp ms) per frame
+# The frame count is derived from the file sizes, so a recording cut short by a
+# crash still replays up to its last complete frame.
+
+
+class Recorder:
+    # Frame listener for FrameGrabber. Frames are copied and queued; a writer
+    # thread appends them to the container. convert(color, depth, payload), if
+    # given, runs on the writer thread and returns the (color, depth) to store.
+    def __init__(self, path, convert=None, fps=30, camera=None, extra=None, max_pending=64):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.convert = convert
+        self.meta = {"fps": fps, "camera": camera, "extra": extra or {}}
+        self.frames = 0
+        self.dropped = 0
+
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._files = None
+        self._thread = threading.Thread(target=self._run, name="recorder", daemon=True)
+        self._thread.start()
+
+    def __call__(self, color, depth, timestamp, device_timestamp=None, payload=None):
+        item = (color.copy(), depth.copy(), timestamp, device_timestamp, payload)
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+        logger.info("Recorded %d frames to %s (%d dropped)", self.frames, self.path, self.dropped)
+
+    def _open(self, color, depth):
+        self.meta.update({
+            "color_shape": list(color.shape),
+            "color_dtype": color.dtype.str,
+            "depth_shape": list(depth.shape),
+            "depth_dtype": depth.dtype.str,
+        })
+        with open(self.path / "meta.json", "w") as f:
+            json.dump(self.meta, f, indent=2)
+        self._files = [open(self.path / name, "ab") for name in ("color.bin", "depth.bin", "times.bin")]
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            color, depth, timestamp, device_timestamp, payload = item
+            if self.convert is not None:
+                converted = self.convert(color, depth, payload)
+                if converted is None:
+                    self.dropped += 1
+                    continue
+                color, depth = converted
+            if self._files is None:
+                self._open(color, depth)
+
+            color_file, depth_file, times_file = self._files
+            color_file.write(np.ascontiguousarray(color).tobytes())
+            depth_file.write(np.ascontiguousarray(depth).tobytes())
+            device_ts = np.nan if device_timestamp is None else device_timestamp
+            times_file.write(np.array([timestamp, device_ts], dtype=np.float64).tobytes())
+            self.frames += 1
+
+        if self._files is not None:
+            for f in self._files:
+                f.close()
+
+
+class Recording:
+    # Memory-mapped read access to a recording
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path / "meta.json") as f:
+            self.meta = json.load(f)
+
+        color_shape = tuple(self.meta["color_shape"])
+        depth_shape = tuple(self.meta["depth_shape"])
+        color_dtype = np.dtype(self.meta["color_dtype"])
+        depth_dtype = np.dtype(self.meta["depth_dtype"])
+        color_size = int(np.prod(color_shape)) * color_dtype.itemsize
+        depth_size = int(np.prod(depth_shape)) * depth_dtype.itemsize
+
+        self.count = min(
+            (self.path / "color.bin").stat().st_size // color_size,
+            (self.path / "depth.bin").stat().st_size // depth_size,
+            (self.path / "times.bin").stat().st_size // 16,
+        )
+        if self.count == 0:
+            raise ValueError(f"Recording {self.path} contains no frames")
+
+        self.color = np.memmap(self.path / "color.bin", dtype=color_dtype, mode="r",
+                               shape=(self.count,) + color_shape)
+        self.depth = np.memmap(self.path / "depth.bin", dtype=depth_dtype, mode="r",
+                               shape=(self.count,) + depth_shape)
+        self.times = np.memmap(self.path / "times.bin", dtype=np.float64, mode="r",
+                               shape=(self.count, 2))
+
+    def __len__(self):
+        return self.count
+
+
+class ReplayFrame:
+    # Stand-in for an SDK frame, backed by a memory-mapped array
+    def __init__(self, data, timestamp, format=None):
+        self.data = data
+        self.timestamp = timestamp
+        self.format = format
+
+    def get_data(self):
+        return self.data
+
+    def get_width(self):
+        return self.data.shape[1]
+
+    def get_height(self):
+        return self.data.shape[0]
+
+    def get_timestamp(self):
+        return self.timestamp
+
+    def get_format(self):
+        return self.format
+
+    def __bool__(self):
+        return True
+
+
+class ReplayFrameset:
+    def __init__(self, color, depth):
+        self.color = color
+        self.depth = depth
+
+    def get_color_frame(self):
+        return self.color
+
+    def get_depth_frame(self):
+        return self.depth
+
+
+class ReplayCameraInterface:
+    # Drop-in for CameraInterface that plays a recording back.
+    # realtime=True paces frames by their recorded timestamps; False delivers
+    # them as fast as they are requested. Both camera protocols are served:
+    # RealSense recordings store aligned depth plus the intrinsics, Femto Bolt
+    # recordings store unregistered depth plus the calibration for registration.
+    # `camera` follows the recording, so captures go through the same step
+    # (align or register) as in the recorded session.
+    def __init__(self, path, realtime=True, loop=False):
+        self.path = path
+        self.realtime = realtime
+        self.loop = loop
+        self.recording = None
+        self.camera = "realsense"
+        self.index = 0
+        self._start = None
+
+    def setup_streams(self):
+        self.recording = Recording(self.path)
+        # Only Femto Bolt recordings hold unregistered depth
+        self.camera = "femto_bolt" if self.recording.meta.get("camera") == "femto_bolt" else "realsense"
+        self.index = 0
+        self._start = None
+        logger.info("Replaying %d frames from %s", len(self.recording), self.path)
+
+    def _next(self):
+        rec = self.recording
+        if self.index >= rec.count:
+            if not self.loop:
+                time.sleep(1.0 / rec.meta.get("fps", 30))  # end of recording
+                return None
+            self.index = 0
+            self._start = None
+
+        i = self.index
+        self.index += 1
+        system_ts, device_ts = rec.times[i]
+        if self.realtime:
+            now = time.monotonic()
+            if self._start is None:
+                self._start = (now, system_ts)
+            wait = self._start[0] + (system_ts - self._start[1]) - now
+            if wait > 0:
+                time.sleep(wait)
+
+        timestamp = float(device_ts) if not np.isnan(device_ts) else float(system_ts) * 1000.0
+        return ReplayFrameset(ReplayFrame(rec.color[i], timestamp, "RGB"), ReplayFrame(rec.depth[i], timestamp, "Y16"))
+
+    def get_frameset(self):
+        return self._next()
+
+    def get_intrinsics(self):
+        intrinsics = self.recording.meta["extra"].get("intrinsics")
+        if intrinsics is None:
+            raise RuntimeError("Recording has no intrinsics")
+        return tuple(intrinsics)
+
+    def align_frameset(self, frameset):
+        return np.array(frameset.color.data), np.array(frameset.depth.data)
+
+    def aligned(self, frameset):
+        return self.align_frameset(frameset)
+
+    def get_frames(self):
+        frameset = self._next()
+        if frameset is None:
+            return None, None
+        return frameset.color, frameset.depth
+
+    def get_calibration(self):
+        calibration = self.recording.meta["extra"].get("calibration")
+        if calibration is None:
+            raise RuntimeError("Recording has no calibration")
+        return calibration
+
+    def stop(self):
+        self.recording = None
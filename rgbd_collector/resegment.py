@@ -0,0 +1,166 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from .segmentation_helper import SegmentationHelper, PRESETS
+from .annotation_writer import AnnotationWriter, read_label
+from .depth_store import open_depth_store
+from .manifest import MANIFEST_NAME
+
+# Per-process state, set up once by _init_worker
+_worker = {}
+
+
+def _init_worker(root, seg_params, writer_params, dry_run):
+    root = Path(root)
+    _worker["root"] = root
+    _worker["depth"] = open_depth_store(root / "depth")
+    _worker["seg"] = SegmentationHelper(**seg_params)
+    _worker["writer"] = AnnotationWriter(**writer_params)
+    _worker["dry_run"] = dry_run
+
+
+def _image_shape(root, name, depth):
+    # Only the JPEG header is read
+    img_path = root / "images" / f"{name}.jpg"
+    if img_path.exists():
+        with Image.open(img_path) as img:
+            width, height = img.size
+        return height, width
+    return depth.shape[:2]
+
+
+def _rasterize(polygons, img_shape):
+    canvas = np.zeros(img_shape, dtype=np.uint8)
+    if polygons:
+        cv2.fillPoly(canvas, [np.round(p).astype(np.int32) for p in polygons], 1)
+    return canvas
+
+
+def iou(a, b):
+    union = np.count_nonzero(a | b)
+    if union == 0:
+        return 1.0
+    return np.count_nonzero(a & b) / union
+
+
+def _process(task):
+    name, label_class = task
+    root = _worker["root"]
+    seg = _worker["seg"]
+    writer = _worker["writer"]
+
+    depth = _worker["depth"].get(name, mmap=True)
+    img_shape = _image_shape(root, name, depth)
+    label_path = root / "labels" / f"{name}.txt"
+
+    old = read_label(label_path) if label_path.exists() else []
+    if label_class is None:
+        label_class = old[0][0] if old else 0
+
+    result = seg.analyze(np.asarray(depth))
+    instances = writer.result_instances(result, label_class)
+
+    if _worker["dry_run"]:
+        height, width = img_shape
+        scale = np.array([width, height], dtype=np.float32) if writer.normalized else 1
+        old_canvas = _rasterize([pts * scale for _, pts in old], img_shape)
+        # The polygons the writer would emit, i.e. after --epsilon simplification
+        polygons = [p for p in (writer.polygon(c) for _, c in instances) if p is not None]
+        new_canvas = _rasterize(polygons, img_shape)
+        old_points = sum(len(pts) for _, pts in old)
+        new_points = sum(len(p) for p in polygons)
+        return name, "dry-run", iou(old_canvas.astype(bool), new_canvas.astype(bool)), old_points, new_points
+
+    tmp = f"{label_path}.tmp"
+    if writer.write_instances(tmp, instances, img_shape):
+        os.replace(tmp, label_path)
+        return name, "written", None, None, None
+    if label_path.exists():
+        label_path.unlink()  # a stale label would no longer match the new parameters
+    return name, "empty", None, None, None
+
+
+def _classes_from_manifest(root):
+    path = root / MANIFEST_NAME
+    if not path.exists():
+        return {}
+    classes = {}
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                classes[record["name"]] = record["class"]
+    return classes
+
+
+def resegment(root, seg_params, writer_params=None, dry_run=False, workers=None, chunksize=64,
+              show_below=0.99):
+    root = Path(root)
+    names = open_depth_store(root / "depth").names()
+    classes = _classes_from_manifest(root)
+    tasks = [(name, classes.get(name)) for name in names]
+    print(f"[INFO] Re-segmenting {len(tasks)} samples with {seg_params}")
+
+    start = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(str(root), seg_params, writer_params or {}, dry_run)) as pool:
+        for result in pool.map(_process, tasks, chunksize=chunksize):
+            results.append(result)
+            name, status, score, old_points, new_points = result
+            if dry_run and score < show_below:
+                print(f"{name}: IoU {score:.3f} ({old_points} -> {new_points} points)")
+    elapsed = time.perf_counter() - start
+
+    if dry_run:
+        scores = np.array([r[2] for r in results]) if results else np.zeros(0)
+        changed = int(np.count_nonzero(scores < show_below))
+        mean = scores.mean() if scores.size else float("nan")
+        print(f"[DRY RUN] mean IoU {mean:.4f}, {changed}/{len(results)} samples below {show_below}")
+    else:
+        empty = sum(1 for r in results if r[1] == "empty")
+        print(f"[INFO] Wrote {len(results) - empty} labels, {empty} samples without an object")
+    print(f"[INFO] Done in {elapsed:.1f}s ({len(results) / max(elapsed, 1e-9):.0f} samples/s)")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Regenerate labels from saved depth frames")
+    parser.add_argument("--dataset", default="dataset")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="realsense",
+                        help="Camera the dataset was captured with")
+    parser.add_argument("--min-depth", type=int, default=None)
+    parser.add_argument("--max-depth", type=int, default=None)
+    parser.add_argument("--roi-ratio", type=float, default=None)
+    parser.add_argument("--min-area", type=float, default=None)
+    parser.add_argument("--max-area", type=float, default=None)
+    parser.add_argument("--epsilon", type=float, default=0.0, help="Polygon simplification tolerance (px)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--chunksize", type=int, default=64)
+    parser.add_argument("--dry-run", action="store_true", help="Only report IoU against the current labels")
+    parser.add_argument("--show-below", type=float, default=0.99, help="Dry run: list samples below this IoU")
+    args = parser.parse_args()
+
+    # Preset values, overridden by any limit given on the command line
+    seg_params = dict(PRESETS[args.preset])
+    for key in ("min_depth", "max_depth", "roi_ratio", "min_area", "max_area"):
+        if getattr(args, key) is not None:
+            seg_params[key] = getattr(args, key)
+
+    resegment(
+        args.dataset,
+        seg_params=seg_params,
+        writer_params={"epsilon": args.epsilon},
+        dry_run=args.dry_run,
+        workers=args.workers,
+        chunksize=args.chunksize,
+        show_below=args.show_below,
+    )
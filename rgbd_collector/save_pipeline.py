@@ -0,0 +1,203 @@
+import contextlib
+import logging
+import os
+import queue
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from .metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+
+def _tmp_path(path):
+    # Temp file lives next to the target so os.replace() stays an atomic rename
+    return f"{path}.tmp"
+
+
+def atomic_write_bytes(path, data):
+    tmp = _tmp_path(path)
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def atomic_save_npy(path, array):
+    tmp = _tmp_path(path)
+    with open(tmp, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp, path)
+
+
+def _discard(path):
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(_tmp_path(path))
+
+
+class SaveJob:
+    def __init__(self, name, rgb, depth, segmentation, label_class, sample_id=None, timestamp=None,
+                 intrinsics=None, camera=None, hashes=None):
+        self.name = name
+        self.rgb = rgb
+        self.depth = depth
+        self.segmentation = segmentation  # SegmentationResult from capture
+        self.label_class = label_class
+        self.sample_id = sample_id
+        self.timestamp = timestamp
+        self.intrinsics = intrinsics      # (fx, fy, cx, cy, width, height) of the depth, for point clouds
+        self.camera = camera              # camera name in multi-camera sessions
+        self.hashes = hashes              # (rgb, depth) perceptual hashes from the duplicate check, if any
+        self.files = {}  # filled in by the worker once the sample is on disk
+        self.submitted = None
+
+
+class SavePipeline:
+    # Bounded queue + small pool of writer threads. cv2.imencode and file I/O
+    # release the GIL, so a couple of threads keep up with back-to-back captures.
+    def __init__(self, img_dir, depth_store, label_dir, writer, workers=2, max_pending=8, on_done=None,
+                 pointclouds=None, encoder=None):
+        self.img_dir = img_dir
+        self.depth_store = depth_store
+        self.label_dir = label_dir
+        self.writer = writer
+        self.pointclouds = pointclouds  # optional PointCloudExporter
+        self.encoder = encoder  # optional FrameOffload: JPEG encoding in a worker process
+        self.on_done = on_done  # called as on_done(job, ok) from a worker thread
+
+        self._queue = queue.Queue()
+        self._free = threading.Semaphore(max_pending)  # room left in the queue, taken by submit
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._threads = []
+        for i in range(workers):
+            t = threading.Thread(target=self._run, name=f"save-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def submit(self, job, timeout=None):
+        # Returns False instead of blocking the caller when the queue is full
+        return self.submit_all([job], timeout)
+
+    def submit_all(self, jobs, timeout=None):
+        # Queues every job, or none if the queue can't take them all within
+        # timeout (e.g. the per-camera files of one multi-camera capture)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        taken = 0
+        for _ in jobs:
+            if deadline is None:
+                ok = self._free.acquire(blocking=False)
+            else:
+                ok = self._free.acquire(timeout=max(deadline - time.monotonic(), 0))
+            if not ok:
+                for _ in range(taken):
+                    self._free.release()
+                return False
+            taken += 1
+        for job in jobs:
+            job.submitted = time.perf_counter()
+            self._queue.put(job)
+        return True
+
+    def pending(self):
+        with self._lock:
+            return self._queue.qsize() + self._in_flight
+
+    def flush(self):
+        self._queue.join()
+
+    def close(self):
+        self.flush()
+        for _ in self._threads:
+            self._queue.put(None)
+        for t in self._threads:
+            t.join()
+        self._threads = []
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                self._queue.task_done()
+                return
+            with self._lock:
+                self._in_flight += 1
+            self._free.release()
+            METRICS.record("save.queued", time.perf_counter() - job.submitted)
+            ok = False
+            try:
+                with METRICS.measure("save.total"):
+                    ok = self._save(job)
+            except Exception as e:
+                logger.error("Saving %s failed: %s", job.name, e)
+            try:
+                if self.on_done is not None:
+                    self.on_done(job, ok)
+            finally:
+                # Only now is the job done, so flush() also waits for on_done
+                with self._lock:
+                    self._in_flight -= 1
+                self._queue.task_done()
+
+    def _save(self, job):
+        img_path = str(self.img_dir / f"{job.name}.jpg")
+        label_path = str(self.label_dir / f"{job.name}.txt")
+
+        # Depth and label go first, the image last: a visible image means the
+        # whole sample made it to disk.
+        depth_path = None
+        points_path = None
+        has_label = False
+        try:
+            with METRICS.measure("save.depth"):
+                depth_path = self.depth_store.put(job.name, job.depth)
+
+            if self.pointclouds is not None and job.intrinsics is not None:
+                with METRICS.measure("save.points"):
+                    points_path = self.pointclouds.put(job.name, job.depth, job.intrinsics, job.rgb,
+                                                       job.segmentation.mask)
+
+            with METRICS.measure("save.label"):
+                has_label = self.writer.write_result(
+                    _tmp_path(label_path),
+                    job.segmentation,
+                    job.rgb.shape[:2],
+                    label_class=job.label_class
+                )
+                if has_label:
+                    os.replace(_tmp_path(label_path), label_path)
+            if not has_label:
+                logger.warning("No contour found for %s, label not written", job.name)
+
+            if self.encoder is not None:
+                # Encoded and written (atomically) by the worker process
+                with METRICS.measure("save.encode"):
+                    self.encoder.encode(img_path, job.rgb)
+            else:
+                with METRICS.measure("save.encode"):
+                    ok, encoded = cv2.imencode(".jpg", job.rgb)
+                if not ok:
+                    raise RuntimeError("JPEG encoding failed")
+                with METRICS.measure("save.image"):
+                    atomic_write_bytes(img_path, encoded.tobytes())
+        except Exception:
+            # Nothing of a failed sample stays behind
+            for path in (img_path, label_path):
+                _discard(path)
+            for path in (label_path if has_label else None, points_path):
+                if path is not None:
+                    # Already gone is fine; the original error is what gets raised
+                    with contextlib.suppress(FileNotFoundError):
+                        os.remove(path)
+            if depth_path is not None:
+                try:
+                    self.depth_store.delete(job.name)  # the file, or the shard's index entry
+                except Exception as e:
+                    logger.warning("Could not remove the depth of %s: %s", job.name, e)
+            raise
+
+        job.files = {"image": img_path, "depth": depth_path, "label": label_path if has_label else None,
+                     "points": points_path}
+        return has_label
@@ -0,0 +1,124 @@
+import numpy as np
+import cv2
+
+# Above this many rejected blobs a full-crop lookup beats erasing them one by one
+MAX_CLEARED_BLOBS = 64
+
+class SegmentationResult:
+    # Everything one segmentation pass produces, so the preview overlay and the
+    # annotation writer don't have to extract contours again.
+    def __init__(self, mask, contours, areas, boxes, chosen):
+        self.mask = mask          # uint8 {0, 1}, full frame
+        self.contours = contours  # external contours in full-frame pixel coordinates
+        self.areas = areas        # contour areas (float array)
+        self.boxes = boxes        # bounding boxes as (x, y, w, h) rows
+        self.chosen = chosen      # index of the selected (largest) instance, -1 if none
+
+    @property
+    def contour(self):
+        return self.contours[self.chosen] if self.chosen >= 0 else None
+
+    @classmethod
+    def from_mask(cls, mask, roi=None):
+        # roi: optional (rows, cols) slices that contain every foreground pixel
+        region = mask if roi is None else mask[roi]
+        offset = (0, 0) if roi is None else (roi[1].start, roi[0].start)
+        contours, _ = cv2.findContours(region, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE, offset=offset)
+        areas = np.array([cv2.contourArea(c) for c in contours], dtype=np.float64)
+        boxes = np.array([cv2.boundingRect(c) for c in contours], dtype=np.int32).reshape(-1, 4)
+        chosen = int(np.argmax(areas)) if len(contours) else -1
+        return cls(mask, contours, areas, boxes, chosen)
+
+# Per-camera defaults (depth in mm, areas in pixels). RealSense keeps the whole
+# frame; the Femto Bolt looks at a central crop and drops stray blobs.
+PRESETS = {
+    "realsense": {"min_depth": 300, "max_depth": 1200},
+    "femto_bolt": {"min_depth": 300, "max_depth": 380, "roi_ratio": 0.7, "min_area": 800, "max_area": 50000},
+}
+
+class SegmentationHelper:
+    def __init__(self, min_depth=300, max_depth=1200, roi_ratio=1.0, min_area=None, max_area=None):
+        self.min_depth = min_depth
+        self.max_depth = max_depth
+        self.roi_ratio = roi_ratio
+        self.min_area = min_area
+        self.max_area = max_area
+        self._buffers = {}  # scratch buffers keyed by frame shape
+
+    def _scratch(self, shape):
+        buf = self._buffers.get(shape)
+        if buf is None:
+            # Central ROI, computed once per frame shape
+            h, w = shape
+            roi_h = int(h * self.roi_ratio)
+            roi_w = int(w * self.roi_ratio)
+            start_h = (h - roi_h) // 2
+            start_w = (w - roi_w) // 2
+            buf = {
+                "roi": (slice(start_h, start_h + roi_h), slice(start_w, start_w + roi_w)),
+                "binary": np.empty((roi_h, roi_w), dtype=np.uint8),
+                "labels": np.empty((roi_h, roi_w), dtype=np.int32),
+            }
+            self._buffers[shape] = buf
+        return buf
+
+    def segment(self, depth_map, out=None):
+        # Pass a uint8 array of the frame's shape as `out` to segment live frames
+        # without allocating; otherwise a new mask is returned.
+        buf = self._scratch(depth_map.shape)
+        rows, cols = buf["roi"]
+        if out is None:
+            out = np.zeros(depth_map.shape, dtype=np.uint8)
+        else:
+            out[:rows.start] = 0
+            out[rows.stop:] = 0
+            out[:, :cols.start] = 0
+            out[:, cols.stop:] = 0
+
+        # Step 1: Depth-range threshold, only inside the ROI crop
+        # (depth is integer mm, so (min, max) exclusive == [min + 1, max - 1])
+        cv2.inRange(depth_map[rows, cols], self.min_depth + 1, self.max_depth - 1, dst=buf["binary"])
+
+        out_roi = out[rows, cols]
+        if self.min_area is None and self.max_area is None:
+            # No area limits: the threshold mask is the result
+            cv2.threshold(buf["binary"], 0, 1, cv2.THRESH_BINARY, dst=out_roi)
+            return out
+
+        # Step 2: One connected-components pass gives every blob's pixel area
+        n, labels, stats, _ = cv2.connectedComponentsWithStatsWithAlgorithm(
+            buf["binary"], 8, cv2.CV_32S, cv2.CCL_GRANA, labels=buf["labels"]
+        )
+
+        # Step 3: Keep blobs within the area limits
+        areas = stats[1:, cv2.CC_STAT_AREA]
+        keep = np.ones(len(areas), dtype=bool)
+        if self.min_area is not None:
+            keep &= areas > self.min_area
+        if self.max_area is not None:
+            keep &= areas < self.max_area
+        rejected = np.flatnonzero(~keep) + 1
+        if len(rejected) <= MAX_CLEARED_BLOBS:
+            # Usual case: start from the threshold mask and erase the few rejected blobs
+            cv2.threshold(buf["binary"], 0, 1, cv2.THRESH_BINARY, dst=out_roi)
+            for label in rejected:
+                x, y, bw, bh = stats[label, :4]
+                box = out_roi[y:y + bh, x:x + bw]
+                box[labels[y:y + bh, x:x + bw] == label] = 0
+        else:
+            # Noisy frame: a label -> {0, 1} lookup over the whole crop
+            lut = np.zeros(n, dtype=np.uint8)
+            lut[1:] = keep
+            np.take(lut, labels, out=out_roi, mode="clip")
+
+        return out
+
+    def analyze(self, depth_map, out=None):
+        mask = self.segment(depth_map, out=out)
+        # Contours only need to be searched for inside the ROI
+        return SegmentationResult.from_mask(mask, roi=self._scratch(depth_map.shape)["roi"])
+
+
+def create_segmentation(camera, **overrides):
+    # Helper with the camera's preset, e.g. create_segmentation("femto_bolt", max_depth=400)
+    return SegmentationHelper(**{**PRESETS[camera], **overrides})
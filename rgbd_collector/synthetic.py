@@ -0,0 +1,150 @@
+import time
+
+import numpy as np
+
+from .recording import ReplayFrameset
+
+# Depth range (mm) the synthetic object is placed in, inside each camera's
+# default segmentation range
+TARGETS = {"realsense": (600, 900), "femto_bolt": (320, 360)}
+
+
+# --- Synthetic RGB-D frames ---
+
+def synthetic_depth(size, seed=0, background=1500, target=(600, 900), noise=4, holes=0.02):
+    # uint16 mm: a tilted background plane, one elliptical object inside the
+    # segmentation range near the centre, sensor noise and a few invalid (0) pixels
+    width, height = size
+    rng = np.random.default_rng(seed)
+    v, u = np.mgrid[0:height, 0:width]
+    depth = background + 200.0 * v / height
+    mask = ((u - width * 0.52) / (width * 0.12)) ** 2 + ((v - height * 0.48) / (height * 0.15)) ** 2 <= 1.0
+    near, far = target
+    depth[mask] = near + (far - near) * (u[mask] / width)
+    depth += rng.normal(0, noise, depth.shape)
+    depth[rng.random(depth.shape) < holes] = 0
+    return np.clip(depth, 0, 65535).astype(np.uint16)
+
+
+def synthetic_color(size, seed=0):
+    # uint8 RGB: smooth gradients plus noise, so JPEG has realistic work to do
+    width, height = size
+    rng = np.random.default_rng(seed)
+    v, u = np.mgrid[0:height, 0:width]
+    rgb = np.stack([255 * u / width, 255 * v / height, 128 + 64 * np.sin(u / 17.0)], axis=-1)
+    rgb += rng.normal(0, 6, rgb.shape)
+    return np.clip(rgb, 0, 255).astype(np.uint8)
+
+
+def synthetic_calibration(color_size, depth_size):
+    # Plausible Femto Bolt intrinsics/extrinsics for the given resolutions
+    cw, ch = color_size
+    dw, dh = depth_size
+    return {
+        "depth": (0.79 * dw, 0.79 * dw, dw / 2, dh / 2, dw, dh),
+        "color": (0.58 * cw, 0.58 * cw, cw / 2, ch / 2, cw, ch),
+        "rotation": (1, 0, 0, 0, 1, 0, 0, 0, 1),
+        "translation": (-32.0, -1.5, 1.2),
+    }
+
+
+class SyntheticFrame:
+    # Minimal stand-in for an SDK video frame
+    def __init__(self, data, width, height, format, timestamp=0.0):
+        self.data = data
+        self.width = width
+        self.height = height
+        self.format = format
+        self.timestamp = timestamp
+
+    def get_data(self):
+        return self.data
+
+    def get_width(self):
+        return self.width
+
+    def get_height(self):
+        return self.height
+
+    def get_format(self):
+        return self.format
+
+    def get_timestamp(self):
+        return self.timestamp
+
+    def __bool__(self):
+        return True
+
+
+class SyntheticCameraInterface:
+    # The "synthetic" camera backend: synthetic RGB-D frames at a fixed rate,
+    # with its own device clock (offset_ms from the system clock, plus jitter_ms
+    # of noise), so the apps and multi-camera pairing run without hardware.
+    # Color and depth share one geometry: framesets come "aligned" already and
+    # the calibration is the identity. `camera` picks which camera it stands in
+    # for ("realsense" or "femto_bolt"), i.e. its depth range and capture path.
+    def __init__(self, fps=30, size=(640, 480), offset_ms=0.0, jitter_ms=0.0, seed=0, target=None,
+                 camera="realsense"):
+        self.camera = camera
+        self.fps = fps
+        self.size = size
+        self.offset_ms = offset_ms
+        self.jitter_ms = jitter_ms
+        self.seed = seed
+        self.target = target or TARGETS[camera]
+        self.frames = []
+        self.index = 0
+        self._next_time = None
+        self._rng = np.random.default_rng(seed)
+
+    def setup_streams(self):
+        # A few pre-generated frames, cycled, so the stand-in itself costs nothing
+        self.frames = [(synthetic_color(self.size, self.seed + i),
+                        synthetic_depth(self.size, self.seed + i, target=self.target)) for i in range(4)]
+        self.index = 0
+        self._next_time = None
+
+    def _next(self):
+        now = time.monotonic()
+        if self._next_time is None:
+            self._next_time = now
+        wait = self._next_time - now
+        if wait > 0:
+            time.sleep(wait)
+        self._next_time += 1.0 / self.fps
+
+        color, depth = self.frames[self.index % len(self.frames)]
+        self.index += 1
+        timestamp = time.monotonic() * 1000.0 + self.offset_ms + self._rng.normal(0, self.jitter_ms)
+        height, width = depth.shape
+        return ReplayFrameset(SyntheticFrame(color, width, height, "RGB", timestamp),
+                              SyntheticFrame(depth, width, height, "Y16", timestamp))
+
+    # Frameset protocol (RealSense)
+
+    def get_frameset(self):
+        return self._next()
+
+    def get_intrinsics(self):
+        width, height = self.size
+        return (0.9 * width, 0.9 * width, width / 2, height / 2, width, height)
+
+    def align_frameset(self, frameset):
+        return np.array(frameset.color.data), np.array(frameset.depth.data)
+
+    def aligned(self, frameset):
+        return self.align_frameset(frameset)
+
+    # Separate-frames protocol (Femto Bolt)
+
+    def get_frames(self):
+        frameset = self._next()
+        return frameset.color, frameset.depth
+
+    def get_calibration(self):
+        intrinsics = self.get_intrinsics()
+        return {"depth": intrinsics, "color": intrinsics,
+                "rotation": (1.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 1.0), "translation": (0.0, 0.0, 0.0)}
+
+    def stop(self):
+        self.frames = []
@@ -0,0 +1,363 @@
+import argparse
+import json
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from .depth_store import open_depth_store
+from .manifest import MANIFEST_NAME
+
+CACHE_NAME = "validation_cache.json"
+# Bump when the checks change, so cached results from older checks are redone
+CACHE_VERSION = 2
+
+# Problems that make a sample unusable for training
+ERRORS = {
+    "missing_image": "no image",
+    "bad_image": "image can't be decoded",
+    "missing_depth": "no depth frame",
+    "bad_depth": "depth frame can't be read or isn't 2-D uint16",
+    "missing_label": "no label file",
+    "empty_label": "label file has no polygon",
+    "bad_label": "label line isn't '<class> x1 y1 x2 y2 x3 y3 ...'",
+    "out_of_range": "polygon coordinate outside [0, 1]",
+    "degenerate": "polygon has zero area",
+}
+# Worth a look, but the sample can still be used
+WARNINGS = {
+    "size_mismatch": "depth and image sizes differ",
+    "class_mismatch": "label class differs from the manifest",
+    "no_depth_in_polygon": "no valid depth inside the polygon",
+    "not_in_manifest": "files without a manifest record",
+}
+
+# Polygon area as a fraction of the image
+AREA_BINS = [0, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0]
+
+
+# --- Per-sample checks (worker processes) ---
+
+_worker = {}
+
+
+def _init_worker(root):
+    cv2.setNumThreads(1)
+    root = Path(root)
+    _worker["root"] = root
+    _worker["depth"] = open_depth_store(root / "depth")
+
+
+def _image_shape(path):
+    # Decodes at 1/8 scale (JPEG DCT scaling): catches truncated or corrupt
+    # files for a fraction of a full decode. Returns (height, width) or None.
+    try:
+        with Image.open(path) as img:
+            width, height = img.size
+            img.draft("L", (width // 8, height // 8))
+            img.load()
+        return height, width
+    except (OSError, SyntaxError, ValueError):
+        return None
+
+
+def _parse_label(path, issues):
+    # [(class, Nx2 float64 points)] of the well-formed lines; problems go to issues
+    instances = []
+    with open(path) as f:
+        for line in f:
+            values = line.split()
+            if not values:
+                continue
+            try:
+                label_class = int(values[0])
+                coords = np.array(values[1:], dtype=np.float64)
+            except ValueError:
+                issues.add("bad_label")
+                continue
+            if coords.size < 6 or coords.size % 2:
+                issues.add("bad_label")
+                continue
+            instances.append((label_class, coords.reshape(-1, 2)))
+    return instances
+
+
+def _area(points):
+    # Shoelace formula
+    x, y = points[:, 0], points[:, 1]
+    return 0.5 * abs(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1)))
+
+
+def _object_depth(depth, polygons):
+    # Median valid depth (mm) inside the polygons, or None
+    height, width = depth.shape
+    mask = np.zeros((height, width), dtype=np.uint8)
+    scale = np.array([width, height], dtype=np.float64)
+    cv2.fillPoly(mask, [np.round(p * scale).astype(np.int32) for p in polygons], 1)
+    values = depth[(mask > 0) & (depth > 0)]
+    return float(np.median(values)) if values.size else None
+
+
+def _check(task):
+    # -> (issues, [(class, area fraction)], object depth mm, valid depth fraction)
+    name, manifest_class = task
+    root = _worker["root"]
+    issues = set()
+
+    image_shape = None
+    image_path = root / "images" / f"{name}.jpg"
+    if not image_path.exists():
+        issues.add("missing_image")
+    else:
+        image_shape = _image_shape(image_path)
+        if image_shape is None:
+            issues.add("bad_image")
+
+    depth = None
+    if name not in _worker["depth"]:
+        issues.add("missing_depth")
+    else:
+        try:
+            depth = np.asarray(_worker["depth"].get(name, mmap=True))
+        except (OSError, ValueError, KeyError):
+            depth = None
+        if depth is None or depth.ndim != 2 or depth.dtype != np.uint16:
+            issues.add("bad_depth")
+            depth = None
+    if depth is not None and image_shape is not None and depth.shape != image_shape:
+        issues.add("size_mismatch")
+
+    instances = []
+    label_path = root / "labels" / f"{name}.txt"
+    if not label_path.exists():
+        issues.add("missing_label")
+    else:
+        instances = _parse_label(label_path, issues)
+        if not instances and "bad_label" not in issues:
+            issues.add("empty_label")
+
+    areas = []
+    polygons = []
+    for label_class, points in instances:
+        if points.min() < 0 or points.max() > 1:
+            issues.add("out_of_range")
+            continue
+        area = _area(points)
+        if area <= 0:
+            issues.add("degenerate")
+            continue
+        if manifest_class is not None and label_class != manifest_class:
+            issues.add("class_mismatch")
+        areas.append((label_class, area))
+        polygons.append(points)
+
+    object_depth = None
+    valid = None
+    if depth is not None:
+        valid = float(np.count_nonzero(depth)) / depth.size
+        if polygons:
+            object_depth = _object_depth(depth, polygons)
+            if object_depth is None:
+                issues.add("no_depth_in_polygon")
+    return sorted(issues), areas, object_depth, valid
+
+
+# --- Dataset scan, cache and report ---
+
+def _stats(root, directory, suffix):
+    # {name: (path relative to root, [size, mtime_ns])} of the directory's files with this suffix
+    stats = {}
+    if (root / directory).is_dir():
+        with os.scandir(root / directory) as entries:
+            for entry in entries:
+                if entry.name.endswith(suffix):
+                    stat = entry.stat()
+                    stats[entry.name[:-len(suffix)]] = (f"{directory}/{entry.name}", [stat.st_size, stat.st_mtime_ns])
+    return stats
+
+
+def _depth_stats(root):
+    # Same for depth frames, whatever store holds them. A shard changes with
+    # every append, so a sharded frame is keyed by its shard path plus its
+    # (shard, offset, length) entry instead of the shard's size and mtime.
+    reader = open_depth_store(root / "depth")
+    stats = {}
+    # Same precedence as DepthReader: the first store holding a name serves it
+    for store in reversed(reader.stores):
+        for name, signature in store.signatures().items():
+            stats[name] = (Path(os.path.relpath(store.path(name), root)).as_posix(), list(signature))
+    reader.close()
+    return stats
+
+
+def _manifest_classes(root):
+    path = root / MANIFEST_NAME
+    if not path.exists():
+        return None
+    classes = {}
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                classes[record["name"]] = record["class"]
+    return classes
+
+
+def _load_cache(path):
+    # {name: (key, result)}; the cache is plain JSON:
+    #   {"version", "samples": {name: {"key": {"files": {path: [size, mtime_ns]}, "class"},
+    #                                  "issues", "polygons", "object_depth", "valid_depth"}}}
+    try:
+        with open(path) as f:
+            cache = json.load(f)
+        if cache.get("version") != CACHE_VERSION:
+            return {}
+        return {name: (entry["key"], (entry["issues"], [tuple(a) for a in entry["polygons"]],
+                                      entry["object_depth"], entry["valid_depth"]))
+                for name, entry in cache["samples"].items()}
+    except FileNotFoundError:
+        pass
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        print(f"[WARNING] Ignoring unreadable validation cache {path}: {e}")
+    return {}
+
+
+def _save_cache(path, samples):
+    entries = {}
+    for name, (key, (issues, areas, object_depth, valid)) in samples.items():
+        entries[name] = {"key": key, "issues": issues, "polygons": areas,
+                         "object_depth": object_depth, "valid_depth": valid}
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w") as f:
+        json.dump({"version": CACHE_VERSION, "samples": entries}, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def validate(root, workers=None, chunksize=64, use_cache=True):
+    # {name: (issues, areas, object depth, valid fraction)} for every sample.
+    # A sample is only re-checked when one of its files (or its manifest class)
+    # changed since the cached result.
+    root = Path(root)
+    images = _stats(root, "images", ".jpg")
+    labels = _stats(root, "labels", ".txt")
+    depth = _depth_stats(root)
+    classes = _manifest_classes(root)
+    names = sorted(set(images) | set(labels) | set(depth) | set(classes or ()))
+
+    cache_path = root / CACHE_NAME
+    cached = _load_cache(cache_path) if use_cache else {}
+    samples = {}
+    tasks = []
+    for name in names:
+        manifest_class = classes.get(name) if classes is not None else None
+        files = dict(stats[name] for stats in (images, labels, depth) if name in stats)
+        key = {"files": files, "class": manifest_class}
+        entry = cached.get(name)
+        if entry is not None and entry[0] == key:
+            samples[name] = entry
+        else:
+            samples[name] = (key, None)
+            tasks.append((name, manifest_class))
+
+    start = time.perf_counter()
+    if tasks:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(str(root),)) as pool:
+            for (name, _), result in zip(tasks, pool.map(_check, tasks, chunksize=chunksize)):
+                samples[name] = (samples[name][0], result)
+        if use_cache:
+            _save_cache(cache_path, samples)
+    elapsed = time.perf_counter() - start
+    print(f"[INFO] Checked {len(tasks)} samples in {elapsed:.1f}s, "
+          f"{len(names) - len(tasks)} unchanged since the last run")
+
+    results = {name: result for name, (_, result) in samples.items()}
+    if classes is not None:
+        for name, (issues, areas, object_depth, valid) in results.items():
+            if name not in classes:
+                results[name] = (issues + ["not_in_manifest"], areas, object_depth, valid)
+    return results
+
+
+def _histogram(title, counts, labels):
+    print(title)
+    peak = max(max(counts), 1)
+    for label, count in zip(labels, counts):
+        print(f"  {label:>18} {count:8d} {'#' * int(round(40 * count / peak))}")
+
+
+def report(results, show=20, depth_bin=50):
+    errors = Counter()
+    warnings = Counter()
+    bad = []
+    for name, (issues, _, _, _) in results.items():
+        errors.update(i for i in issues if i in ERRORS)
+        warnings.update(i for i in issues if i in WARNINGS)
+        if any(i in ERRORS for i in issues):
+            bad.append(name)
+    print(f"[INFO] {len(results)} samples, {len(results) - len(bad)} valid, {len(bad)} with errors")
+    for code, count in errors.most_common():
+        print(f"  [ERROR] {count:6d}  {ERRORS[code]} ({code})")
+    for code, count in warnings.most_common():
+        print(f"  [WARNING] {count:4d}  {WARNINGS[code]} ({code})")
+    for name in bad[:show]:
+        print(f"  {name}: {', '.join(results[name][0])}")
+    if len(bad) > show:
+        print(f"  ... and {len(bad) - show} more")
+
+    # Statistics of the valid samples
+    samples_per_class = Counter()
+    instances_per_class = Counter()
+    areas = []
+    depths = []
+    for name, (issues, sample_areas, object_depth, _) in results.items():
+        if any(i in ERRORS for i in issues):
+            continue
+        samples_per_class.update({c for c, _ in sample_areas})
+        instances_per_class.update(c for c, _ in sample_areas)
+        areas.extend(a for _, a in sample_areas)
+        if object_depth is not None:
+            depths.append(object_depth)
+
+    print("Per class:")
+    for label_class in sorted(instances_per_class):
+        print(f"  class {label_class}: {samples_per_class[label_class]} samples, "
+              f"{instances_per_class[label_class]} polygons")
+    if areas:
+        counts, _ = np.histogram(areas, bins=AREA_BINS)
+        _histogram("Polygon area (fraction of the image):", counts,
+                   [f"{lo:g}-{hi:g}" for lo, hi in zip(AREA_BINS[:-1], AREA_BINS[1:])])
+    if depths:
+        depths = np.array(depths)
+        low = int(depths.min() // depth_bin * depth_bin)
+        bins = np.arange(low, depths.max() + depth_bin + 1, depth_bin)
+        counts, _ = np.histogram(depths, bins=bins)
+        _histogram(f"Object depth (median inside the polygon, mm), {len(depths)} samples:", counts,
+                   [f"{lo:.0f}-{hi:.0f}" for lo, hi in zip(bins[:-1], bins[1:])])
+    return bad
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check every image/depth/label triple and report dataset stats")
+    parser.add_argument("--dataset", default="dataset")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--chunksize", type=int, default=64)
+    parser.add_argument("--no-cache", action="store_true", help=f"Re-check everything, don't touch {CACHE_NAME}")
+    parser.add_argument("--show", type=int, default=20, help="List this many samples with errors")
+    parser.add_argument("--depth-bin", type=int, default=50, help="Depth histogram bin width, mm")
+    parser.add_argument("--json", help="Also write every sample's issues and stats to this file")
+    args = parser.parse_args()
+
+    results = validate(args.dataset, args.workers, args.chunksize, use_cache=not args.no_cache)
+    bad = report(results, args.show, args.depth_bin)
+    if args.json:
+        with open(args.json, "w") as f:
+            for name, (issues, areas, object_depth, valid) in results.items():
+                f.write(json.dumps({"name": name, "issues": issues, "polygons": areas,
+                                    "object_depth": object_depth, "valid_depth": valid}) + "\n")
+        print(f"[INFO] Per-sample results written to {args.json}")
+    raise SystemExit(1 if bad else 0)
@@ -0,0 +1,282 @@
+import argparse
+import bisect
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from .colorize import DepthColorizer
+from .dataset_reader import DatasetReader, LRUCache
+
+logger = logging.getLogger(__name__)
+
+THUMB_DIR = ".thumbs"
+THUMB_SIZE = (160, 120)  # per pane; a thumbnail is RGB | depth side by side
+GRID = (4, 4)            # thumbnails per page (columns, rows)
+VIEW_WIDTH = 1600        # single-sample view is scaled down to this width
+PREFETCH = 4             # samples decoded ahead/behind the current one
+
+HELP = ("[a/d] prev/next  [w/s] page  [g] grid  [<n> Enter] go to id  "
+        "[<n> c] next of class n  [c] next of this class  [q] quit")
+
+
+def depth_range(records, fallback=(300, 1200)):
+    # Shared color scale from the manifest's per-sample object depth ranges
+    lows = [r["depth_min"] for r in records if r.get("depth_min")]
+    highs = [r["depth_max"] for r in records if r.get("depth_max")]
+    if not lows or not highs:
+        return fallback
+    low, high = int(np.percentile(lows, 5)), int(np.percentile(highs, 95))
+    margin = max((high - low) // 4, 10)
+    return max(low - margin, 1), high + margin
+
+
+def draw_polygons(image, polygons, color=(0, 255, 0), thickness=2):
+    h, w = image.shape[:2]
+    scale = np.array([w, h], dtype=np.float32)
+    pts = [np.round(points * scale).astype(np.int32) for _, points in polygons]
+    if pts:
+        cv2.polylines(image, pts, True, color, thickness, cv2.LINE_AA)
+    return image
+
+
+class ThumbnailCache:
+    # <dataset>/.thumbs/<name>.jpg, rebuilt when the image or label is newer
+    def __init__(self, root, reader, colorizer, size=THUMB_SIZE, workers=2):
+        self.root = Path(root)
+        self.directory = self.root / THUMB_DIR
+        self.directory.mkdir(exist_ok=True)
+        self.reader = reader
+        self.colorizer = colorizer
+        self.size = size
+        self._memory = LRUCache(4 * GRID[0] * GRID[1])  # decoded thumbnails of the last few pages
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="thumbnails")
+        self.updated = threading.Event()  # set whenever a thumbnail becomes available
+
+    def _fresh(self, name, path):
+        try:
+            mtime = path.stat().st_mtime
+        except FileNotFoundError:
+            return False
+        for source in (self.root / "images" / f"{name}.jpg", self.root / "labels" / f"{name}.txt"):
+            if source.exists() and source.stat().st_mtime > mtime:
+                return False
+        return True
+
+    def _build(self, index):
+        name = self.reader.records[index]["name"]
+        path = self.directory / f"{name}.jpg"
+        try:
+            if self._fresh(name, path):
+                thumb = cv2.imread(str(path), cv2.IMREAD_COLOR)
+            else:
+                sample = self.reader.load(index)
+                thumb = render_pair(sample, self.colorizer, self.size, thickness=1)
+                cv2.imwrite(str(path), thumb, [cv2.IMWRITE_JPEG_QUALITY, 85])
+        except Exception as e:
+            logger.warning("Thumbnail for %s failed: %s", name, e)
+            thumb = None
+        if thumb is not None:
+            self._memory.put(name, thumb)
+        with self._lock:
+            self._pending.discard(index)
+        self.updated.set()
+
+    def get(self, index):
+        # Thumbnail if ready, otherwise None and it is built in the background
+        name = self.reader.records[index]["name"]
+        thumb = self._memory.get(name)
+        if thumb is not None:
+            return thumb
+        with self._lock:
+            if index in self._pending:
+                return None
+            self._pending.add(index)
+        self._pool.submit(self._build, index)
+        return None
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def render_pair(sample, colorizer, size, thickness=2):
+    # RGB | colorized depth, each resized to size, with the label polygons on both
+    rgb = cv2.resize(sample.rgb, size, interpolation=cv2.INTER_AREA)
+    depth = cv2.resize(np.asarray(sample.depth), size, interpolation=cv2.INTER_NEAREST)
+    depth = colorizer.colorize(depth)
+    draw_polygons(rgb, sample.polygons, thickness=thickness)
+    draw_polygons(depth, sample.polygons, color=(255, 255, 255), thickness=thickness)
+    return np.hstack((rgb, depth))
+
+
+class DatasetBrowser:
+    def __init__(self, root, label_class=None, depth_limits=None):
+        self.reader = DatasetReader(root, label_class=label_class, mmap=True, cache_size=2 * PREFETCH + 8,
+                                    workers=2, bgr=True)
+        if not len(self.reader.records):
+            raise SystemExit(f"[ERROR] No samples in {root}")
+        self.colorizer = DepthColorizer(*(depth_limits or depth_range(self.reader.records)))
+        self.thumbs = ThumbnailCache(root, self.reader, self.colorizer)
+
+        self.records = self.reader.records
+        self.ids = [r.get("id", i) for i, r in enumerate(self.records)]
+        self.by_class = {}
+        for i, r in enumerate(self.records):
+            self.by_class.setdefault(r["class"], []).append(i)
+
+        self.index = 0
+        self.grid = False
+        self.typed = ""
+        self.message = ""
+
+    # --- navigation ---
+
+    def go(self, index):
+        self.index = int(np.clip(index, 0, len(self.records) - 1))
+
+    def go_to_id(self, sample_id):
+        i = bisect.bisect_left(self.ids, sample_id)
+        if i < len(self.ids) and self.ids[i] == sample_id:
+            self.go(i)
+        else:
+            self.message = f"No sample with id {sample_id}"
+
+    def next_of_class(self, label_class):
+        indices = self.by_class.get(label_class)
+        if not indices:
+            self.message = f"No samples of class {label_class}"
+            return
+        i = bisect.bisect_right(indices, self.index)
+        self.go(indices[i % len(indices)])  # wraps around
+
+    def prefetch(self):
+        # Decode neighbours in the background so stepping through is instant
+        near = [self.index + k * sign for k in range(1, PREFETCH + 1) for sign in (1, -1)]
+        self.reader.prefetch([i for i in near if 0 <= i < len(self.records)])
+
+    # --- drawing ---
+
+    def status(self):
+        record = self.records[self.index]
+        text = f"{record['name']}  [{self.index + 1}/{len(self.records)}]  class {record['class']}"
+        if record.get("depth_min") is not None:
+            text += f"  depth {record['depth_min']}-{record['depth_max']} mm"
+        if self.typed:
+            text += f"  > {self.typed}"
+        if self.message:
+            text += f"  ({self.message})"
+        return text
+
+    def render_sample(self):
+        sample = self.reader.load(self.index)
+        h, w = sample.rgb.shape[:2]
+        scale = min(1.0, VIEW_WIDTH / (2 * w))  # both panes side by side fit VIEW_WIDTH
+        return render_pair(sample, self.colorizer, (int(w * scale), int(h * scale)))
+
+    def render_grid(self):
+        cols, rows = GRID
+        tw, th = THUMB_SIZE[0] * 2, THUMB_SIZE[1]
+        page = self.index // (cols * rows)
+        canvas = np.zeros((rows * (th + 18), cols * tw, 3), dtype=np.uint8)
+        start = page * cols * rows
+        for k, i in enumerate(range(start, min(start + cols * rows, len(self.records)))):
+            y, x = (k // cols) * (th + 18), (k % cols) * tw
+            thumb = self.thumbs.get(i)
+            if thumb is not None:
+                canvas[y:y + th, x:x + tw] = thumb
+            color = (0, 255, 255) if i == self.index else (200, 200, 200)
+            if i == self.index:
+                cv2.rectangle(canvas, (x, y), (x + tw - 1, y + th - 1), color, 2)
+            record = self.records[i]
+            cv2.putText(canvas, f"{record['name']} c{record['class']}", (x + 4, y + th + 13),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.4, color, 1, cv2.LINE_AA)
+        # Build the next page's thumbnails while this one is looked at
+        for i in range(start + cols * rows, min(start + 2 * cols * rows, len(self.records))):
+            self.thumbs.get(i)
+        return canvas
+
+    def render(self):
+        view = self.render_grid() if self.grid else self.render_sample()
+        bar = np.zeros((44, view.shape[1], 3), dtype=np.uint8)
+        cv2.putText(bar, self.status(), (6, 16), cv2.FONT_HERSHEY_SIMPLEX, 0.45, (255, 255, 255), 1, cv2.LINE_AA)
+        cv2.putText(bar, HELP, (6, 36), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (160, 160, 160), 1, cv2.LINE_AA)
+        return np.vstack((view, bar))
+
+    # --- main loop ---
+
+    def handle(self, key):
+        page = GRID[0] * GRID[1]
+        step = page if self.grid else 1
+        self.message = ""
+        if ord("0") <= key <= ord("9"):
+            self.typed += chr(key)
+            return True
+        if key in (8, 127):  # backspace
+            self.typed = self.typed[:-1]
+            return True
+
+        typed, self.typed = self.typed, ""
+        if key in (ord("q"), 27):
+            return False
+        elif key in (ord("d"), ord(" ")):
+            self.go(self.index + 1)
+        elif key == ord("a"):
+            self.go(self.index - 1)
+        elif key == ord("s"):
+            self.go(self.index + step if not self.grid else (self.index // page + 1) * page)
+        elif key == ord("w"):
+            self.go(self.index - step if not self.grid else (self.index // page - 1) * page)
+        elif key == ord("g"):
+            self.grid = not self.grid
+        elif key in (13, 10) and typed:
+            self.go_to_id(int(typed))
+        elif key == ord("c"):
+            self.next_of_class(int(typed) if typed else self.records[self.index]["class"])
+        return True
+
+    def run(self):
+        window = "Dataset browser"
+        cv2.namedWindow(window, cv2.WINDOW_AUTOSIZE)
+        dirty = True
+        try:
+            while True:
+                if dirty or (self.grid and self.thumbs.updated.is_set()):
+                    self.thumbs.updated.clear()
+                    cv2.imshow(window, self.render())
+                    if not self.grid:
+                        self.prefetch()
+                    dirty = False
+                key = cv2.waitKey(30)
+                if key == -1:
+                    if cv2.getWindowProperty(window, cv2.WND_PROP_VISIBLE) < 1:
+                        break
+                    continue
+                if not self.handle(key & 0xFF):
+                    break
+                dirty = True
+        finally:
+            self.thumbs.close()
+            self.reader.close()
+            cv2.destroyAllWindows()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Browse the samples of a dataset")
+    parser.add_argument("--dataset", default="dataset")
+    parser.add_argument("--class", dest="label_class", type=int, help="Only show samples of this class")
+    parser.add_argument("--depth-range", type=int, nargs=2, metavar=("MIN", "MAX"),
+                        help="Depth color scale in mm (default: from the manifest)")
+    parser.add_argument("--start", type=int, default=None, help="Sample id to open first")
+    parser.add_argument("--grid", action="store_true", help="Start in the thumbnail grid")
+    args = parser.parse_args()
+
+    browser = DatasetBrowser(args.dataset, args.label_class, args.depth_range)
+    if args.start is not None:
+        browser.go_to_id(args.start)
+    browser.grid = args.grid
+    browser.run()
@@ -0,0 +1,68 @@
+import json
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from rgbd_collector.annotation_writer import AnnotationWriter
+
+# Label files written by the original (pre-vectorization) AnnotationWriter for
+# the masks below; the current writer must reproduce them byte for byte
+GOLDEN = Path(__file__).parent / "data" / "annotation_golden.json"
+
+
+def _ellipse():
+    mask = np.zeros((480, 640), np.uint8)
+    cv2.ellipse(mask, (333, 230), (77, 72), 15, 0, 360, 255, -1)
+    return mask
+
+
+def _two_blobs():
+    # The larger one is labelled
+    mask = np.zeros((240, 320), np.uint8)
+    cv2.rectangle(mask, (10, 10), (40, 30), 255, -1)
+    cv2.circle(mask, (200, 120), 50, 255, -1)
+    return mask
+
+
+def _noisy():
+    # Ragged outline with holes, like a real depth mask
+    rng = np.random.default_rng(7)
+    mask = np.zeros((480, 848), np.uint8)
+    cv2.circle(mask, (400, 260), 120, 255, -1)
+    mask[rng.random(mask.shape) < 0.05] = 0
+    return cv2.morphologyEx(mask, cv2.MORPH_OPEN, np.ones((3, 3), np.uint8))
+
+
+def _touching_border():
+    mask = np.zeros((100, 100), np.uint8)
+    mask[:, 60:] = 255
+    return mask
+
+
+def _empty():
+    return np.zeros((64, 64), np.uint8)
+
+
+MASKS = {
+    "ellipse": _ellipse,
+    "two_blobs": _two_blobs,
+    "noisy": _noisy,
+    "touching_border": _touching_border,
+    "empty": _empty,
+}
+
+
+def test_output_matches_the_original_writer(tmp_path):
+    golden = json.loads(GOLDEN.read_text())
+    for name, make in MASKS.items():
+        mask = make()
+        for normalized in (True, False):
+            key = f"{name}-{'normalized' if normalized else 'pixels'}"
+            path = tmp_path / f"{key}.txt"
+            written = AnnotationWriter(normalized=normalized).write(str(path), mask, mask.shape, 3)
+            if golden[key] is None:
+                assert not written and not path.exists(), key
+            else:
+                assert written, key
+                assert path.read_bytes() == golden[key].encode(), key
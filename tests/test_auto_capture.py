@@ -0,0 +1,51 @@
+import numpy as np
+
+from rgbd_collector.auto_capture import SceneTrigger
+
+
+def _scene(shift=0, value=800):
+    # Background at 1.5 m with an object whose position moves by `shift` pixels
+    depth = np.full((48, 64), 1500, np.uint16)
+    depth[10:30, 10 + shift:30 + shift] = value
+    return depth
+
+
+def test_fires_once_after_the_scene_changes_and_settles():
+    trigger = SceneTrigger(step=2, stable_frames=3)
+    assert not trigger.update(_scene())  # idle until armed
+    trigger.arm(_scene())
+    assert trigger.state == "waiting"
+
+    # Sensor noise below the tolerance is not a change
+    noisy = _scene() + np.random.default_rng(0).integers(0, 8, (48, 64), dtype=np.uint16)
+    assert not trigger.update(noisy)
+    assert trigger.state == "waiting"
+
+    # Object moves: settling until it stops for stable_frames frames
+    fired = [trigger.update(_scene(shift)) for shift in (5, 10, 15)]
+    assert trigger.state == "settling"
+    fired += [trigger.update(_scene(15)) for _ in range(3)]
+    assert fired == [False] * 5 + [True]
+    assert trigger.state == "waiting"
+
+    # The captured scene is the new reference
+    assert not any(trigger.update(_scene(15)) for _ in range(10))
+    assert trigger.state == "waiting"
+
+
+def test_motion_restarts_the_stable_count():
+    trigger = SceneTrigger(step=2, stable_frames=2)
+    trigger.arm(_scene())
+    frames = [_scene(5), _scene(5), _scene(10), _scene(10), _scene(10)]
+    assert [trigger.update(frame) for frame in frames] == [False, False, False, False, True]
+
+
+def test_resolution_change_rearms_and_disarm_goes_idle():
+    trigger = SceneTrigger(step=2)
+    trigger.arm(_scene())
+    assert not trigger.update(np.zeros((24, 32), np.uint16))
+    assert trigger.state == "waiting" and trigger.reference.shape == (12, 16)
+
+    trigger.disarm()
+    assert trigger.state == "idle" and trigger.reference is None
+    assert not trigger.update(_scene(20))
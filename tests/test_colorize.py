@@ -0,0 +1,39 @@
+import cv2
+import numpy as np
+import pytest
+
+from rgbd_collector.colorize import DepthColorizer
+
+
+def test_fixed_scale_matches_the_colormap():
+    colors = DepthColorizer(300, 1200)
+    depth = np.array([[0, 100, 300, 750, 1200, 5000]], np.uint16)
+    image = colors.colorize(depth)
+    assert image.shape == (1, 6, 3) and image.dtype == np.uint8
+
+    jet = cv2.applyColorMap(np.array([[0, 127, 255]], np.uint8), cv2.COLORMAP_JET)[0]
+    assert not image[0, 0].any()  # no depth
+    np.testing.assert_array_equal(image[0, 1:4:2], jet[:2])  # below the range clips, 750 is mid-scale
+    np.testing.assert_array_equal(image[0, 4:], [jet[2], jet[2]])
+
+    # Same depth, same color, whatever else is in the frame
+    np.testing.assert_array_equal(colors.colorize(depth[:, 3:4]), image[:, 3:4])
+    np.testing.assert_array_equal(DepthColorizer(300, 1200, order="rgb").colorize(depth), image[..., ::-1])
+
+
+def test_mask_dims_the_background_in_the_same_lookup():
+    colors = DepthColorizer(300, 1200, dim=0.5)
+    depth = np.full((2, 3), 900, np.uint16)
+    mask = np.array([[1, 0, 1], [0, 1, 0]], np.uint8)
+    packed = colors.lookup(depth, mask, out=np.empty(depth.shape, np.uint32))
+    pixels = packed.view(np.uint8).reshape(2, 3, 4)[..., :3]
+
+    full = colors.colorize(depth)[0, 0]
+    assert (pixels[mask == 1] == full).all()
+    assert (pixels[mask == 0] == (full * 0.5).astype(np.uint8)).all()
+    np.testing.assert_array_equal(colors.colorize(depth, mask), pixels)
+
+
+def test_empty_range_is_rejected():
+    with pytest.raises(ValueError):
+        DepthColorizer(500, 500)
@@ -0,0 +1,68 @@
+import json
+import time
+
+import cv2
+import numpy as np
+
+from rgbd_collector.dataset_reader import DatasetReader
+from rgbd_collector.depth_store import create_depth_store
+from rgbd_collector.manifest import MANIFEST_NAME
+
+
+def _dataset(root, count=7):
+    # Sample i has depth i + 1 and class i % 2, recorded in the manifest
+    (root / "images").mkdir(parents=True)
+    (root / "labels").mkdir()
+    store = create_depth_store(root / "depth", "png")
+    with open(root / MANIFEST_NAME, "w") as f:
+        for i in range(count):
+            name = f"img{i:04d}"
+            cv2.imwrite(str(root / "images" / f"{name}.jpg"), np.full((24, 32, 3), 10 * i, np.uint8))
+            store.put(name, np.full((24, 32), i + 1, np.uint16))
+            (root / "labels" / f"{name}.txt").write_text(f"{i % 2} 0.25 0.25 0.75 0.25 0.75 0.75\n")
+            f.write(json.dumps({"id": i, "name": name, "class": i % 2}) + "\n")
+    store.close()
+
+
+def test_epoch_reads_every_sample_in_order(tmp_path):
+    _dataset(tmp_path)
+    with DatasetReader(tmp_path, prefetch=2, workers=2) as reader:
+        samples = list(reader.epoch(0))
+        assert [s.name for s in samples] == [f"img{i:04d}" for i in range(7)]
+        assert [int(s.depth[0, 0]) for s in samples] == list(range(1, 8))
+        assert samples[3].label_class == 1
+        assert samples[3].polygons[0][0] == 1
+        assert samples[3].rgb.shape == (24, 32, 3)
+
+    with DatasetReader(tmp_path, label_class=0) as reader:
+        assert [s.name for s in reader] == ["img0000", "img0002", "img0004", "img0006"]
+
+
+def test_shuffled_shards_are_disjoint_and_cover_the_dataset(tmp_path):
+    _dataset(tmp_path)
+    readers = [DatasetReader(tmp_path, shuffle=True, seed=3, shard=(rank, 3), workers=1) for rank in range(3)]
+    try:
+        for epoch in range(2):
+            names = [[s.name for s in reader.epoch(epoch)] for reader in readers]
+            flat = [name for shard in names for name in shard]
+            assert sorted(flat) == [f"img{i:04d}" for i in range(7)]
+            assert [len(shard) for shard in names] == [len(reader) for reader in readers] == [3, 2, 2]
+        # Each epoch draws a new permutation
+        assert list(readers[0].order(0)) != list(readers[0].order(1))
+    finally:
+        for reader in readers:
+            reader.close()
+
+
+def test_prefetch_loads_into_the_cache(tmp_path):
+    _dataset(tmp_path)
+    with DatasetReader(tmp_path, workers=2) as reader:
+        reader.prefetch([0, 1])
+        deadline = time.monotonic() + 5.0
+        while not ("img0000" in reader.cache and "img0001" in reader.cache) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert "img0000" in reader.cache and "img0001" in reader.cache
+        assert "img0002" not in reader.cache
+
+        assert reader[1].name == "img0001"
+        assert reader.cache.hits == 1
@@ -0,0 +1,71 @@
+import json
+
+import cv2
+import numpy as np
+import pytest
+
+from rgbd_collector.dedupe import DUPLICATES_DIR, DedupeIndex, find_duplicates, move_duplicates, update_index
+from rgbd_collector.depth_store import DepthReader, create_depth_store
+from rgbd_collector.manifest import DatasetManifest, sample_name
+from rgbd_collector.synthetic import synthetic_color, synthetic_depth
+
+
+def _dataset(root, fmt, seeds):
+    # One sample per seed; equal seeds give identical samples
+    manifest = DatasetManifest(root)
+    store = create_depth_store(root / "depth", fmt)
+    (root / "images").mkdir(exist_ok=True)
+    (root / "labels").mkdir(exist_ok=True)
+    for seed in seeds:
+        sample_id = manifest.allocate()
+        name = sample_name(sample_id)
+        image = root / "images" / f"{name}.jpg"
+        label = root / "labels" / f"{name}.txt"
+        cv2.imwrite(str(image), cv2.cvtColor(synthetic_color((160, 120), seed * 50), cv2.COLOR_RGB2BGR))
+        label.write_text("0 0.1 0.1 0.5 0.1 0.5 0.5\n")
+        depth = synthetic_depth((160, 120), seed, target=(300 + 200 * seed, 400 + 200 * seed))
+        manifest.append(sample_id, 0, {"image": image, "label": label, "depth": store.put(name, depth)},
+                        depth=depth)
+    store.close()
+
+
+@pytest.mark.parametrize("fmt", ["shard", "png"])
+def test_move_duplicates(tmp_path, fmt):
+    _dataset(tmp_path, fmt, [0, 1, 0, 2])
+    records = update_index(tmp_path, workers=1).records()
+    duplicates = find_duplicates(records)
+    assert [(records["name"][i].decode(), records["name"][j].decode()) for i, j, _ in duplicates] == \
+        [("img0002", "img0000")]
+    kept_depth = DepthReader(tmp_path / "depth").get("img0002").copy()
+
+    assert move_duplicates(tmp_path, ["img0002"]) == 3  # image, label, depth
+
+    depth = DepthReader(tmp_path / "depth")
+    assert depth.names() == ["img0000", "img0001", "img0003"]
+    depth.close()
+    assert [r["name"] for r in DatasetManifest(tmp_path).samples()] == ["img0000", "img0001", "img0003"]
+    assert DedupeIndex(tmp_path).names() == {"img0000", "img0001", "img0003"}
+
+    # Everything of the duplicate is kept under duplicates/, with its record
+    moved = tmp_path / DUPLICATES_DIR
+    with open(moved / "manifest.jsonl") as f:
+        (record,) = [json.loads(line) for line in f]
+    assert record["name"] == "img0002"
+    for key in ("image", "label", "depth"):
+        assert (tmp_path / record[key]).exists(), key
+    np.testing.assert_array_equal(np.load(tmp_path / record["depth"]), kept_depth)
+
+
+def test_nearest_searches_mapped_and_added_records(tmp_path):
+    index = DedupeIndex(tmp_path)
+    index.add_many([(i, i, 0, f"img{i:04d}".encode()) for i in range(50)])
+    index = DedupeIndex(tmp_path)  # the first 50 are memory-mapped now
+    for i in range(50, 200):
+        index.add(f"img{i:04d}", i, (i << 8, 0))
+
+    assert len(index) == 200
+    assert index.nearest((3, 0)) == ("img0003", 0)
+    assert index.nearest((150 << 8, 1)) == ("img0150", 1)
+    assert list(index.records()["id"]) == list(range(200))
+    assert len(index.distances((0, 0))) == 200
+    assert DedupeIndex(tmp_path).names() == index.names() == {f"img{i:04d}" for i in range(200)}
@@ -0,0 +1,50 @@
+import time
+
+import numpy as np
+
+from rgbd_collector.frame_grabber import FrameGrabber, FrameRingBuffer
+
+
+def _frame(value):
+    return np.full((4, 6, 3), value, np.uint8), np.full((4, 6), value, np.uint16)
+
+
+def test_ring_buffer_keeps_the_newest_frames():
+    buffer = FrameRingBuffer(size=3)
+    assert buffer.latest() is None
+    for i in range(1, 6):
+        buffer.push(*_frame(i), timestamp=float(i), device_timestamp=i * 33)
+
+    packet = buffer.latest()
+    assert packet.seq == 5 and packet.depth[0, 0] == 5 and packet.device_timestamp == 165
+    # The oldest slot is the one the writer fills next
+    assert [seq for seq, _, _ in buffer.times()] == [5, 4]
+    assert buffer.get(3) is None
+    assert buffer.get(4).color[0, 0, 0] == 4
+
+
+def test_a_failing_listener_does_not_stop_acquisition():
+    count = [0]
+
+    def read(cam):
+        count[0] += 1
+        time.sleep(0.002)
+        return _frame(count[0] % 256) + (count[0] * 33, None)
+
+    seen = []
+
+    def broken(*args):
+        raise OSError("No space left on device")
+
+    grabber = FrameGrabber(None, read)
+    grabber.listeners = [broken, lambda color, depth, ts, device_ts, payload: seen.append(device_ts)]
+    grabber.start()
+    try:
+        deadline = time.monotonic() + 5.0
+        while len(seen) < 5 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(seen) >= 5
+        assert grabber._thread.is_alive()
+    finally:
+        grabber.stop()
+    assert grabber.frames >= 5 and grabber.errors == 0
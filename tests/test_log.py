@@ -0,0 +1,32 @@
+import logging
+
+from rgbd_collector.log import RateLimitFilter
+
+
+def _record(msg="Alignment failed: %s", every=None):
+    record = logging.LogRecord("rgbd_collector.frames", logging.ERROR, __file__, 1, msg, ("boom",), None)
+    if every is not None:
+        record.every = every
+    return record
+
+
+def test_rate_limited_records_pass_once_per_interval_and_count_suppressed(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("rgbd_collector.log.time.monotonic", lambda: now[0])
+    limit = RateLimitFilter()
+
+    assert limit.filter(_record(every=5.0))
+    assert not limit.filter(_record(every=5.0))
+    assert not limit.filter(_record(every=5.0))
+    now[0] += 5.0
+    record = _record(every=5.0)
+    assert limit.filter(record)
+    assert record.getMessage() == "Alignment failed: boom (2 similar suppressed)"
+
+
+def test_other_records_are_untouched():
+    limit = RateLimitFilter()
+    assert limit.filter(_record(every=5.0))
+    # Different message, and records without `every`, are never limited
+    assert limit.filter(_record("Other: %s", every=5.0))
+    assert all(limit.filter(_record()) for _ in range(3))
@@ -0,0 +1,60 @@
+import json
+
+from rgbd_collector.manifest import DatasetManifest, INTRINSICS_NAME, sample_name
+
+
+def _touch_image(root, name):
+    images = root / "images"
+    images.mkdir(parents=True, exist_ok=True)
+    (images / f"{name}.jpg").write_bytes(b"jpeg")
+
+
+def test_recovers_multi_camera_ids_from_known_cameras(tmp_path):
+    manifest = DatasetManifest(tmp_path)
+    sample_id = manifest.allocate()
+    for camera in ("left", "right"):
+        _touch_image(tmp_path, f"{sample_name(sample_id)}_{camera}")
+        manifest.append(sample_id, 0, {}, name=f"{sample_name(sample_id)}_{camera}", camera=camera)
+    # Next capture reached the disk for one camera only, then the process died
+    _touch_image(tmp_path, f"{sample_name(sample_id + 1)}_right")
+
+    assert DatasetManifest(tmp_path).next_id == sample_id + 2
+
+
+def test_recovers_first_multi_camera_capture_from_intrinsics(tmp_path):
+    # No manifest record yet: the camera names come from intrinsics.json
+    (tmp_path / INTRINSICS_NAME).write_text(json.dumps({"top": [1, 1, 0, 0, 4, 4]}))
+    _touch_image(tmp_path, "img0000_top")
+    DatasetManifest(tmp_path)  # creates the (empty) manifest
+    _touch_image(tmp_path, "img0001_top")
+
+    assert DatasetManifest(tmp_path).next_id == 2
+
+
+def test_recovers_after_a_crash_between_allocate_and_append(tmp_path):
+    manifest = DatasetManifest(tmp_path)
+    first = manifest.allocate()
+    _touch_image(tmp_path, sample_name(first))
+    manifest.append(first, 1, {"image": tmp_path / "images" / f"{sample_name(first)}.jpg"})
+    # The image of the next sample was written, its record never was
+    crashed = manifest.allocate()
+    _touch_image(tmp_path, sample_name(crashed))
+    # An id allocated without anything reaching the disk is free to reuse
+    manifest.allocate()
+
+    recovered = DatasetManifest(tmp_path)
+    assert recovered.next_id == crashed + 1
+    assert [r["id"] for r in recovered.samples()] == [first]
+
+
+def test_truncates_a_torn_last_record(tmp_path):
+    manifest = DatasetManifest(tmp_path)
+    sample_id = manifest.allocate()
+    manifest.append(sample_id, 0, {})
+    with open(manifest.path, "a") as f:
+        f.write('{"id": 1, "name": "img00')
+
+    recovered = DatasetManifest(tmp_path)
+    assert recovered.next_id == sample_id + 1
+    assert manifest.path.read_text().endswith("}\n")
+    assert [r["id"] for r in recovered.samples()] == [sample_id]
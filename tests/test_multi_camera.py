@@ -0,0 +1,144 @@
+import json
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from rgbd_collector import backends
+from rgbd_collector.capture import AlignedCapture, RegisteredCapture, capture_step
+from rgbd_collector.frame_grabber import FrameGrabber, FramePacket, FrameRingBuffer
+from rgbd_collector.multi_camera import FrameSynchronizer, MultiCameraSession, open_source
+from rgbd_collector.recording import Recorder
+from rgbd_collector.synthetic import SyntheticCameraInterface
+
+
+def _record(path, camera, frames=12):
+    cam = SyntheticCameraInterface(fps=60, camera=camera)
+    cam.setup_streams()
+    step = capture_step(cam)
+    step.start()
+    grabber = FrameGrabber(cam, step.read)
+    recorder = Recorder(path, **step.recorder_options())
+    grabber.listeners.append(recorder)
+    grabber.start()
+    deadline = time.monotonic() + 5.0
+    while recorder.frames + recorder._queue.qsize() < frames and time.monotonic() < deadline:
+        time.sleep(0.01)
+    grabber.stop()
+    recorder.close()
+    cam.stop()
+
+
+def _run_session(tmp_path, specs):
+    session = MultiCameraSession([open_source(spec) for spec in specs], tmp_path / "dataset",
+                                 tolerance_ms=40.0)
+    session.start()
+    try:
+        sample_id = None
+        deadline = time.monotonic() + 5.0
+        while sample_id is None and time.monotonic() < deadline:
+            sample_id = session.capture(timeout=0.5)
+        steps = {s.name: type(s.step) for s in session.sources}
+    finally:
+        session.close()
+    return sample_id, steps
+
+
+def _records(root):
+    with open(root / "manifest.jsonl") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def test_pairs_realsense_with_orbbec(tmp_path, monkeypatch):
+    # No SDKs here: the registry's realsense and orbbec entries are replaced by
+    # synthetic stand-ins of the same camera kind
+    monkeypatch.setitem(backends.BACKENDS, "realsense",
+                        lambda serial=None, **options: SyntheticCameraInterface(fps=60, camera="realsense"))
+    monkeypatch.setitem(backends.BACKENDS, "orbbec",
+                        lambda serial=None: SyntheticCameraInterface(fps=60, size=(320, 240), camera="femto_bolt"))
+
+    sample_id, steps = _run_session(tmp_path, ["left=realsense:123", "right=orbbec:CL8K1234"])
+
+    assert sample_id is not None
+    assert steps == {"left": AlignedCapture, "right": RegisteredCapture}
+    records = {r["camera"]: r for r in _records(tmp_path / "dataset")}
+    assert set(records) == {"left", "right"}
+    assert records["left"]["id"] == records["right"]["id"] == sample_id
+    for name in ("left", "right"):
+        assert (tmp_path / "dataset" / "images" / f"{records[name]['name']}.jpg").exists()
+
+
+def test_pairs_synthetic_with_replay(tmp_path):
+    # Two different backends, one of them replaying a Femto Bolt recording
+    _record(tmp_path / "bolt", "femto_bolt")
+
+    sample_id, steps = _run_session(tmp_path, ["live=synthetic", f"bolt=replay:{tmp_path / 'bolt'}"])
+
+    assert sample_id is not None
+    assert steps == {"live": AlignedCapture, "bolt": RegisteredCapture}
+    depth = sorted((tmp_path / "dataset" / "depth").iterdir())
+    assert len(depth) == 2
+    intrinsics = json.loads((tmp_path / "dataset" / "intrinsics.json").read_text())
+    assert set(intrinsics) == {"live", "bolt"}
+    assert np.allclose(intrinsics["bolt"][:2], [576.0, 576.0])
+
+
+def test_registered_capture_skips_corrupt_mjpeg():
+    cam = SyntheticCameraInterface(camera="femto_bolt")
+    cam.setup_streams()
+    step = capture_step(cam)
+    step.start()
+    color, depth = cam.frames[0]
+    packet = FramePacket(1, 0.0, None, color, depth, payload={"mjpeg": b"\xff\xd8 not a jpeg"})
+
+    assert step.process(packet) is None
+
+
+def _source(name, times, size=4):
+    # A camera whose ring holds frames at the given (system s, device ms) times;
+    # the color frame's value is its index, to tell the frames apart
+    buffer = FrameRingBuffer(size)
+    for i, (timestamp, device_timestamp) in enumerate(times):
+        buffer.push(np.full((2, 2, 3), i, np.uint8), np.zeros((2, 2), np.uint16), timestamp, device_timestamp)
+    return SimpleNamespace(name=name, grabber=SimpleNamespace(buffer=buffer))
+
+
+def _picked(frames):
+    return {name: int(packet.color[0, 0, 0]) for name, packet in frames.items()}
+
+
+def test_synchronizer_pairs_the_closest_frames():
+    # b's frames arrive 12 ms after a's; a's frame at 1.033 s goes with b's at 1.045 s
+    a = _source("a", [(1.000, None), (1.033, None), (1.066, None)])
+    b = _source("b", [(0.979, None), (1.012, None), (1.045, None)])
+    sync = FrameSynchronizer([a, b], tolerance_ms=15.0)
+
+    frames = sync.match()
+    assert _picked(frames) == {"a": 1, "b": 2}
+    assert sync.last_spread == pytest.approx(12.0)
+    assert sync.matched == 1
+
+
+def test_synchronizer_tolerance():
+    a = _source("a", [(1.000, None), (1.100, None)])
+    b = _source("b", [(1.050, None), (1.160, None)])
+    assert FrameSynchronizer([a, b], tolerance_ms=20.0).match() is None
+    assert _picked(FrameSynchronizer([a, b], tolerance_ms=50.0).match()) == {"a": 1, "b": 0}
+
+    sync = FrameSynchronizer([a, b], tolerance_ms=20.0)
+    assert sync.wait(timeout=0.02) is None
+    assert sync.missed == 1
+
+
+def test_synchronizer_device_clock_and_offsets():
+    # Same arrival times, but the device clocks say b's frames are 30 ms later
+    a = _source("a", [(1.0, 500.0), (1.033, 533.0)])
+    b = _source("b", [(1.0, 530.0), (1.033, 563.0)])
+    assert _picked(FrameSynchronizer([a, b], 5.0, clock="device").match()) == {"a": 1, "b": 0}
+    # ...unless b's offset corrects for it
+    sync = FrameSynchronizer([a, b], 5.0, clock="device", offsets_ms={"b": -30.0})
+    assert _picked(sync.match()) == {"a": 1, "b": 1}
+
+    with pytest.raises(ValueError):
+        FrameSynchronizer([a, b], clock="gps")
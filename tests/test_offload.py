@@ -0,0 +1,47 @@
+import time
+
+import cv2
+import numpy as np
+
+from rgbd_collector.offload import FrameOffload, SharedFramePool
+from rgbd_collector.segmentation_helper import SegmentationHelper
+
+
+def test_shared_pool_hands_out_each_slot_once():
+    pool = SharedFramePool(2, 64)
+    try:
+        first, second = pool.acquire(), pool.acquire()
+        assert {first, second} == {0, 1}
+        assert pool.acquire() is None
+        pool.view(first, (4, 4), np.float32)[:] = 1.5
+        pool.release(first)
+        assert pool.acquire(timeout=1.0) == first
+        assert pool.view(first, (4, 4), np.float32)[0, 0] == 1.5
+    finally:
+        pool.close()
+
+
+def test_workers_segment_and_encode(tmp_path):
+    depth = np.full((48, 64), 1500, np.uint16)
+    depth[10:30, 20:40] = 600
+    seg = SegmentationHelper(min_depth=300, max_depth=1000)
+    offload = FrameOffload(seg, workers=1, slots=1)
+    try:
+        results = []
+        assert offload.segment(depth, lambda d, m: results.append((d.copy(), m.copy())))
+        # The only slot is busy until the result has been polled
+        assert not offload.segment(depth, lambda d, m: None)
+        deadline = time.monotonic() + 30.0
+        while not results and time.monotonic() < deadline:
+            offload.poll()
+            time.sleep(0.01)
+        shown_depth, mask = results[0]
+        np.testing.assert_array_equal(shown_depth, depth)
+        np.testing.assert_array_equal(mask, seg.segment(depth))
+
+        bgr = np.zeros((48, 64, 3), np.uint8)
+        bgr[..., 2] = 200
+        path = offload.encode(str(tmp_path / "img.jpg"), bgr)
+        assert abs(int(cv2.imread(path)[24, 32, 2]) - 200) <= 2
+    finally:
+        offload.close()
@@ -0,0 +1,43 @@
+import numpy as np
+
+from rgbd_collector.pointcloud import PointCloudExporter, back_project
+
+# fx, fy, cx, cy at 8x6; the depth below is 4x3, so everything halves
+INTRINSICS = (4.0, 4.0, 4.0, 2.0, 8, 6)
+
+
+def test_back_project_against_the_pinhole_model():
+    depth = np.array([[1000, 0, 2000, 1000],
+                      [1000, 1000, 1000, 500],
+                      [0, 1000, 1000, 1000]], np.uint16)
+    rgb = np.arange(4 * 3 * 3, dtype=np.uint8).reshape(3, 4, 3)
+    points = back_project(depth, INTRINSICS, rgb)
+
+    # fx = fy = 2, cx = 2, cy = 1; zero depth is skipped
+    assert len(points) == 10
+    first, far = points[0], points[1]
+    assert (first["x"], first["y"], first["z"]) == (-1.0, -0.5, 1.0)
+    assert (far["x"], far["y"], far["z"]) == (0.0, -1.0, 2.0)
+    assert (far["red"], far["green"], far["blue"]) == (6, 7, 8)
+    np.testing.assert_allclose(points[6]["x"], 0.5 * 0.5)  # (u, v) = (3, 1) at 0.5 m
+
+    mask = np.zeros(depth.shape, np.uint8)
+    mask[1, 1:] = 1
+    masked = back_project(depth, INTRINSICS, mask=mask)
+    assert masked.dtype.names == ("x", "y", "z")
+    np.testing.assert_allclose(masked["z"], [1.0, 1.0, 0.5])
+    np.testing.assert_allclose(masked["y"], 0.0)
+
+
+def test_exported_ply_holds_the_points(tmp_path):
+    depth = np.full((3, 4), 1500, np.uint16)
+    bgr = np.zeros((3, 4, 3), np.uint8)
+    bgr[..., 0] = 255
+    path = PointCloudExporter(tmp_path, "ply").put("img0000", depth, INTRINSICS, bgr)
+
+    data = open(path, "rb").read()
+    header, body = data.split(b"end_header\n")
+    assert b"element vertex 12" in header
+    points = np.frombuffer(body, dtype=back_project(depth, INTRINSICS, bgr).dtype)
+    assert (points["blue"] == 255).all() and not points["red"].any()
+    np.testing.assert_allclose(points["z"], 1.5)
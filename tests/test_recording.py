@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from rgbd_collector.recording import Recorder, Recording, ReplayCameraInterface
+
+
+def _frames(count):
+    rng = np.random.default_rng(3)
+    return [(rng.integers(0, 255, (24, 32, 3), dtype=np.uint8),
+             rng.integers(0, 4000, (24, 32), dtype=np.uint16)) for _ in range(count)]
+
+
+def _write(path, frames, device_timestamps=True, **options):
+    recorder = Recorder(path, fps=30, **options)
+    for i, (color, depth) in enumerate(frames):
+        recorder(color, depth, 10.0 + i / 30.0, 5000.0 + i * 33.3 if device_timestamps else None)
+    recorder.close()
+    return recorder
+
+
+def test_record_replay_round_trip(tmp_path):
+    frames = _frames(5)
+    _write(tmp_path, frames, camera="femto_bolt", extra={"calibration": {"color": [1, 1, 0, 0, 32, 24]}})
+
+    recording = Recording(tmp_path)
+    assert len(recording) == 5
+    for i, (color, depth) in enumerate(frames):
+        np.testing.assert_array_equal(recording.color[i], color)
+        np.testing.assert_array_equal(recording.depth[i], depth)
+
+    cam = ReplayCameraInterface(tmp_path, realtime=False)
+    cam.setup_streams()
+    assert cam.camera == "femto_bolt"
+    assert cam.get_calibration() == {"color": [1, 1, 0, 0, 32, 24]}
+    for i, (color, depth) in enumerate(frames):
+        color_frame, depth_frame = cam.get_frames()
+        np.testing.assert_array_equal(color_frame.get_data(), color)
+        np.testing.assert_array_equal(depth_frame.get_data(), depth)
+        assert color_frame.get_timestamp() == pytest.approx(5000.0 + i * 33.3)
+    assert cam.get_frames() == (None, None)
+    cam.stop()
+
+
+def test_replay_loops_and_falls_back_to_system_time(tmp_path):
+    frames = _frames(3)
+    _write(tmp_path, frames, device_timestamps=False, extra={"intrinsics": [1, 1, 16, 12, 32, 24]})
+
+    cam = ReplayCameraInterface(tmp_path, realtime=False, loop=True)
+    cam.setup_streams()
+    assert cam.camera == "realsense"
+    assert cam.get_intrinsics() == (1, 1, 16, 12, 32, 24)
+    timestamps = [cam.get_frameset().get_color_frame().get_timestamp() for _ in range(4)]
+    # No device timestamps recorded: the system time in ms stands in
+    assert timestamps == pytest.approx([10000.0, 10033.333, 10066.667, 10000.0], abs=1e-3)
+    color, depth = cam.aligned(cam.get_frameset())
+    np.testing.assert_array_equal(color, frames[1][0])
+    np.testing.assert_array_equal(depth, frames[1][1])
+
+
+def test_convert_and_a_recording_cut_short(tmp_path):
+    frames = _frames(4)
+    # convert() runs on the writer thread; returning None drops the frame
+    recorder = _write(tmp_path, frames,
+                      convert=lambda color, depth, payload: None if color[0, 0, 0] == frames[1][0][0, 0, 0]
+                      else (color[::-1], depth))
+    assert (recorder.frames, recorder.dropped) == (3, 1)
+
+    # A crash mid-frame leaves a partial frame at the end of color.bin
+    with open(tmp_path / "color.bin", "r+b") as f:
+        f.truncate(f.seek(0, 2) - 10)
+    recording = Recording(tmp_path)
+    assert len(recording) == 2
+    np.testing.assert_array_equal(recording.color[1], frames[2][0][::-1])
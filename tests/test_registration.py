@@ -0,0 +1,50 @@
+import numpy as np
+
+from orbbec_femto_bolt.registration import DepthRegistration
+
+IDENTITY = (1, 0, 0, 0, 1, 0, 0, 0, 1)
+
+
+def _calibration(translation=(0, 0, 0), color=(50, 50, 31.5, 23.5, 64, 48)):
+    return {
+        "depth": (50, 50, 31.5, 23.5, 64, 48),
+        "color": color,
+        "rotation": IDENTITY,
+        "translation": translation,
+    }
+
+
+def _depth():
+    depth = np.full((48, 64), 1000, np.uint16)
+    depth[10:20, 30:40] = 800
+    depth[0, 0] = 0
+    return depth
+
+
+def test_coincident_cameras_keep_the_depth_map():
+    depth = _depth()
+    registered = DepthRegistration(_calibration()).register(depth, (48, 64, 3))
+    assert registered.dtype == np.uint16
+    np.testing.assert_array_equal(registered, depth)
+
+
+def test_baseline_shifts_by_the_disparity():
+    # 40 mm baseline at fx = 50: 2 px at 1 m
+    depth = np.full((48, 64), 1000, np.uint16)
+    registered = DepthRegistration(_calibration(translation=(40, 0, 0))).register(depth, (48, 64))
+    assert not registered[:, :2].any()
+    assert (registered[:, 2:] == 1000).all()
+
+    # Along z the depth is measured from the color camera
+    registered = DepthRegistration(_calibration(translation=(0, 0, 15))).register(depth, (48, 64))
+    assert registered[24, 32] == 1015
+
+
+def test_nearest_surface_wins_and_color_resolution_is_filled():
+    depth = _depth()
+    calibration = _calibration(translation=(40, 0, 0), color=(100, 100, 63.5, 47.5, 128, 96))
+    registered = DepthRegistration(calibration).register(depth, (96, 128))
+    assert registered.shape == (96, 128)
+    # The near patch (0.8 m) shifts further and covers the background it lands on
+    assert (registered[2 * 12:2 * 18, 2 * 34:2 * 42] == 800).all()
+    assert (registered[2 * 30:, 2 * 3:] == 1000).all()
@@ -0,0 +1,36 @@
+import cv2
+import numpy as np
+
+from rgbd_collector.annotation_writer import AnnotationWriter
+from rgbd_collector.depth_store import create_depth_store
+from rgbd_collector.resegment import resegment
+from rgbd_collector.segmentation_helper import SegmentationHelper
+
+SEG = {"min_depth": 300, "max_depth": 1200}
+
+
+def _dataset(root):
+    # One disc at 600 mm, labeled with every contour vertex
+    (root / "images").mkdir(parents=True)
+    (root / "labels").mkdir()
+    depth = np.full((120, 160), 2000, np.uint16)
+    cv2.circle(depth, (80, 60), 40, 600, -1)
+    store = create_depth_store(root / "depth", "png")
+    store.put("img0000", depth)
+    store.close()
+    cv2.imwrite(str(root / "images" / "img0000.jpg"), np.zeros((120, 160, 3), np.uint8))
+    AnnotationWriter().write(str(root / "labels" / "img0000.txt"), SegmentationHelper(**SEG).segment(depth),
+                             depth.shape, 0)
+
+
+def test_dry_run_scores_the_simplified_polygons(tmp_path):
+    _dataset(tmp_path)
+    label = (tmp_path / "labels" / "img0000.txt").read_text()
+
+    (_, status, same, old_points, new_points), = resegment(tmp_path, SEG, dry_run=True, workers=1)
+    assert status == "dry-run" and same > 0.99 and new_points == old_points
+
+    (_, _, coarse, _, fewer), = resegment(tmp_path, SEG, {"epsilon": 8.0}, dry_run=True, workers=1)
+    assert fewer < new_points
+    assert coarse < same
+    assert (tmp_path / "labels" / "img0000.txt").read_text() == label
@@ -0,0 +1,104 @@
+import threading
+
+import numpy as np
+import pytest
+
+from rgbd_collector.annotation_writer import AnnotationWriter
+from rgbd_collector.depth_store import DepthReader, create_depth_store
+from rgbd_collector.save_pipeline import SaveJob, SavePipeline
+from rgbd_collector.segmentation_helper import SegmentationHelper
+
+
+class FailingEncoder:
+    def encode(self, path, bgr):
+        raise RuntimeError("disk full")
+
+
+def _job(name="img0000"):
+    depth = np.full((48, 64), 2000, dtype=np.uint16)
+    depth[12:36, 16:48] = 700
+    rgb = np.zeros((48, 64, 3), dtype=np.uint8)
+    return SaveJob(name, rgb, depth, SegmentationHelper().analyze(depth), label_class=0, sample_id=0)
+
+
+def _save(tmp_path, fmt, encoder=None):
+    for d in ("images", "labels", "depth"):
+        (tmp_path / d).mkdir(exist_ok=True)
+    store = create_depth_store(tmp_path / "depth", fmt)
+    done = []
+    saver = SavePipeline(tmp_path / "images", store, tmp_path / "labels", AnnotationWriter(),
+                         on_done=lambda job, ok: done.append((job, ok)), encoder=encoder)
+    saver.submit(_job())
+    saver.close()
+    store.close()
+    return done[0]
+
+
+@pytest.mark.parametrize("fmt", ["png", "npy", "shard"])
+def test_failed_save_rolls_back_depth(tmp_path, fmt):
+    job, ok = _save(tmp_path, fmt, encoder=FailingEncoder())
+
+    assert not ok and job.files == {}
+    reader = DepthReader(tmp_path / "depth")
+    assert "img0000" not in reader
+    assert reader.names() == []
+    assert list((tmp_path / "images").iterdir()) == []
+    assert list((tmp_path / "labels").iterdir()) == []
+
+
+@pytest.mark.parametrize("fmt", ["png", "npy", "shard"])
+def test_saved_sample_keeps_depth(tmp_path, fmt):
+    job, ok = _save(tmp_path, fmt)
+
+    assert ok and job.files["image"]
+    assert np.array_equal(DepthReader(tmp_path / "depth").get("img0000"), job.depth)
+
+
+def test_submit_all_queues_every_job_or_none(tmp_path):
+    for d in ("images", "labels", "depth"):
+        (tmp_path / d).mkdir()
+    store = create_depth_store(tmp_path / "depth", "png")
+    started, proceed = threading.Event(), threading.Event()
+    done = []
+
+    def on_done(job, ok):
+        started.set()
+        proceed.wait(5.0)
+        done.append(job.name)
+
+    saver = SavePipeline(tmp_path / "images", store, tmp_path / "labels", AnnotationWriter(),
+                         workers=1, max_pending=3, on_done=on_done)
+    try:
+        # The only worker holds on to the first job, the queue has room for 3
+        assert saver.submit(_job("a"))
+        assert started.wait(5.0)
+        assert saver.submit_all([_job("b"), _job("c")])
+        assert not saver.submit_all([_job("d"), _job("e")], timeout=0.05)
+        assert saver.submit(_job("f"))  # the failed call gave its room back
+        assert not saver.submit(_job("g"))
+        assert saver.pending() == 4
+    finally:
+        proceed.set()
+        saver.close()
+        store.close()
+    assert done == ["a", "b", "c", "f"]
+
+
+class VanishingLabelEncoder:
+    # Fails after something else already removed the written label
+    def __init__(self, label_dir):
+        self.label_dir = label_dir
+
+    def encode(self, path, bgr):
+        for label in self.label_dir.iterdir():
+            label.unlink()
+        raise RuntimeError("disk full")
+
+
+def test_rollback_tolerates_files_that_are_already_gone(tmp_path, caplog):
+    (tmp_path / "labels").mkdir()
+    job, ok = _save(tmp_path, "png", encoder=VanishingLabelEncoder(tmp_path / "labels"))
+
+    assert not ok and job.files == {}
+    assert "disk full" in caplog.text
+    assert DepthReader(tmp_path / "depth").names() == []
@@ -0,0 +1,54 @@
+import numpy as np
+
+from rgbd_collector.segmentation_helper import SegmentationHelper, create_segmentation
+
+
+def _scene():
+    # 20x30 blob with a 6x8 hole at 350 mm, a 3x3 speck at 340 mm, background at 2 m
+    depth = np.full((60, 80), 2000, np.uint16)
+    depth[20:40, 25:55] = 350
+    depth[27:33, 36:44] = 2000
+    depth[5:8, 5:8] = 340
+    expected = np.zeros(depth.shape, np.uint8)
+    expected[20:40, 25:55] = 1
+    expected[27:33, 36:44] = 0
+    return depth, expected
+
+
+def test_mask_keeps_the_hole_and_drops_small_blobs():
+    depth, expected = _scene()
+    seg = SegmentationHelper(min_depth=300, max_depth=380, min_area=100)
+    mask = seg.segment(depth)
+    assert mask.dtype == np.uint8
+    np.testing.assert_array_equal(mask, expected)
+    # Areas are pixel counts, the hole is not filled in
+    assert mask.sum() == 20 * 30 - 6 * 8
+
+    # Without area limits the speck stays
+    loose = SegmentationHelper(min_depth=300, max_depth=380).segment(depth)
+    assert loose.sum() == expected.sum() + 9
+
+    # The depth range is exclusive at both ends
+    assert not SegmentationHelper(min_depth=350, max_depth=380).segment(depth).any()
+
+
+def test_out_buffer_is_reused_and_cleared_outside_the_roi():
+    depth, expected = _scene()
+    seg = create_segmentation("femto_bolt", min_area=100)
+    out = np.ones(depth.shape, np.uint8)
+    for _ in range(2):
+        assert seg.segment(depth, out=out) is out
+        np.testing.assert_array_equal(out, expected)
+
+    result = seg.analyze(depth, out=out)
+    assert result.mask is out
+    assert len(result.contours) == 1
+    np.testing.assert_array_equal(result.boxes[0], [25, 20, 30, 20])
+
+
+def test_noisy_frame_gives_the_same_mask():
+    # More rejected specks than MAX_CLEARED_BLOBS takes the lookup path
+    depth, expected = _scene()
+    depth[44:58:2, 2:78:2] = 340
+    seg = SegmentationHelper(min_depth=300, max_depth=380, min_area=100)
+    np.testing.assert_array_equal(seg.segment(depth), expected)
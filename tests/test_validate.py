@@ -0,0 +1,55 @@
+import json
+import os
+
+import cv2
+import numpy as np
+
+from rgbd_collector.depth_store import create_depth_store
+from rgbd_collector.validate import CACHE_NAME, validate
+
+
+def _sample(root, name, fmt="png"):
+    (root / "images").mkdir(parents=True, exist_ok=True)
+    (root / "labels").mkdir(parents=True, exist_ok=True)
+    cv2.imwrite(str(root / "images" / f"{name}.jpg"), np.full((48, 64, 3), 128, np.uint8))
+    store = create_depth_store(root / "depth", fmt)
+    store.put(name, np.full((48, 64), 800, np.uint16))
+    store.close()
+    (root / "labels" / f"{name}.txt").write_text("2 0.25 0.25 0.75 0.25 0.75 0.75 0.25 0.75\n")
+
+
+def _checked(capsys):
+    return capsys.readouterr().out.split("Checked ")[1].split()[0]
+
+
+def test_cache_is_json_keyed_by_path_size_and_mtime(tmp_path, capsys):
+    _sample(tmp_path, "img0000")
+    _sample(tmp_path, "img0001", fmt="shard")
+    first = validate(tmp_path, workers=1)
+    assert _checked(capsys) == "2"
+    assert first["img0000"] == ([], [(2, 0.25)], 800.0, 1.0)
+
+    cache = json.loads((tmp_path / CACHE_NAME).read_text())
+    files = cache["samples"]["img0000"]["key"]["files"]
+    assert sorted(files) == ["depth/img0000.png", "images/img0000.jpg", "labels/img0000.txt"]
+    assert files["labels/img0000.txt"][0] == (tmp_path / "labels" / "img0000.txt").stat().st_size
+
+    # Nothing changed: served from the cache, with the same results
+    assert validate(tmp_path, workers=1) == first
+    assert _checked(capsys) == "0"
+
+    # Only the sample whose label changed is checked again
+    label = tmp_path / "labels" / "img0000.txt"
+    label.write_text("2 0.25 0.25 1.5 0.25 0.75 0.75\n")
+    os.utime(label, ns=(0, 0))
+    results = validate(tmp_path, workers=1)
+    assert _checked(capsys) == "1"
+    assert results["img0000"][0] == ["out_of_range"]
+    assert results["img0001"] == first["img0001"]
+
+
+def test_unreadable_cache_is_ignored(tmp_path, capsys):
+    _sample(tmp_path, "img0000")
+    (tmp_path / CACHE_NAME).write_text("not json")
+    assert validate(tmp_path, workers=1)["img0000"][0] == []
+    assert _checked(capsys) == "1"
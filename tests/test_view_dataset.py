@@ -0,0 +1,43 @@
+import json
+
+import cv2
+import numpy as np
+
+from rgbd_collector import view_dataset
+from rgbd_collector.depth_store import create_depth_store
+from rgbd_collector.manifest import MANIFEST_NAME
+
+
+def _dataset(root, count=3):
+    (root / "images").mkdir(parents=True)
+    (root / "labels").mkdir()
+    store = create_depth_store(root / "depth", "png")
+    with open(root / MANIFEST_NAME, "w") as f:
+        for i in range(count):
+            name = f"img{i:04d}"
+            cv2.imwrite(str(root / "images" / f"{name}.jpg"), np.full((48, 64, 3), 40 * i, np.uint8))
+            store.put(name, np.full((48, 64), 600 + i, np.uint16))
+            (root / "labels" / f"{name}.txt").write_text(f"{i} 0.25 0.25 0.75 0.25 0.75 0.75\n")
+            f.write(json.dumps({"id": i, "name": name, "class": i, "depth_min": 500, "depth_max": 700}) + "\n")
+    store.close()
+
+
+def test_browser_runs_headless(tmp_path, monkeypatch):
+    _dataset(tmp_path)
+    shown = []
+    keys = iter([ord("d"), ord("2"), 13, ord("g"), -1, ord("g"), ord("a"), ord("q")])
+    monkeypatch.setattr(cv2, "namedWindow", lambda *args: None)
+    monkeypatch.setattr(cv2, "imshow", lambda window, image: shown.append(image.shape))
+    monkeypatch.setattr(cv2, "waitKey", lambda delay: next(keys))
+    monkeypatch.setattr(cv2, "getWindowProperty", lambda *args: 1.0)
+    monkeypatch.setattr(cv2, "destroyAllWindows", lambda: None)
+
+    browser = view_dataset.DatasetBrowser(tmp_path)
+    browser.run()
+
+    # First frame, d, Enter (go to id 2), g, g, a: one render per key, the grid
+    # once more when its thumbnails come in
+    assert len(shown) >= 6
+    assert shown[0] == (48 + 44, 2 * 64, 3)
+    assert browser.index == 1
+    assert not browser.grid